@@ -0,0 +1,62 @@
+import time
+import uuid
+
+from src.utils.config import METRICS_ENABLED, PROFILING_ENABLED, PROFILE_DIR, SLOW_REQUEST_MS
+from src.utils.logger import get_logger, start_trace, end_trace, REQUEST_SECONDS
+
+logger = get_logger("api")
+
+class InstrumentationMiddleware:
+    """
+    Middleware ASGI murni (tanpa overhead BaseHTTPMiddleware): histogram durasi request,
+    header Server-Timing per tahap, log request lambat dan profiling cProfile lewat header X-Profile.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        profile = PROFILING_ENABLED and (b"x-profile", b"1") in scope.get("headers", [])
+        if not METRICS_ENABLED and not profile:
+            return await self.app(scope, receive, send)
+
+        trace, token = start_trace(profile)
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                timing = ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in trace["stages"])
+                if timing:
+                    headers.append((b"server-timing", timing.encode()))
+                if trace["profiler"] is not None:
+                    headers.append((b"x-profile-file", self._dump_profile(trace["profiler"]).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - trace["start"]
+            end_trace(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_SECONDS.observe(elapsed, scope["method"], path, str(status["code"]))
+
+            if elapsed * 1000 >= SLOW_REQUEST_MS:
+                logger.warning("Request lambat", extra={"fields": {
+                    "method": scope["method"], "path": path, "status": status["code"],
+                    "duration_ms": round(elapsed * 1000, 2),
+                    "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in trace["stages"]}
+                }})
+
+    @staticmethod
+    def _dump_profile(profiler):
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        path = PROFILE_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(path)
+        return path.as_posix()
@@ -1,16 +1,66 @@
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+import numpy as np
 import pandas as pd
-import uvicorn
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from api.schemas import PredictionRequest, PredictionResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from api.instrumentation import InstrumentationMiddleware
+from api.schemas import (
+    PredictionRequest, PredictionResponse, TimelineRequest, TimelineResponse, SessionUpdateResponse,
+    CalibrationRequest, CalibrationResponse, ColumnarPredictionRequest, FleetPredictionRequest, FleetPredictionResponse,
+    RulResponse
+)
 from src.inference import detector 
-from src.models.train import run_training
+from src.streaming import sessions
+from src.batching import PredictionBatcher
+from src.models.jobs import training_job
+from src.models.calibration import recalibrate
+from src.monitoring.drift import drift_monitor
+from src.data.history import history_store
+from src.trend import trend_tracker
+from src.alerting import alert_bus, alert_engine, webhook_sink
+from src.utils.config import RAW_SENSOR_COLS, HISTORY_DEFAULT_UNIT, FLEET_BATCH_SIZE, ALERT_SSE_KEEPALIVE_SECONDS
+from src.data.wire import frame_from_arrays, parse_timestamps, decode_body
+from src.utils.logger import stage, record_stage, mark_since_request_start, render_metrics
+from src.utils.diagnosis import screened_report
+
+# Window dari request /predict yang bersamaan digabung menjadi satu forward pass
+# (context = bundle versi model milik request, agar tidak tercampur saat hot-swap)
+# Cache window sudah dicek di score_request, batcher hanya menerima window yang belum pernah dihitung
+batcher = PredictionBatcher(lambda X, bundle: detector.forward(X, bundle=bundle))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model dimuat di background: API langsung menerima request, /ready menandakan model siap
+    detector.start_background_load()
+    # Versi baru dari training (pointer CURRENT) di-swap tanpa restart
+    detector.start_watcher()
+    # Riwayat skor ditulis per batch oleh thread terpisah
+    history_store.start()
+    # Hysteresis alert per unit di thread sendiri, webhook (jika ALERT_WEBHOOK_URL di-set) juga
+    alert_engine.start()
+    if webhook_sink is not None:
+        webhook_sink.start()
+    yield
+    await batcher.stop()
+    history_store.stop()
+    alert_engine.stop()
+    if webhook_sink is not None:
+        webhook_sink.stop()
 
 app = FastAPI(
     title="MetroPT-3 AI Safety Officer",
     description="API untuk deteksi anomali pada Air Compressor Unit.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -20,36 +70,459 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Histogram latency per request/tahap, header Server-Timing dan profiling opsional (X-Profile)
+app.add_middleware(InstrumentationMiddleware)
+
+def readings_to_frame(readings):
+    with stage("dataframe"):
+        data = [item.dict() for item in readings]
+        df_input = pd.DataFrame(data)
+        df_input['timestamp'] = pd.to_datetime(df_input['timestamp'])
+        df_input.set_index('timestamp', inplace=True)
+    return df_input
+
+def require_model():
+    if not detector.is_ready:
+        detail = f"Model belum siap (state: {detector.state})."
+        if detector.load_error:
+            detail += f" Error: {detector.load_error}"
+        raise HTTPException(status_code=503, detail=detail, headers={"Retry-After": "5"})
 
 @app.get("/")
 def root():
     return {"message": "AI Safety Officer is Online! 🟢", "docs": "/docs"}
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict_anomaly(payload: PredictionRequest):
+@app.get("/health")
+def health():
+    """Status proses, status model, versi artefak dan threshold yang sedang dipakai."""
+    config = detector.config
+    if not config:
+        try:
+            config = detector.load_config()
+        except Exception:
+            config = {}
+
+    return {
+        "status": "ok",
+        # Worker yang melayani request (python -m api.serve dengan beberapa worker)
+        "worker_pid": os.getpid(),
+        "model": detector.status(),
+        "artifacts": detector.artifact_versions,
+        "config": {
+            "threshold_critical": config.get('threshold_critical', detector.thresh_critical),
+            "threshold_warning": config.get('threshold_warning', detector.thresh_warning),
+            "time_steps": config.get('time_steps'),
+            "features": config.get('features')
+        }
+    }
+
+@app.get("/ready")
+def ready():
+    """200 jika model siap melayani prediksi, 503 selama loading atau jika gagal."""
+    require_model()
+    return {"status": "ready", "model": detector.status()}
+
+def unit_frame(payload):
+    values = np.column_stack([np.asarray(getattr(payload, col), dtype=float) for col in RAW_SENSOR_COLS])
+    return frame_from_arrays(parse_timestamps(payload.timestamps), values)
+
+def columnar_to_frame(payload):
+    with stage("dataframe"):
+        return unit_frame(payload)
+
+def prepare_request_window(build_frame, source, bundle):
+    df_input = build_frame(source)
+    X_seq, error = detector.prepare_window(df_input, bundle)
+    # Menit terakhir window (kunci riwayat skor)
+    window_end = df_input.index.max().floor("min") if error is None else None
+    return X_seq, window_end, error
+
+def record_score(unit_id, timestamp, report, mae, bundle):
+    """
+    Setiap window yang di-scoring: riwayat skor (antrian) + tren RUL unit (update O(1)) + alert (antrian).
+    bundle = versi yang men-scoring window ini, agar alert memakai threshold versi itu walau sedang hot-swap.
+    """
+    unit_id = unit_id or HISTORY_DEFAULT_UNIT
+    history_store.record(unit_id, timestamp, report, mae, bundle.version)
+    trend_tracker.update(unit_id, timestamp, report["risk_score"], bundle.version)
+    alert_engine.submit(
+        unit_id, timestamp, report["risk_score"], report["severity_level"],
+        bundle.thresh_critical, bundle.thresh_warning, bundle.version
+    )
+
+async def score_request(build_frame, source, unit_id=None):
+    """Jalur bersama /predict*: frame -> window ter-scale (threadpool) -> batcher -> laporan."""
+    require_model()
     try:
-        data = [item.dict() for item in payload.readings]
-        df_input = pd.DataFrame(data)
-        df_input['timestamp'] = pd.to_datetime(df_input['timestamp'])
-        df_input.set_index('timestamp', inplace=True)
-        
-        result = detector.predict(df_input)
+        # Satu versi model untuk seluruh request (scaling, forward pass, threshold)
+        bundle = detector.acquire()
+
+        # Preprocessing (pandas) di threadpool, forward pass lewat batcher
+        X_seq, window_end, error = await run_in_threadpool(prepare_request_window, build_frame, source, bundle)
         
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+        screened = detector.screen(X_seq, bundle)
+        if screened is not None and screened[0][0]:
+            # Jelas normal menurut prefilter: AMAN tanpa forward pass LSTM
+            report, mae = screened_report(screened[1][0]), screened[2][0]
+        else:
+            # Window identik (upload ulang, prefix yang tumbuh) langsung dari cache tanpa antri di batcher
+            keys, cached = detector.cached_reconstruction(X_seq, bundle)
+            reconstruction = cached[0]
+            if reconstruction is None:
+                queued = time.perf_counter()
+                reconstruction = await batcher.submit(X_seq[0], bundle)
+                record_stage("batcher", time.perf_counter() - queued)
+                if keys is not None:
+                    detector.cache.store(keys, reconstruction[np.newaxis])
+            report = detector.build_report(X_seq, reconstruction[np.newaxis], bundle)
+            mae = np.mean(np.abs(reconstruction - X_seq[0]), axis=0)
+        # Hanya menit terbaru: window yang berurutan saling tumpang tindih
+        drift_monitor.update(X_seq[0, -1], bundle)
+        record_score(unit_id, window_end, report, mae, bundle)
+        return report
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@app.post("/predict", response_model=PredictionResponse)
+async def predict_anomaly(payload: PredictionRequest):
+    # Body sudah dibaca dan divalidasi pydantic saat endpoint dipanggil
+    mark_since_request_start("parse")
+    return await score_request(readings_to_frame, payload.readings, payload.unit_id)
+
+@app.post("/predict/columnar", response_model=PredictionResponse)
+async def predict_columnar(payload: ColumnarPredictionRequest):
+    """Sama dengan /predict, tetapi input berupa satu array per kolom (timestamps + RAW_SENSOR_COLS)."""
+    mark_since_request_start("parse")
+    return await score_request(columnar_to_frame, payload, payload.unit_id)
+
+@app.post("/predict/binary", response_model=PredictionResponse)
+async def predict_binary(request: Request, unit_id: Optional[str] = None):
+    """
+    Body biner: application/octet-stream (raw float32, lihat src/data/wire.py)
+    atau application/vnd.apache.arrow.stream (Arrow IPC, butuh pyarrow). unit_id lewat query string.
+    """
+    body = await request.body()
+    try:
+        with stage("parse"):
+            timestamps, values = decode_body(body, request.headers.get("content-type"))
+    except ImportError:
+        raise HTTPException(status_code=415, detail="Format Arrow butuh pyarrow yang belum terpasang di server.")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await score_request(lambda arrays: frame_from_arrays(*arrays), (timestamps, values), unit_id)
+
+@app.post("/predict/fleet", response_model=FleetPredictionResponse)
+def predict_fleet(payload: FleetPredictionRequest):
+    """
+    Scan banyak unit dalam satu request: preprocessing satu lintasan untuk semua unit dan
+    satu batch model. Unit dengan data kurang mendapat error sendiri tanpa menggagalkan unit lain.
+    """
+    mark_since_request_start("parse")
+    require_model()
+    try:
+        bundle = detector.acquire()
+        # Satu entri Server-Timing untuk semua unit (bukan satu per unit)
+        with stage("dataframe"):
+            frames = [unit_frame(unit) for unit in payload.units]
+        X, ok_units, window_end, errors = detector.prepare_fleet(frames, bundle)
+
+        results = [{"unit_id": unit.unit_id, "error": errors.get(i)} for i, unit in enumerate(payload.units)]
+        if len(ok_units):
+            reports, mae = detector.score_batch(X, batch_size=FLEET_BATCH_SIZE, bundle=bundle)
+            for k, i in enumerate(ok_units):
+                results[i]["result"] = reports[k]
+                drift_monitor.update(X[k, -1], bundle)
+                record_score(payload.units[i].unit_id, window_end[k], reports[k], mae[k], bundle)
+
+        return {"version": bundle.version, "scored": len(ok_units), "failed": len(errors), "units": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Metrik format Prometheus: histogram request & tahap inference, status model dan batcher."""
+    status = detector.status()
+    stats = batcher.stats.snapshot()
+    cache = status["cache"]
+    alerts = alert_engine.status()
+    extra = [
+        "# TYPE metropt_model_ready gauge",
+        f"metropt_model_ready {int(detector.is_ready)}",
+        "# TYPE metropt_model_swaps_total counter",
+        f"metropt_model_swaps_total {status['swap_count']}",
+        "# TYPE metropt_batches_total counter",
+        f"metropt_batches_total {stats['batches']}",
+        "# TYPE metropt_batched_items_total counter",
+        f"metropt_batched_items_total {stats['items']}",
+        "# TYPE metropt_window_cache_hits_total counter",
+        f"metropt_window_cache_hits_total {cache['hits']}",
+        "# TYPE metropt_window_cache_misses_total counter",
+        f"metropt_window_cache_misses_total {cache['misses']}",
+        "# TYPE metropt_window_cache_evictions_total counter",
+        f"metropt_window_cache_evictions_total {cache['evictions']}",
+        "# TYPE metropt_window_cache_entries gauge",
+        f"metropt_window_cache_entries {cache['entries']}",
+        "# TYPE metropt_window_cache_bytes gauge",
+        f"metropt_window_cache_bytes {cache['bytes']}",
+        "# TYPE metropt_prefilter_windows_total counter",
+        f"metropt_prefilter_windows_total {status['prefilter']['windows']}",
+        "# TYPE metropt_prefilter_screened_total counter",
+        f"metropt_prefilter_screened_total {status['prefilter']['screened']}",
+        "# TYPE metropt_alert_events_total counter",
+        f"metropt_alert_events_total {alerts['events']}",
+        "# TYPE metropt_alert_dropped_total counter",
+        f"metropt_alert_dropped_total {alerts['dropped']}",
+        "# TYPE metropt_alert_units gauge",
+        *(f'metropt_alert_units{{state="{state}"}} {count}' for state, count in alerts["units_by_state"].items()),
+        "# TYPE metropt_alert_subscribers gauge",
+        f"metropt_alert_subscribers {alert_bus.status()['subscribers']}",
+        "# TYPE metropt_history_written_total counter",
+        f"metropt_history_written_total {history_store.stats['written']}",
+        "# TYPE metropt_history_dropped_total counter",
+        f"metropt_history_dropped_total {history_store.stats['dropped']}",
+    ]
+    return PlainTextResponse(render_metrics(extra), media_type="text/plain; version=0.0.4")
+
+@app.get("/batching/stats")
+def batching_stats():
+    """Ukuran batch, waktu tunggu antrian dan waktu model dari batcher /predict."""
+    return {
+        "max_batch_size": batcher.max_batch_size,
+        "max_wait_ms": batcher.max_wait * 1000,
+        **batcher.stats.snapshot()
+    }
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss, jumlah entri dan byte cache rekonstruksi window (dikosongkan otomatis saat model di-swap)."""
+    return detector.cache.stats()
+
+@app.post("/cache/clear")
+def cache_clear():
+    detector.cache.clear()
+    return detector.cache.stats()
+
+@app.get("/variants")
+def model_variants():
+    """Perbandingan varian presisi versi aktif (F1, ukuran, latency per window) dari training, dan varian yang dilayani."""
+    require_model()
+    bundle = detector.acquire()
+    path = bundle.paths.get("variants")
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=(
+            f"Versi {bundle.version} belum punya laporan varian (training dengan EXPORT_VARIANTS "
+            "atau python -m src.models.train --export-only --variants ...)."
+        ))
+    with open(path) as f:
+        report = json.load(f)
+    return {"version": bundle.version, "serving": {"backend": detector.backend_name, "variant": bundle.variant}, **report}
+
+@app.get("/drift")
+def drift_report():
+    """PSI/KS per fitur: data /predict sejak start (atau reset) vs distribusi training versi aktif."""
+    return drift_monitor.report()
+
+@app.post("/drift/reset")
+def reset_drift():
+    drift_monitor.reset()
+    return {"status": "Success"}
+
+@app.get("/history")
+def score_history(unit_id: str = HISTORY_DEFAULT_UNIT, start: Optional[str] = None, end: Optional[str] = None,
+                  resolution: str = "auto"):
+    """
+    Riwayat risk score satu unit. Default: 24 jam terakhir yang tercatat.
+    resolution: raw (per menit, + MAE per fitur & kontributor utama), 5m, 1h (min/mean/max) atau auto.
+    Maksimal HISTORY_MAX_POINTS titik terawal dari rentang; truncated=true jika ada titik yang terpotong.
+    """
+    try:
+        result = history_store.query(unit_id, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Belum ada riwayat untuk unit {unit_id}.")
+    return result
+
+@app.get("/history/units")
+def history_units():
+    return {"units": history_store.units(), "writer": history_store.status()}
+
+@app.get("/rul", response_model=RulResponse)
+def remaining_useful_life(unit_id: str = HISTORY_DEFAULT_UNIT):
+    """
+    Tren degradasi + estimasi menit sampai CRITICAL satu unit, dari regresi berbobot eksponensial
+    atas risk score yang diperbarui setiap window unit itu di-scoring.
+    """
+    require_model()
+    bundle = detector.acquire()
+    result = trend_tracker.report(unit_id, bundle.thresh_critical, bundle.thresh_warning)
+    if result is None:
+        # Unit belum dilacak sejak start (mis. setelah restart): bangun sekali dari riwayat tersimpan
+        history = history_store.query(unit_id, resolution="raw")
+        if history is not None:
+            trend_tracker.seed(unit_id, history["timestamps"], history["risk_score"], bundle.version)
+            result = trend_tracker.report(unit_id, bundle.thresh_critical, bundle.thresh_warning)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"Belum ada skor untuk unit {unit_id}.")
+    return result
+
+@app.get("/rul/units")
+def rul_units():
+    """Semua unit yang dilacak, yang paling cepat mencapai CRITICAL lebih dulu."""
+    require_model()
+    bundle = detector.acquire()
+    return {"units": trend_tracker.units(bundle.thresh_critical, bundle.thresh_warning)}
+
+@app.get("/alerts")
+def alert_states(unit_id: Optional[str] = None, all_units: bool = False):
+    """
+    Status alert per unit setelah hysteresis (N dari M window, cooldown). Default hanya unit
+    berstatus warning/critical; all_units=true untuk semua unit yang dilacak.
+    """
+    if unit_id is not None:
+        state = alert_engine.unit(unit_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail=f"Belum ada skor untuk unit {unit_id}.")
+        return state
+    return {
+        "units": alert_engine.units(active_only=not all_units),
+        "engine": alert_engine.status(),
+        "bus": alert_bus.status(),
+        "webhook": webhook_sink.status() if webhook_sink is not None else None
+    }
+
+@app.get("/alerts/events")
+def alert_events(since: int = 0, limit: int = 100):
+    """Event perubahan status terakhir dengan id > since (polling; untuk push pakai /alerts/stream atau /alerts/ws)."""
+    return {"events": alert_bus.recent(since, limit)}
+
+@app.get("/alerts/stream")
+async def alert_stream(request: Request, since: Optional[int] = None):
+    """
+    Server-Sent Events: satu event 'alert' per perubahan status unit. Reconnect dengan header
+    Last-Event-ID (atau ?since=) mengirim ulang event yang terlewat selama masih ada di buffer.
+    """
+    last_id = request.headers.get("last-event-id")
+    if since is None and last_id is not None and last_id.isdigit():
+        since = int(last_id)
+    subscription = alert_bus.subscribe(since_id=since)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=ALERT_SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: alert\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            alert_bus.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/alerts/ws")
+async def alert_websocket(websocket: WebSocket, since: Optional[int] = None):
+    """WebSocket: setiap event perubahan status dikirim sebagai satu pesan JSON."""
+    await websocket.accept()
+    subscription = alert_bus.subscribe(since_id=since)
+    try:
+        while True:
+            await websocket.send_json(await subscription.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        alert_bus.unsubscribe(subscription)
+
+@app.post("/predict/timeline", response_model=TimelineResponse)
+def predict_timeline(payload: TimelineRequest):
+    """Kurva risk score untuk seluruh upload dalam satu request."""
+    require_model()
+    try:
+        df_input = readings_to_frame(payload.readings)
+
+        result = detector.predict_timeline(df_input, stride=payload.stride)
+
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
-            
+
         return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+@app.post("/sessions/{unit_id}/readings", response_model=SessionUpdateResponse)
+def push_session_readings(unit_id: str, payload: PredictionRequest):
+    """Kirim hanya pembacaan baru; server menyimpan window per unit dan scoring saat menit baru tertutup."""
+    require_model()
+    try:
+        df_input = readings_to_frame(payload.readings)
+        session = sessions.get(unit_id)
+        return session.update(
+            df_input.index.values, df_input[RAW_SENSOR_COLS].to_numpy(dtype=float), detector,
+            on_scored=record_score
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+@app.get("/sessions")
+def list_sessions():
+    return {"sessions": sessions.summary()}
+
+@app.get("/sessions/{unit_id}")
+def get_session(unit_id: str):
+    """State ring buffer satu unit (untuk debugging)."""
+    session = sessions.get(unit_id, create=False)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Session {unit_id} tidak ditemukan.")
+    return session.describe()
+
+@app.delete("/sessions/{unit_id}")
+def delete_session(unit_id: str):
+    if not sessions.remove(unit_id):
+        raise HTTPException(status_code=404, detail=f"Session {unit_id} tidak ditemukan.")
+    return {"status": "Success", "unit_id": unit_id}
+
 @app.post("/train")
-def trigger_training(background_tasks: BackgroundTasks):
-    """Endpoint untuk me-retrain model secara asinkron di background."""
-    background_tasks.add_task(run_training)
+def trigger_training():
+    """Retrain model di proses terpisah; versi baru otomatis di-swap setelah selesai."""
+    if not training_job.start():
+        raise HTTPException(status_code=409, detail="Training masih berjalan.")
     return {
         "status": "Success",
-        "message": "Proses training model telah dimulai di background. Cek terminal untuk progress."
+        "message": "Proses training model telah dimulai di proses terpisah. Cek /train/status untuk progress.",
+        "job": training_job.status()
     }
 
+@app.get("/train/status")
+def training_status():
+    return {"job": training_job.status(), "model": detector.status()}
+
+@app.post("/calibrate", response_model=CalibrationResponse)
+def recalibrate_thresholds(payload: CalibrationRequest):
+    """Hitung ulang threshold dari risk score evaluasi tersimpan (tanpa training ulang)."""
+    try:
+        result = recalibrate(payload.version, payload.mode, payload.bins, publish=payload.publish)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+    # Versi baru langsung dipakai, tidak menunggu watcher
+    if payload.publish:
+        detector.reload_if_changed()
+    return result
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("api.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
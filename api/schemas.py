@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional, Dict, Any, Literal, Union
 from datetime import datetime
 
+from src.utils.config import CALIBRATION_HIST_BINS, RAW_SENSOR_COLS, FLEET_MAX_UNITS
+
 # Model Data Tunggal (Satu baris sensor)
 class SensorReading(BaseModel):
     timestamp: datetime
@@ -31,6 +33,45 @@ class SensorReading(BaseModel):
 # min 30 data point untuk LSTM
 class PredictionRequest(BaseModel):
     readings: List[SensorReading]
+    unit_id: Optional[str] = Field(None, description="ID kompresor untuk riwayat skor (/history).")
+
+# Format kolumnar: satu array per kolom, tanpa objek pydantic per baris
+class ColumnarPredictionRequest(BaseModel):
+    timestamps: Union[List[int], List[str]] = Field(..., description="Epoch milidetik atau string ISO-8601.")
+    unit_id: Optional[str] = Field(None, description="ID kompresor untuk riwayat skor (/history).")
+    TP2: List[float]
+    TP3: List[float]
+    H1: List[float]
+    DV_pressure: List[float]
+    Reservoirs: List[float]
+    Oil_temperature: List[float]
+    Motor_current: List[float]
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        n_rows = len(self.timestamps)
+        for name in RAW_SENSOR_COLS:
+            if len(getattr(self, name)) != n_rows:
+                raise ValueError(f"Panjang kolom {name} ({len(getattr(self, name))}) != jumlah timestamps ({n_rows}).")
+        return self
+
+# Scan seluruh armada: satu request berisi data kolumnar banyak unit
+class FleetUnitReadings(ColumnarPredictionRequest):
+    unit_id: str
+
+class FleetPredictionRequest(BaseModel):
+    units: List[FleetUnitReadings] = Field(..., max_length=FLEET_MAX_UNITS)
+
+    @model_validator(mode="after")
+    def check_unique_units(self):
+        unit_ids = [unit.unit_id for unit in self.units]
+        if len(set(unit_ids)) != len(unit_ids):
+            raise ValueError("unit_id dalam satu request harus unik.")
+        return self
+
+# Request timeline: semua window di-scoring dalam satu panggilan
+class TimelineRequest(PredictionRequest):
+    stride: int = Field(1, ge=1, description="Jarak antar window (menit).")
 
 # Model Output Response 
 class FeatureContribution(BaseModel):
@@ -42,4 +83,73 @@ class PredictionResponse(BaseModel):
     risk_score: float
     severity_level: int
     analysis_text: str
-    top_contributing_features: Optional[List[Dict[str, Any]]] = []
\ No newline at end of file
+    top_contributing_features: Optional[List[Dict[str, Any]]] = []
+    # True jika window lolos prefilter (AMAN tanpa forward pass LSTM)
+    screened: bool = False
+
+class FleetUnitResult(BaseModel):
+    unit_id: str
+    result: Optional[PredictionResponse] = None
+    error: Optional[str] = None
+
+class FleetPredictionResponse(BaseModel):
+    version: str
+    scored: int
+    failed: int
+    units: List[FleetUnitResult]
+
+# Tren degradasi / RUL (src/trend.py)
+class RulResponse(BaseModel):
+    unit_id: Optional[str] = None
+    as_of: datetime
+    risk_score: float
+    trend_level: Optional[float] = None
+    slope_per_minute: float
+    r2: float
+    points: int
+    effective_points: float
+    half_life_minutes: float
+    status: Literal["critical", "warning", "degrading", "stable"]
+    minutes_to_critical: Optional[float] = None
+    critical_eta: Optional[datetime] = None
+    threshold_critical: float
+    threshold_warning: float
+    version: Optional[str] = None
+
+class TimelineResponse(BaseModel):
+    timestamps: List[datetime]
+    risk_scores: List[float]
+    severity_levels: List[int]
+    stride: int
+    latest: PredictionResponse
+    screened_windows: int = 0
+    rul: Optional[RulResponse] = None
+
+# Session streaming per unit
+class SessionUpdateResponse(BaseModel):
+    unit_id: str
+    new_bars: int
+    window_fill: int
+    scored: bool
+    result: Optional[PredictionResponse] = None
+
+# Kalibrasi ulang threshold dari risk score evaluasi tersimpan
+class CalibrationRequest(BaseModel):
+    version: Optional[str] = Field(None, description="Versi sumber (default: versi aktif).")
+    mode: Literal["exact", "histogram"] = "exact"
+    bins: int = Field(CALIBRATION_HIST_BINS, ge=16, le=1_000_000)
+    publish: bool = True
+
+class CalibrationResponse(BaseModel):
+    threshold_critical: float
+    threshold_warning: float
+    accuracy: float
+    precision: float
+    recall: float
+    f1_score: float
+    n_scores: int
+    n_positive: int
+    mode: str
+    source_version: str
+    version: str
+    published: bool
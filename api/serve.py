@@ -0,0 +1,40 @@
+"""
+Serving multi-proses: N worker uvicorn (masing-masing proses dan GIL sendiri) di belakang satu port.
+
+    python -m api.serve --workers 4
+    SERVE_WORKERS=0 python -m api.serve      # satu worker per core
+
+Setiap worker memuat bundle model sendiri; bobot NumpyBackend dan model TFLite di-memory-map dari file
+bersama sehingga hanya ada satu salinan di RAM. Backend keras memuat TensorFlow penuh per worker.
+
+State in-memory tetap per worker: session streaming (/sessions), tren RUL, drift monitor, cache window,
+statistik batcher dan /metrics. Riwayat skor (/history) bersama lewat SQLite, training dibatasi satu
+lewat file lock. Untuk /sessions dengan lebih dari satu worker dibutuhkan sticky routing per unit.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from src.utils.config import SERVE_HOST, SERVE_PORT, SERVE_WORKERS
+from src.utils.logger import get_logger
+
+logger = get_logger("serve")
+
+def resolve_workers(workers):
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Jalankan API dengan beberapa worker proses.")
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS, help="Jumlah worker, 0 = jumlah core.")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    args = parser.parse_args()
+
+    workers = resolve_workers(args.workers)
+    if workers > 1:
+        logger.warning(f"{workers} worker: state session/tren/drift tidak dibagi antar worker.")
+    uvicorn.run("api.main:app", host=args.host, port=args.port, workers=workers)
+
+if __name__ == "__main__":
+    main()
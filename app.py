@@ -14,6 +14,7 @@ st.set_page_config(page_title="AI Safety Officer", page_icon="🤖", layout="wid
 API_BASE_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
 API_PREDICT_URL = f"{API_BASE_URL}/predict"
 API_HEALTH_URL = f"{API_BASE_URL}/health"
+API_TIMELINE_URL = f"{API_BASE_URL}/predict/timeline"
 
 # Read File
 @st.cache_data
@@ -77,39 +78,27 @@ if uploaded_file is not None:
                 st.error(f"Data terlalu pendek ({len(df)} baris). Butuh minimal {MIN_ROWS} baris untuk simulasi tren historis.")
                 st.stop()
 
-            progress_text = "Menganalisis tren masa lalu menuju masa kini..."
-            my_bar = st.progress(0, text=progress_text)
-            
-            num_steps = 10
-            step_size = (len(df) - MIN_ROWS) // num_steps
-            if step_size == 0: step_size = 1
-            
-            timestamps_history = []
-            risk_scores_history = []
-            latest_result = None
-
-            for i, end_idx in enumerate(range(MIN_ROWS, len(df) + 1, step_size)):
-                chunk = df.iloc[:end_idx]
-                
+            with st.spinner("Menganalisis tren masa lalu menuju masa kini..."):
                 payload = [{"timestamp": str(r['timestamp']), "TP2": r['TP2'], "TP3": r['TP3'], 
                             "H1": r['H1'], "DV_pressure": r['DV_pressure'], "Reservoirs": r['Reservoirs'], 
                             "Oil_temperature": r['Oil_temperature'], "Motor_current": r['Motor_current']} 
-                           for _, r in chunk.iterrows()]
-                
+                           for _, r in df.iterrows()]
+
+                # Satu request: server menghitung risk score untuk setiap window sekaligus
                 try:
-                    res = requests.post(API_PREDICT_URL, json={"readings": payload})
-                    if res.status_code == 200:
-                        data = res.json()
-                        risk_scores_history.append(data['risk_score'])
-                        timestamps_history.append(chunk.iloc[-1]['timestamp'])
-                        latest_result = data
+                    res = requests.post(API_TIMELINE_URL, json={"readings": payload, "stride": 1})
                 except:
                     st.error("Gagal menghubungi API.")
                     st.stop()
-                    
-                my_bar.progress((i + 1) / (num_steps + 1))
-            
-            my_bar.empty()
+
+            if res.status_code != 200:
+                st.error(f"API mengembalikan error ({res.status_code}): {res.text}")
+                st.stop()
+
+            data = res.json()
+            timestamps_history = pd.to_datetime(data['timestamps'])
+            risk_scores_history = data['risk_scores']
+            latest_result = data['latest']
 
             # Hasil Diagnosa
             if latest_result:
@@ -129,34 +118,25 @@ if uploaded_file is not None:
 
             st.markdown("---")
 
-            # Remaining Useful Life
-            x_vals = np.arange(len(risk_scores_history))
-            slope, intercept = np.polyfit(x_vals, risk_scores_history, 1)
-            
+            # Remaining Useful Life: tren dihitung server (src/trend.py) dengan timestamp window yang sebenarnya
+            rul = data['rul']
             st.header("📈 Analisis Lanjutan: Kurva Degradasi & Prediksi RUL")
-            
-            rul_text = ""
-            latest_score = risk_scores_history[-1]
 
-            if latest_score >= thresh_critical:
-                rul_text = "🚨 **MESIN SUDAH BERADA DI ZONA CRITICAL!** Segera matikan unit untuk mencegah kerusakan fatal."
-                st.error(rul_text)
-            elif latest_score >= thresh_warning:
+            minutes_to_critical = rul['minutes_to_critical']
+            if rul['status'] == "critical":
+                st.error("🚨 **MESIN SUDAH BERADA DI ZONA CRITICAL!** Segera matikan unit untuk mencegah kerusakan fatal.")
+            elif rul['status'] == "warning":
                 rul_text = "🟡 **MESIN DI ZONA WARNING!** Performa menurun, jadwalkan inspeksi."
-                if slope > 0: 
-                    steps_to_critical = (thresh_critical - intercept) / slope
-                    remaining_steps = max(0, steps_to_critical - x_vals[-1])
-                    rul_text += f" Tren menunjukkan batas CRITICAL akan tercapai dalam estimasi **{int(remaining_steps * 5)} menit**."
+                if minutes_to_critical is not None:
+                    rul_text += f" Tren menunjukkan batas CRITICAL akan tercapai dalam estimasi **{int(minutes_to_critical)} menit**."
                 st.warning(rul_text)
+            elif rul['status'] == "degrading":
+                rul_text = "⚠️ **INDIKASI DEGRADASI:** Mesin saat ini aman, namun tren naik."
+                if minutes_to_critical is not None:
+                    rul_text += f" Estimasi menyentuh batas CRITICAL dalam **{int(minutes_to_critical)} menit**."
+                st.info(rul_text)
             else:
-                if slope > 0.005: 
-                    steps_to_critical = (thresh_critical - intercept) / slope
-                    remaining_steps = max(0, steps_to_critical - x_vals[-1])
-                    rul_text = f"⚠️ **INDIKASI DEGRADASI:** Mesin saat ini aman, namun tren naik. Estimasi menyentuh batas CRITICAL dalam **{int(remaining_steps * 5)} menit**."
-                    st.info(rul_text)
-                else:
-                    rul_text = "🟢 **MESIN STABIL.** Tidak terdeteksi anomali atau tren kerusakan dalam waktu dekat."
-                    st.success(rul_text)
+                st.success("🟢 **MESIN STABIL.** Tidak terdeteksi anomali atau tren kerusakan dalam waktu dekat.")
 
             # Grafik
             fig = go.Figure()
@@ -164,13 +144,14 @@ if uploaded_file is not None:
             fig.add_trace(go.Scatter(x=timestamps_history, y=risk_scores_history, 
                                      mode='lines+markers', name='Risk Score Aktual', line=dict(color='blue', width=3)))
 
-            if slope > 0.005 and risk_scores_history[-1] < thresh_critical:
-                future_x = len(risk_scores_history) + 3 
-                future_y = slope * future_x + intercept
+            if minutes_to_critical is not None and rul['status'] != "critical":
+                # Garis tren dari level saat ini sampai batas CRITICAL (maks. 15 menit ke depan)
+                horizon = min(max(minutes_to_critical, 1.0), 15.0)
+                future_y = rul['trend_level'] + rul['slope_per_minute'] * horizon
                 
                 fig.add_trace(go.Scatter(
-                    x=[timestamps_history[-1], timestamps_history[-1] + pd.Timedelta(minutes=15)], 
-                    y=[risk_scores_history[-1], future_y], 
+                    x=[timestamps_history[-1], timestamps_history[-1] + pd.Timedelta(minutes=horizon)], 
+                    y=[rul['trend_level'], future_y], 
                     mode='lines', name='Prediksi Tren (RUL)', line=dict(color='orange', width=3, dash='dash')
                 ))
 
@@ -0,0 +1,257 @@
+"""
+Alerting per unit (src/alerting.py): hysteresis vs klasifikasi per window, throughput engine (update/detik,
+biaya submit di jalur request), dan end-to-end: POST /predict ke server sungguhan (python -m api.serve)
+dengan subscriber SSE dan webhook ke penerima lokal (benchmarks/webhook_receiver.py), plus WebSocket in-process.
+
+    python -m benchmarks.bench_alerting
+    python -m benchmarks.bench_alerting --units 16 --updates 2000000
+
+Artefak tiruan (NumpyBackend); threshold diatur dari risk score data sintetis aman/bahaya.
+"""
+import argparse
+import asyncio
+import json
+import os
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_serving import free_port, wait_for_workers
+from benchmarks.common import ROOT_DIR
+from benchmarks.webhook_receiver import WebhookReceiver
+
+# Per unit: normal, memburuk, gagal, normal kembali (menit)
+PHASES = [("aman", 90), ("warning", 30), ("bahaya", 45), ("aman", 90)]
+WINDOW_MINUTES = 35
+LEVEL = ("normal", "warning", "critical")
+
+
+def count_changes(levels):
+    return sum(a != b for a, b in zip(levels, levels[1:]))
+
+
+def hysteresis_demo(AlertState, np):
+    """Skor berisik di sekitar threshold WARNING lalu naik ke CRITICAL dan turun lagi (threshold 1.0 / 0.7)."""
+    rng = np.random.default_rng(0)
+    risk = np.concatenate([
+        0.7 + 0.05 * rng.normal(size=600),   # berisik di sekitar WARNING
+        1.2 + 0.05 * rng.normal(size=60),    # gagal
+        0.3 + 0.05 * rng.normal(size=120),   # pulih
+    ])
+    severity = np.where(risk >= 1.0, 2, np.where(risk >= 0.7, 1, 0))
+    state, levels, events = AlertState(), [], []
+    for i, (score, level) in enumerate(zip(risk, severity)):
+        change = state.update(i * 60_000, float(score), int(level), 1.0, 0.7)
+        if change is not None:
+            events.append((i, *change))
+        levels.append(state.level)
+    first_critical = next(i for i, _, to in events if to == 2)
+    print("hysteresis (1 window/menit, 600 berisik di sekitar WARNING, 60 CRITICAL, 120 pulih):")
+    print(f"  perubahan status per window : {count_changes(severity.tolist())}")
+    print(f"  event alert                 : {len(events)}  {[(i, LEVEL[a], LEVEL[b]) for i, a, b in events]}")
+    print(f"  delay deteksi CRITICAL      : {first_critical - 600} window")
+
+
+def engine_throughput(AlertEngine, AlertBus, np, n_units, n_updates):
+    engine = AlertEngine(AlertBus(), queue_size=n_updates + 1)
+    rng = np.random.default_rng(1)
+    units = [f"unit-{i}" for i in range(n_units)]
+    risk = np.abs(0.7 + 0.2 * rng.normal(size=n_updates))
+    severity = np.where(risk >= 1.0, 2, np.where(risk >= 0.7, 1, 0))
+    t0 = 1_590_969_600_000
+    items = [
+        (units[i % n_units], t0 + (i // n_units) * 60_000, float(risk[i]), int(severity[i]), 1.0, 0.7, "v1")
+        for i in range(n_updates)
+    ]
+
+    start = time.perf_counter()
+    for item in items[:100_000]:
+        engine.submit(*item)
+    submit_us = (time.perf_counter() - start) / 100_000 * 1e6
+    # Antrian dikosongkan lagi: yang diukur di bawah hanya pemrosesan
+    while True:
+        try:
+            engine._queue.get_nowait()
+        except queue.Empty:
+            break
+
+    events, start = 0, time.perf_counter()
+    for i in range(0, n_updates, 10_000):
+        events += len(engine.process(items[i : i + 10_000]))
+    elapsed = time.perf_counter() - start
+    print(f"\nengine: {n_updates} skor, {n_units} unit (batch 10k seperti thread alert-engine)")
+    print(f"  throughput         : {n_updates / elapsed:>12,.0f} skor/detik")
+    print(f"  event              : {events} ({events / n_updates:.4f} per skor)")
+    print(f"  submit (request)   : {submit_us:>12.2f} us/panggilan (hanya put_nowait ke antrian)")
+
+
+def sse_listener(base_url, received, stop):
+    import httpx
+
+    with httpx.stream("GET", f"{base_url}/alerts/stream", timeout=None) as response:
+        for line in response.iter_lines():
+            if line.startswith("data: "):
+                event = json.loads(line[6:])
+                received.append((event, time.time()))
+            if stop.is_set():
+                break
+
+
+async def drive_units(base_url, bodies_per_unit):
+    import httpx
+
+    headers = {"content-type": "application/json"}
+    severities, latencies = {}, []
+    limits = httpx.Limits(max_connections=len(bodies_per_unit))
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def unit_worker(unit_id, bodies):
+            levels = severities.setdefault(unit_id, [])
+            for body in bodies:
+                start = time.perf_counter()
+                response = await client.post("/predict", content=body, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+                levels.append(response.json()["severity_level"])
+
+        start = time.perf_counter()
+        await asyncio.gather(*(unit_worker(unit_id, bodies) for unit_id, bodies in bodies_per_unit.items()))
+        elapsed = time.perf_counter() - start
+    return severities, latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=8, help="Unit untuk uji end-to-end /predict.")
+    parser.add_argument("--engine-units", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    receiver = WebhookReceiver().start()
+    workdir = tempfile.mkdtemp(prefix="metropt-alerting-")
+    # Konfigurasi harus di-set sebelum modul src/api diimport
+    os.environ["MODELS_DIR"] = workdir
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+    os.environ["HISTORY_ENABLED"] = "0"
+    os.environ["WINDOW_CACHE_ENABLED"] = "0"
+
+    import httpx
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from fastapi.testclient import TestClient
+    from sklearn.preprocessing import MinMaxScaler
+
+    from benchmarks.common import synthetic_compressor, write_synthetic_artifacts
+    from api.main import app
+    from src.alerting import AlertBus, AlertEngine, AlertState, alert_engine
+    from src.inference import detector
+    from src.data.preprocessing import process_input_data
+    from src.models.registry import publish_version
+    from src.utils.config import RAW_SENSOR_COLS, TIME_STEPS, VERSIONS_DIR
+
+    hysteresis_demo(AlertState, np)
+    engine_throughput(AlertEngine, AlertBus, np, args.engine_units, args.updates)
+
+    # Scaler artefak tiruan di-fit ulang pada data aman agar kondisi gagal terlihat jelas di risk score,
+    # threshold dari risk score data sintetis: WARNING di kuantil 0.97 fase aman (sesekali terlewati)
+    paths = write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    healthy = process_input_data(synthetic_compressor(2 * 24 * 360, profile="aman", seed=7)[RAW_SENSOR_COLS])
+    joblib.dump(MinMaxScaler().fit(healthy), paths["scaler"])
+    series = {}
+    for u in range(args.units):
+        frames, start = [], np.datetime64("2020-06-01T00:00")
+        for i, (profile, minutes) in enumerate(PHASES):
+            frames.append(synthetic_compressor(minutes * 6, start=str(start), profile=profile, seed=100 * u + i))
+            start += np.timedelta64(minutes, "m")
+        series[f"unit-{u}"] = pd.concat(frames)[RAW_SENSOR_COLS]
+    publish_version("v1")
+    detector.load_artifacts()
+    timeline = detector.predict_timeline(series["unit-0"])
+    risk = np.array(timeline["risk_scores"])
+    # Index timeline i = window yang berakhir di menit i + TIME_STEPS - 1
+    phase_end = np.cumsum([minutes for _, minutes in PHASES]) - (TIME_STEPS - 1)
+    normal, failing = risk[: phase_end[0]], risk[phase_end[1] : phase_end[2]]
+    thresh_warning = float(np.quantile(normal, 0.97))
+    thresh_critical = float(max(np.quantile(failing, 0.25), thresh_warning * 1.2))
+    config = joblib.load(paths["config"])
+    config.update(threshold_critical=thresh_critical, threshold_warning=thresh_warning)
+    joblib.dump(config, paths["config"])
+
+    # Satu request per menit per unit: window 35 menit terakhir (seperti polling dashboard / edge gateway)
+    bodies = {}
+    for unit_id, frame in series.items():
+        values, index = frame.to_numpy(), frame.index
+        bodies[unit_id] = [
+            json.dumps({"unit_id": unit_id, "readings": [
+                {"timestamp": ts.isoformat(), **dict(zip(RAW_SENSOR_COLS, map(float, row)))}
+                for ts, row in zip(index[end - WINDOW_MINUTES * 6 : end], values[end - WINDOW_MINUTES * 6 : end])
+            ]}).encode()
+            for end in range(WINDOW_MINUTES * 6, len(frame) + 1, 6)
+        ]
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "ALERT_WEBHOOK_URL": receiver.url, "LOG_LEVEL": "WARNING"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "api.serve", "--workers", "1", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_workers(base_url, 1)
+        received, stop = [], threading.Event()
+        listener = threading.Thread(target=sse_listener, args=(base_url, received, stop), daemon=True)
+        listener.start()
+        time.sleep(0.5)
+
+        severities, latencies, elapsed = asyncio.run(drive_units(base_url, bodies))
+
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            engine = httpx.get(f"{base_url}/alerts").json()["engine"]
+            if engine["pending"] == 0 and len(received) >= engine["events"] and len(receiver.events) >= engine["events"]:
+                break
+            time.sleep(0.1)
+        stop.set()
+        metrics = [line for line in httpx.get(f"{base_url}/metrics").text.splitlines()
+                   if line.startswith("metropt_alert")]
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        receiver.stop()
+
+    n_requests = sum(len(b) for b in bodies.values())
+    flips = sum(count_changes(levels) for levels in severities.values())
+    sse_ids = [event["id"] for event, _ in received]
+    webhook_ids = [event["id"] for event in receiver.events]
+    delay_ms = [(at - event["emitted_at"]) * 1000 for event, at in received]
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"\nend-to-end: {args.units} unit x {len(bodies['unit-0'])} window ({n_requests} POST /predict), "
+          f"threshold warning {thresh_warning:.4f} / critical {thresh_critical:.4f}")
+    print(f"  /predict           : {n_requests / elapsed:.1f} req/s, p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+    print(f"  perubahan severity : {flips} (per window, tanpa hysteresis)")
+    print(f"  event alert        : {engine['events']} (engine), SSE {len(sse_ids)}, webhook {len(webhook_ids)} "
+          f"dalam {receiver.requests} POST")
+    print(f"  urutan & kelengkapan: SSE == webhook: {sorted(sse_ids) == sorted(webhook_ids)}")
+    if delay_ms:
+        print(f"  delay SSE          : p50 {np.percentile(delay_ms, 50):.1f} ms, maks {max(delay_ms):.1f} ms "
+              "(dari event dibuat sampai diterima client)")
+    for unit_id in list(severities)[:3]:
+        path = [f"{e['from']}->{e['to']}@{e['timestamp'][11:16]}" for e, _ in received if e["unit_id"] == unit_id]
+        print(f"  {unit_id:<8} {', '.join(path)}")
+    print("  " + "\n  ".join(metrics))
+
+    # WebSocket in-process (uvicorn di server butuh paket websockets; TestClient tidak)
+    with TestClient(app) as client:
+        with client.websocket_connect("/alerts/ws") as ws:
+            for minute in range(6):
+                alert_engine.submit("ws-unit", np.datetime64("2020-06-01T00:00") + np.timedelta64(minute, "m"),
+                                    thresh_critical * 2, 2, thresh_critical, thresh_warning, "v1")
+            event = ws.receive_json()
+    print(f"\nWebSocket /alerts/ws: {event['unit_id']} {event['from']} -> {event['to']} (id {event['id']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Parity + cold start + latency per backend inference (keras, tflite, onnx, numpy).
+
+    python -m src.models.train --export-only    # sekali, untuk membuat artefak TFLite/ONNX/NumPy
+    python -m benchmarks.bench_backends
+
+Parity: risk score (MAE rekonstruksi) tiap window data/test_samples dibandingkan dengan backend keras
+(selisih relatif, karena LSTM relu tidak terbatas dan risk score bisa sangat besar di luar rentang training).
+"""
+import argparse
+import json
+import time
+
+START = time.perf_counter()
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ROOT_DIR, peak_rss_mb, run_isolated, timed
+from src.data.preprocessing import process_input_data, prepare_lstm_sequence
+from src.models.backends import BACKENDS, load_backend
+from src.utils.config import SCALER_PATH, TIME_STEPS
+
+SAMPLES_DIR = ROOT_DIR / "data" / "test_samples"
+
+
+def load_sample_windows():
+    scaler = joblib.load(SCALER_PATH)
+    windows = []
+    for path in sorted(SAMPLES_DIR.glob("*.csv")):
+        df = pd.read_csv(path, parse_dates=["timestamp"], index_col="timestamp")
+        windows.append(prepare_lstm_sequence(scaler.transform(process_input_data(df)), TIME_STEPS))
+    return np.concatenate(windows).astype(np.float32)
+
+
+def cold_start(name):
+    # Dijalankan di proses baru: waktu dari start interpreter sampai prediksi pertama selesai
+    backend = load_backend(name)
+    backend.predict(np.zeros((1, TIME_STEPS, 11), dtype=np.float32))
+    return {"backend": name, "cold_start_s": round(time.perf_counter() - START, 3), "rss_mb": round(peak_rss_mb(), 1)}
+
+
+def latency_ms(backend, X, repeats):
+    backend.predict(X)
+    _, seconds = timed(lambda: [backend.predict(X) for _ in range(repeats)])
+    return seconds / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--rtol", type=float, default=1e-3, help="Toleransi selisih relatif risk score.")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--child")
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(cold_start(args.child)))
+        return
+
+    X = load_sample_windows()
+    reference = None
+    print(f"{len(X)} window dari {SAMPLES_DIR}\n")
+    print(f"{'backend':<8}{'max_rel_diff':>15}{'cold_start_s':>14}{'rss_mb':>9}{'lat_b1_ms':>11}{'lat_b64_ms':>12}")
+
+    for name in args.backends:
+        try:
+            backend = load_backend(name)
+        except (ImportError, OSError, ValueError) as e:
+            print(f"{name:<8} dilewati: {e}")
+            continue
+
+        risk = np.mean(np.abs(backend.predict(X) - X), axis=(1, 2))
+        if reference is None:
+            reference = risk
+        max_diff = float(np.max(np.abs(risk - reference) / np.maximum(np.abs(reference), 1e-6)))
+        status = "OK" if max_diff <= args.rtol else "GAGAL"
+
+        cold = run_isolated("benchmarks.bench_backends", name)
+        print(f"{name:<8}{max_diff:>15.2e}{cold['cold_start_s']:>14}{cold['rss_mb']:>9}"
+              f"{latency_ms(backend, X[:1], args.repeats):>11.2f}{latency_ms(backend, X[:64], args.repeats):>12.2f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark PredictionBatcher: satu window per forward pass (max_batch_size=1) vs micro-batching.
+
+    python -m benchmarks.bench_batching --concurrency 1 8 32 64
+
+Tanpa TensorFlow, --backend synthetic memakai model tiruan (overhead tetap + biaya per window).
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from src.batching import PredictionBatcher
+from src.utils.config import FEATURE_COLS, TIME_STEPS
+
+
+def make_predict_fn(backend):
+    if backend == "keras":
+        from src.models.train import build_autoencoder
+
+        model = build_autoencoder((TIME_STEPS, len(FEATURE_COLS)))
+        # Warm-up: dua bentuk batch pertama memicu tracing
+        for n in (1, 2, 3):
+            model.predict_on_batch(np.zeros((n, TIME_STEPS, len(FEATURE_COLS)), dtype=np.float32))
+        return lambda X, context: np.asarray(model.predict_on_batch(X))
+
+    def synthetic(X, context):
+        time.sleep(0.004 + 0.00005 * len(X))
+        return X
+    return synthetic
+
+
+async def run_load(batcher, concurrency, requests_per_client):
+    window = np.random.default_rng(0).random((TIME_STEPS, len(FEATURE_COLS)), dtype=np.float32)
+    latencies = []
+
+    async def client():
+        for _ in range(requests_per_client):
+            start = time.perf_counter()
+            await batcher.submit(window)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return len(latencies) / elapsed, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["keras", "synthetic"], default="keras")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=50, help="Request per client.")
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    predict_fn = make_predict_fn(args.backend)
+    configs = {
+        "unbatched": dict(max_batch_size=1, max_wait_ms=0),
+        "batched": dict(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms),
+    }
+
+    print(f"{'mode':<10}{'conc':>6}{'req/s':>10}{'p50_ms':>10}{'p99_ms':>10}{'mean_batch':>12}")
+    for concurrency in args.concurrency:
+        for name, config in configs.items():
+            batcher = PredictionBatcher(predict_fn, **config)
+            throughput, p50, p99 = asyncio.run(run_load(batcher, concurrency, args.requests))
+            mean_batch = batcher.stats.snapshot()["mean_batch_size"]
+            print(f"{name:<10}{concurrency:>6}{throughput:>10.1f}{p50:>10.2f}{p99:>10.2f}{mean_batch:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cache rekonstruksi per window (src/cache.py): kesetaraan dengan forward pass langsung, prefix yang tumbuh
+seperti dashboard (/predict/timeline diulang dengan data makin panjang), /predict dengan payload identik,
+batas byte LRU, dan invalidasi saat hot-swap versi model.
+
+    python -m benchmarks.bench_cache
+    python -m benchmarks.bench_cache --hours 12 --step-minutes 10 --repeat 50
+
+Memakai artefak tiruan (NumpyBackend) di MODELS_DIR sementara, tanpa TensorFlow.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=int, default=6, help="Panjang data upload dashboard (pembacaan tiap 10 detik).")
+    parser.add_argument("--step-minutes", type=int, default=10, help="Pertambahan data per refresh dashboard.")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    # Konfigurasi harus di-set sebelum modul src/api diimport
+    os.environ["MODELS_DIR"] = tempfile.mkdtemp(prefix="metropt-models-")
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+    os.environ["HISTORY_ENABLED"] = "0"
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    from benchmarks.bench_preprocessing import synthetic_raw
+    from benchmarks.common import timed, write_synthetic_artifacts
+    from src.cache import WindowCache, window_keys
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR, TIME_STEPS, FEATURE_COLS
+    from src.data.preprocessing import process_input_data, prepare_lstm_sequence
+    from api.main import app
+    from src.inference import detector
+
+    write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    publish_version("v1")
+    detector.load_artifacts()
+    bundle = detector.acquire()
+    raw = synthetic_raw(args.hours * 360, seed=3)
+
+    # 1. Hasil dari cache == forward pass langsung (termasuk batch campuran hit + miss)
+    X_seq = prepare_lstm_sequence(bundle.scaler.transform(process_input_data(raw)), TIME_STEPS)
+    direct = detector.forward(X_seq, bundle=bundle)
+    detector.cache.clear()
+    detector.reconstruct(X_seq[::2], bundle=bundle)
+    mixed = detector.reconstruct(X_seq, bundle=bundle)
+    cached = detector.reconstruct(X_seq, bundle=bundle)
+    for label, got in (("batch campuran", mixed), ("semua dari cache", cached)):
+        diff = float(np.abs(got - direct).max())
+        assert diff < 1e-5, f"{label}: {diff}"
+        print(f"setara  {label:<18} {len(X_seq)} window, selisih maks {diff:.2e}")
+
+    # 2. Dashboard: timeline diulang dengan prefix yang tumbuh step_minutes setiap refresh
+    step = args.step_minutes * 6
+    prefixes = [raw.iloc[:n] for n in range(step * 4, len(raw) + 1, step)]
+    print(f"\ndashboard: {len(prefixes)} refresh /predict/timeline, +{args.step_minutes} menit per refresh")
+    for enabled in (False, True):
+        detector.cache.clear()
+        detector.cache.enabled = enabled
+        before = detector.cache.stats()
+        results, seconds = timed(lambda: [detector.predict_timeline(prefix) for prefix in prefixes])
+        after = detector.cache.stats()
+        if enabled:
+            assert np.allclose(results[-1]["risk_scores"], reference[-1]["risk_scores"], atol=1e-6)
+            hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+            print(f"  cache  : {seconds * 1000:>9.1f} ms total, hit ratio {hits / (hits + misses):.3f}, "
+                  f"{after['entries']} entri / {after['bytes'] / 2**20:.1f} MiB")
+        else:
+            reference = results
+            print(f"  tanpa  : {seconds * 1000:>9.1f} ms total")
+
+    # 3. /predict dengan payload identik (mis. test_api.py dijalankan ulang)
+    window = raw.iloc[: (TIME_STEPS + 5) * 6]
+    payload = {"readings": [
+        {"timestamp": ts.isoformat(), **{col: float(value) for col, value in row.items()}}
+        for ts, row in window.iterrows()
+    ]}
+    with TestClient(app) as client:
+        def post():
+            response = client.post("/predict", json=payload)
+            assert response.status_code == 200, response.text
+            return response.json()
+
+        def post_cold():
+            detector.cache.clear()
+            return post()
+
+        miss_result = post_cold()
+        miss = np.median([timed(post_cold)[1] for _ in range(args.repeat)])
+        hit = np.median([timed(post)[1] for _ in range(args.repeat)])
+        assert post()["risk_score"] == miss_result["risk_score"]
+
+        X_one = detector.prepare_window(window, bundle)[0]
+        forward_s = np.median([timed(detector.forward, X_one, bundle=bundle)[1] for _ in range(args.repeat)])
+        lookup_s = np.median([timed(detector.cached_reconstruction, X_one, bundle)[1] for _ in range(args.repeat)])
+        print(f"\n/predict payload identik (median {args.repeat}x):")
+        print(f"  request miss   : {miss * 1000:>8.2f} ms")
+        print(f"  request hit    : {hit * 1000:>8.2f} ms (tanpa forward pass dan antrian batcher)")
+        print(f"  forward pass   : {forward_s * 1e6:>8.1f} us")
+        print(f"  lookup cache   : {lookup_s * 1e6:>8.1f} us (hash + LRU)")
+
+        # 4. Hot-swap: cache versi lama dikosongkan, versi baru dihitung ulang
+        entries = detector.cache.stats()["entries"]
+        write_synthetic_artifacts(VERSIONS_DIR / "v2", seed=1)
+        publish_version("v2")
+        assert detector.reload_if_changed()
+        stats = detector.cache.stats()
+        assert stats["entries"] == 0 and detector.bundle.version == "v2", stats
+        swapped = post()
+        assert swapped["risk_score"] != miss_result["risk_score"]
+        print(f"\nhot-swap v1 -> v2: {entries} entri dibuang, skor versi baru {swapped['risk_score']:.4f} "
+              f"(v1 {miss_result['risk_score']:.4f})")
+
+    # 5. Batas byte: LRU kecil tidak pernah melewati max_bytes
+    small = WindowCache(max_bytes=256 * 1024)
+    keys = window_keys(X_seq, "v1")
+    start = time.perf_counter()
+    small.store(keys, direct)
+    store_us = (time.perf_counter() - start) / len(keys) * 1e6
+    stats = small.stats()
+    assert 0 < stats["bytes"] <= stats["max_bytes"] and stats["evictions"] == len(keys) - stats["entries"], stats
+    entry_bytes = TIME_STEPS * len(FEATURE_COLS) * 4
+    print(f"\nLRU 256 KiB: {stats['entries']} entri ({entry_bytes} B rekonstruksi/entri), "
+          f"{stats['evictions']} eviction, store {store_us:.1f} us/window")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark kalibrasi threshold: pandas mask per periode + precision_recall_curve + 4 metrik sklearn (lama)
+vs searchsorted + satu sort (exact) vs histogram per chunk.
+
+    python -m benchmarks.bench_calibration --sizes 163000 10000000
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import precision_recall_curve, accuracy_score, precision_score, recall_score
+
+from benchmarks.common import timed
+from src.models.calibration import FAILURE_PERIODS, failure_labels, calibrate
+
+
+def legacy_calibrate(scores, timestamps):
+    eval_df = pd.DataFrame({'Risk_Score': scores}, index=pd.DatetimeIndex(timestamps))
+    eval_df['y_true_manual'] = 0
+    for start, end, _ in FAILURE_PERIODS:
+        mask = (eval_df.index >= start) & (eval_df.index <= end)
+        eval_df.loc[mask, 'y_true_manual'] = 1
+
+    precisions, recalls, thresholds = precision_recall_curve(eval_df['y_true_manual'], eval_df['Risk_Score'])
+    f1_scores = 2 * (precisions * recalls) / (precisions + recalls + 1e-6)
+    best_idx = np.argmax(f1_scores)
+    best_threshold = float(thresholds[best_idx])
+
+    eval_df['y_pred'] = (eval_df['Risk_Score'] >= best_threshold).astype(int)
+    return {
+        "threshold_critical": best_threshold,
+        "accuracy": accuracy_score(eval_df['y_true_manual'], eval_df['y_pred']),
+        "precision": precision_score(eval_df['y_true_manual'], eval_df['y_pred'], zero_division=0),
+        "recall": recall_score(eval_df['y_true_manual'], eval_df['y_pred'], zero_division=0),
+        "f1_score": float(f1_scores[best_idx]),
+    }
+
+
+def synthetic_scores(n):
+    """Score per menit mulai April; periode rusak diberi score lebih tinggi."""
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range("2020-04-01", periods=n, freq="1min").values
+    labels = failure_labels(timestamps)
+    scores = rng.gamma(2.0, 0.03, n) + labels * rng.gamma(2.0, 0.05, n)
+    return scores.astype(np.float32), timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[163_000, 2_000_000, 10_000_000])
+    args = parser.parse_args()
+
+    print(f"{'n':>10}{'mode':>11}{'seconds':>10}{'threshold':>12}{'f1':>9}")
+    for n in args.sizes:
+        scores, timestamps = synthetic_scores(n)
+        legacy, legacy_s = timed(legacy_calibrate, scores, timestamps)
+        print(f"{n:>10}{'legacy':>11}{legacy_s:>10.3f}{legacy['threshold_critical']:>12.6f}{legacy['f1_score']:>9.4f}")
+
+        for mode in ("exact", "histogram"):
+            result, seconds = timed(lambda: calibrate(scores, failure_labels(timestamps), mode))
+            print(f"{n:>10}{mode:>11}{seconds:>10.3f}{result['threshold_critical']:>12.6f}{result['f1_score']:>9.4f}")
+
+            if mode == "exact":
+                for key in ("threshold_critical", "accuracy", "precision", "recall", "f1_score"):
+                    assert np.isclose(result[key], legacy[key], rtol=1e-6), (key, result[key], legacy[key])
+            else:
+                assert abs(result["f1_score"] - legacy["f1_score"]) < 5e-3, (result["f1_score"], legacy["f1_score"])
+    print("Equivalence OK")
+
+
+if __name__ == "__main__":
+    main()
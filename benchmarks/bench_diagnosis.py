@@ -0,0 +1,97 @@
+"""
+Microbenchmark generate_report: versi lama (pandas, per window) vs generate_report_batch (NumPy).
+
+    python -m benchmarks.bench_diagnosis --sizes 1 1000 100000
+
+Versi lama diukur paling banyak --legacy-max window lalu dilaporkan sebagai biaya per window.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from src.utils.config import FEATURE_COLS, TIME_STEPS
+from src.utils.diagnosis import DIAGNOSIS_MAP, analyze_direction, generate_report, generate_report_batch
+
+THRESH_CRITICAL, THRESH_WARNING = 0.33, 0.23
+
+
+def legacy_generate_report(input_seq, reconstruction, feature_names, threshold_critical, threshold_warning):
+    mae_per_feature = np.mean(np.abs(reconstruction - input_seq), axis=1)[0]
+    risk_score = np.mean(mae_per_feature)
+    if risk_score > threshold_critical:
+        status, severity = "🔴 BAHAYA (CRITICAL)", 2
+    elif risk_score > threshold_warning:
+        status, severity = "🟡 WARNING (PERINGATAN)", 1
+    else:
+        status, severity = "🟢 AMAN (NORMAL)", 0
+
+    analysis, top_features = [], []
+    if severity > 0:
+        avg_actual = np.mean(input_seq, axis=1)[0]
+        avg_pred = np.mean(reconstruction, axis=1)[0]
+        contribution = pd.DataFrame({'Feature': feature_names, 'Error': mae_per_feature})
+        contribution = contribution.sort_values(by='Error', ascending=False)
+        top_1 = contribution.iloc[0]['Feature']
+        idx_1 = feature_names.index(top_1)
+        direction = analyze_direction(avg_actual[idx_1], avg_pred[idx_1])
+        explanation = DIAGNOSIS_MAP.get(top_1, {}).get(direction, "Anomali pola sensor.")
+        analysis.append(f"Penyebab Utama: {top_1} ({direction})")
+        analysis.append(f"Analisis: {explanation}")
+        top_features = contribution.head(3).to_dict(orient='records')
+
+    return {
+        "status": status,
+        "risk_score": float(risk_score),
+        "severity_level": severity,
+        "analysis_text": "\n".join(analysis) if analysis else "Sistem Beroperasi Normal.",
+        "top_contributing_features": top_features
+    }
+
+
+def make_batch(n, seed=0):
+    # Noise diatur agar campuran AMAN / WARNING / BAHAYA
+    rng = np.random.default_rng(seed)
+    inputs = rng.random((n, TIME_STEPS, len(FEATURE_COLS)))
+    scale = rng.uniform(0.15, 0.5, size=(n, 1, 1))
+    return inputs, inputs + rng.normal(0, 1, inputs.shape) * scale
+
+
+def check_equivalence(inputs, reconstruction):
+    for i in range(len(inputs)):
+        old = legacy_generate_report(inputs[i:i+1], reconstruction[i:i+1], FEATURE_COLS, THRESH_CRITICAL, THRESH_WARNING)
+        new = generate_report(inputs[i:i+1], reconstruction[i:i+1], FEATURE_COLS, THRESH_CRITICAL, THRESH_WARNING)
+        assert old["severity_level"] == new["severity_level"] and old["analysis_text"] == new["analysis_text"]
+        assert np.isclose(old["risk_score"], new["risk_score"])
+        assert [f["Feature"] for f in old["top_contributing_features"]] == [f["Feature"] for f in new["top_contributing_features"]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 1000, 100_000])
+    parser.add_argument("--legacy-max", type=int, default=2000)
+    args = parser.parse_args()
+
+    inputs, reconstruction = make_batch(500)
+    check_equivalence(inputs, reconstruction)
+    print("Equivalence OK (500 window)\n")
+
+    print(f"{'N':>8}{'legacy_us/win':>16}{'batch_list_us/win':>20}{'batch_cols_us/win':>20}")
+    for n in args.sizes:
+        inputs, reconstruction = make_batch(n)
+
+        n_legacy = min(n, args.legacy_max)
+        _, legacy_s = timed(lambda: [
+            legacy_generate_report(inputs[i:i+1], reconstruction[i:i+1], FEATURE_COLS, THRESH_CRITICAL, THRESH_WARNING)
+            for i in range(n_legacy)
+        ])
+        _, list_s = timed(generate_report_batch, inputs, reconstruction, FEATURE_COLS, THRESH_CRITICAL, THRESH_WARNING)
+        _, cols_s = timed(generate_report_batch, inputs, reconstruction, FEATURE_COLS, THRESH_CRITICAL, THRESH_WARNING,
+                          as_columns=True)
+
+        print(f"{n:>8}{legacy_s / n_legacy * 1e6:>16.1f}{list_s / n * 1e6:>20.1f}{cols_s / n * 1e6:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
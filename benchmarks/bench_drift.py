@@ -0,0 +1,43 @@
+"""
+Overhead drift monitor per request /predict (satu baris fitur) dan akurasi skor drift.
+
+    python -m benchmarks.bench_drift --updates 100000
+"""
+import argparse
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.monitoring.drift import DriftMonitor, build_reference_profile
+from src.utils.config import FEATURE_COLS
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    n_features = len(FEATURE_COLS)
+    reference = build_reference_profile(rng.beta(2, 5, (200_000, n_features)))
+    bundle = SimpleNamespace(version="bench", drift_reference=reference)
+
+    for name, shift in (("stable", 0.0), ("shifted", 0.15)):
+        monitor = DriftMonitor()
+        rows = np.clip(rng.beta(2, 5, (args.updates, n_features)) + shift, -0.5, 1.5)
+
+        start = time.perf_counter()
+        for row in rows:
+            monitor.update(row, bundle)
+        per_update_us = (time.perf_counter() - start) / args.updates * 1e6
+
+        start = time.perf_counter()
+        report = monitor.report()
+        report_ms = (time.perf_counter() - start) * 1000
+        print(f"{name:<8} update={per_update_us:.2f}us report={report_ms:.2f}ms "
+              f"status={report['status']} max_psi={report['max_psi']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Scan armada: N unit per menit, masing-masing 200 pembacaan (10 detik) mentah.
+
+    python -m benchmarks.bench_fleet --units 10 100 1000
+
+Mode:
+  sequential   : per unit seperti /predict (preprocessing, scaler, predict, laporan satu per satu)
+  thread_pool  : preprocessing + scaler per unit di ThreadPoolExecutor, lalu satu batch model
+  fleet        : detector.prepare_fleet (satu lintasan NumPy untuk semua unit) + satu batch model
+  api_fleet    : POST /predict/fleet end-to-end (JSON kolumnar, validasi, response)
+
+Memakai artefak tiruan (NumpyBackend) di MODELS_DIR sementara, tanpa TensorFlow.
+"""
+import argparse
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+
+def synthetic_fleet(n_units, n_rows=200, seed=0):
+    import numpy as np
+    import pandas as pd
+    from src.utils.config import RAW_SENSOR_COLS
+
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-06-01", periods=n_rows, freq="10s", name="timestamp")
+    base = np.array([8.0, 9.0, 8.5, 0.1, 9.0, 60.0, 4.0])
+    return [
+        pd.DataFrame(base + rng.normal(0, 0.2, (n_rows, len(RAW_SENSOR_COLS))), index=index, columns=RAW_SENSOR_COLS)
+        for _ in range(n_units)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Konfigurasi harus di-set sebelum modul src/api diimport
+    models_dir = tempfile.mkdtemp(prefix="metropt-models-")
+    os.environ["MODELS_DIR"] = models_dir
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+    os.environ["HISTORY_ENABLED"] = "0"
+    # Setiap repeat mengirim window yang sama: tanpa ini repeat ke-2 dst. hanya mengukur cache
+    os.environ["WINDOW_CACHE_ENABLED"] = "0"
+
+    import numpy as np
+    from fastapi.testclient import TestClient
+
+    from benchmarks.common import timed, write_synthetic_artifacts
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR, RAW_SENSOR_COLS, FLEET_BATCH_SIZE
+    from api.main import app
+    from src.inference import detector
+
+    write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    publish_version("v1")
+    detector.load_artifacts()
+    bundle = detector.acquire()
+    pool = ThreadPoolExecutor(max_workers=args.workers)
+
+    def sequential(frames):
+        reports = []
+        for frame in frames:
+            X_seq, _ = detector.prepare_window(frame, bundle)
+            reports.append(detector.build_report(X_seq, detector.reconstruct(X_seq, bundle=bundle), bundle))
+        return reports
+
+    def thread_pool(frames):
+        prepared = list(pool.map(lambda frame: detector.prepare_window(frame, bundle)[0], frames))
+        X = np.concatenate(prepared)
+        return detector.build_reports(X, detector.reconstruct(X, batch_size=FLEET_BATCH_SIZE, bundle=bundle), bundle)
+
+    def fleet(frames):
+        X, _, _, _ = detector.prepare_fleet(frames, bundle)
+        return detector.build_reports(X, detector.reconstruct(X, batch_size=FLEET_BATCH_SIZE, bundle=bundle), bundle)
+
+    def payload(frames):
+        return {"units": [
+            {
+                "unit_id": f"unit-{i}",
+                "timestamps": (frame.index.to_numpy().astype("datetime64[ms]").view(np.int64)).tolist(),
+                **{col: frame[col].tolist() for col in RAW_SENSOR_COLS}
+            }
+            for i, frame in enumerate(frames)
+        ]}
+
+    modes = {"sequential": sequential, "thread_pool": thread_pool, "fleet": fleet}
+    print(f"{'units':>6}  {'mode':<12}{'total_ms':>10}{'ms/unit':>9}{'speedup':>9}")
+    with TestClient(app) as client:
+        for n_units in args.units:
+            frames = synthetic_fleet(n_units)
+            reference = [r["risk_score"] for r in sequential(frames)]
+            timings = {}
+            for name, fn in modes.items():
+                reports = fn(frames)
+                assert np.allclose([r["risk_score"] for r in reports], reference, atol=1e-9), name
+                timings[name] = min(timed(fn, frames)[1] for _ in range(args.repeat))
+
+            body = payload(frames)
+            response = client.post("/predict/fleet", json=body)
+            assert response.status_code == 200 and response.json()["scored"] == n_units, response.text
+            timings["api_fleet"] = min(timed(client.post, "/predict/fleet", json=body)[1] for _ in range(args.repeat))
+
+            for name, seconds in timings.items():
+                speedup = timings["sequential"] / seconds
+                print(f"{n_units:>6}  {name:<12}{seconds * 1000:>10.1f}{seconds * 1000 / n_units:>9.2f}{speedup:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Riwayat skor (src/data/history.py): biaya record() di jalur request, throughput tulis batch vs
+commit per baris, dan latency query /history (raw vs rollup vs agregasi on-the-fly).
+
+    python -m benchmarks.bench_history
+    python -m benchmarks.bench_history --units 20 --days 30
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.common import timed
+from src.data.history import HistoryStore, MINUTE_MS, UPSERT_SCORE, to_epoch_ms
+from src.utils.config import FEATURE_COLS, HISTORY_FLUSH_ROWS
+
+START = to_epoch_ms("2020-04-01")
+
+
+def synthetic_items(units, minutes, seed=0):
+    rng = np.random.default_rng(seed)
+    for u in range(units):
+        risk = np.abs(rng.normal(0.2, 0.1, minutes))
+        mae = rng.random((minutes, len(FEATURE_COLS)), dtype=np.float32)
+        for m in range(minutes):
+            yield (f"unit-{u:03d}", START + m * MINUTE_MS, float(risk[m]), int(risk[m] > 0.4), mae[m], "bench")
+
+
+def bench_record(store, n=100_000):
+    report = {"risk_score": 0.1, "severity_level": 0}
+    mae = np.zeros(len(FEATURE_COLS), dtype=np.float32)
+    start = time.perf_counter()
+    for i in range(n):
+        store.record("unit-000", np.datetime64(START + i * MINUTE_MS, "ms"), report, mae)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+def bench_per_row(path, items):
+    store = HistoryStore(Path(path))
+    conn = store._connect()
+    start = time.perf_counter()
+    for unit_id, ts, risk, severity, mae, version in items:
+        with conn:
+            conn.execute(UPSERT_SCORE, (unit_id, ts, risk, severity, "[]", mae.tobytes(), version))
+    return len(items) / (time.perf_counter() - start)
+
+
+def bench_batched(store, items, batch_rows=HISTORY_FLUSH_ROWS):
+    start = time.perf_counter()
+    for i in range(0, len(items), batch_rows):
+        store.write_batch(items[i : i + batch_rows])
+    return len(items) / (time.perf_counter() - start)
+
+
+def best_ms(fn, repeat=5):
+    return round(min(timed(fn)[1] for _ in range(repeat)) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=10)
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--per-row-sample", type=int, default=5_000, help="Baris untuk mode commit per baris.")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-history-"))
+    minutes = args.days * 24 * 60
+    items = list(synthetic_items(args.units, minutes))
+
+    queue_store = HistoryStore(workdir / "queue.db", queue_size=200_000)
+    print(f"record() di jalur request : {bench_record(queue_store):.2f} us/panggilan (hanya antrian)")
+
+    per_row = bench_per_row(workdir / "per_row.db", items[: args.per_row_sample])
+    store = HistoryStore(workdir / "history.db")
+    batched = bench_batched(store, items)
+    print(f"tulis commit per baris    : {per_row:>10,.0f} baris/s (tanpa rollup)")
+    print(f"tulis batch {HISTORY_FLUSH_ROWS} + rollup  : {batched:>10,.0f} baris/s ({len(items):,} baris)")
+
+    unit = "unit-000"
+    end = START + (minutes - 1) * MINUTE_MS
+    conn = store._reader()
+    on_the_fly = (
+        "SELECT ts - ts % ? AS bucket, COUNT(*), MIN(risk_score), AVG(risk_score), MAX(risk_score), MAX(severity) "
+        "FROM scores WHERE unit_id = ? AND ts BETWEEN ? AND ? GROUP BY bucket ORDER BY bucket"
+    )
+    cases = [
+        ("24 jam raw", lambda: store.query(unit, end - 24 * 60 * MINUTE_MS, end, "raw")),
+        ("7 hari 5m rollup", lambda: store.query(unit, end - 7 * 24 * 60 * MINUTE_MS, end, "5m")),
+        ("7 hari 5m on-the-fly", lambda: conn.execute(
+            on_the_fly, (5 * MINUTE_MS, unit, end - 7 * 24 * 60 * MINUTE_MS, end)).fetchall()),
+        (f"{args.days} hari 1h rollup", lambda: store.query(unit, START, end, "1h")),
+        (f"{args.days} hari 1h on-the-fly", lambda: conn.execute(
+            on_the_fly, (60 * MINUTE_MS, unit, START, end)).fetchall()),
+    ]
+    print(f"\n{'query':<28}{'ms':>8}")
+    for name, fn in cases:
+        print(f"{name:<28}{best_ms(fn):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark ingestion: pd.read_csv CSV mentah penuh + slicing vs cache kolumnar (src/data/store.py).
+
+    python -m benchmarks.bench_ingestion
+    python -m benchmarks.bench_ingestion --synthetic-rows 1500000   # tanpa dataset asli
+
+Mode "build" = konversi CSV -> cache (sekali), "store" = baca rentang dari cache yang sudah ada.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import peak_rss_mb, run_isolated, timed
+from src.data.store import SensorStore
+from src.utils.config import RAW_CSV_PATH, RAW_SENSOR_COLS
+
+MODES = ["csv", "build", "store"]
+
+# Rentang yang dipakai training, evaluasi dan generator sampel
+RANGES = [
+    ("2020-02-01", "2020-03-01"),
+    ("2020-04-01", None),
+    ("2020-02-05 10:00:00", "2020-02-05 11:00:00"),
+]
+
+# Kolom lain di CSV asli (tidak dipakai model)
+EXTRA_COLS = ["COMP", "DV_eletric", "Towers", "MPG", "LPS", "Pressure_switch", "Oil_level", "Caudal_impulses"]
+
+
+def write_synthetic_csv(path, rows):
+    """CSV tiruan dengan kolom dan format timestamp sama seperti MetroPT3 (sampling 10 detik)."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.random((rows, len(RAW_SENSOR_COLS))) * 10, columns=RAW_SENSOR_COLS)
+    for col in EXTRA_COLS:
+        df[col] = rng.integers(0, 2, rows).astype(float)
+    df.insert(0, "timestamp", pd.date_range("2020-02-01", periods=rows, freq="10s").strftime("%Y-%m-%d %H:%M:%S"))
+    df.to_csv(path)
+    return path
+
+
+def read_csv_full(csv_path):
+    df = pd.read_csv(csv_path)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def run_mode(mode, csv_path, cache_dir):
+    store = SensorStore(csv_path, Path(cache_dir))
+    rss_before = peak_rss_mb()
+
+    if mode == "csv":
+        def load():
+            df = read_csv_full(csv_path)
+            return [len(df[start:end]) for start, end in RANGES]
+    elif mode == "build":
+        load = lambda: [store.build()["rows"]]
+    else:
+        load = lambda: [len(store.load_range(start, end)) for start, end in RANGES]
+
+    rows, seconds = timed(load)
+    return {
+        "mode": mode,
+        "seconds": round(seconds, 3),
+        "rows": rows,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "extra_rss_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+def check_equivalence(csv_path, cache_dir):
+    """Rentang dari cache harus sama dengan slicing CSV (dalam presisi float32)."""
+    df = read_csv_full(csv_path)
+    store = SensorStore(csv_path, Path(cache_dir))
+    for start, end in RANGES:
+        expected = df[start:end][RAW_SENSOR_COLS]
+        actual = store.load_range(start, end)
+        assert actual.index.equals(expected.index), f"Index berbeda untuk {start}..{end}"
+        np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(np.float32), rtol=1e-6)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=RAW_CSV_PATH)
+    parser.add_argument("--synthetic-rows", type=int, default=0, help="Buat CSV tiruan sebanyak N baris.")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "CSV", "CACHE_DIR"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(*args.child)))
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-ingest-"))
+    csv_path = args.csv
+    if args.synthetic_rows:
+        csv_path = write_synthetic_csv(workdir / "synthetic.csv", args.synthetic_rows)
+    cache_dir = workdir / "cache"
+
+    # Urutan penting: "build" mengisi cache yang dibaca mode "store"
+    results = [run_isolated("benchmarks.bench_ingestion", mode, csv_path, cache_dir) for mode in MODES]
+    print(f"{'mode':<8}{'seconds':>10}{'peak_rss_mb':>14}{'extra_rss_mb':>14}  rows")
+    for r in results:
+        print(f"{r['mode']:<8}{r['seconds']:>10}{r['peak_rss_mb']:>14}{r['extra_rss_mb']:>14}  {r['rows']}")
+
+    check_equivalence(csv_path, cache_dir)
+    print("Equivalence OK")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Overhead instrumentasi per tahap: stage() dengan METRICS_ENABLED=1, =0, dan dengan trace request aktif.
+
+    python -m benchmarks.bench_instrumentation --iterations 200000
+"""
+import argparse
+import time
+
+import src.utils.logger as logger_module
+from src.utils.logger import stage, start_trace, end_trace
+
+
+def per_call_ns(iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with stage("bench"):
+            pass
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        pass
+    baseline = (time.perf_counter() - start) / args.iterations * 1e9
+
+    logger_module.METRICS_ENABLED = False
+    disabled = per_call_ns(args.iterations)
+
+    logger_module.METRICS_ENABLED = True
+    enabled = per_call_ns(args.iterations)
+
+    _, token = start_trace()
+    traced = per_call_ns(args.iterations)
+    end_trace(token)
+
+    print(f"loop kosong      : {baseline:8.0f} ns")
+    print(f"stage nonaktif   : {disabled:8.0f} ns")
+    print(f"stage aktif      : {enabled:8.0f} ns")
+    print(f"stage + trace    : {traced:8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
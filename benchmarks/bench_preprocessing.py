@@ -0,0 +1,138 @@
+"""
+process_input_data: implementasi pandas lama (resample + diff + rolling) vs engine NumPy (reduceat).
+
+    python -m benchmarks.bench_preprocessing                      # cek kesetaraan + waktu/alokasi
+    python -m benchmarks.bench_preprocessing --rows 360 43200 1000000
+
+Kesetaraan dicek pada data/test_samples/*.csv, data sintetis dengan NaN/gap/urutan acak,
+dan iter_feature_chunks per chunk vs sekali jalan.
+"""
+import argparse
+import json
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ROOT_DIR, run_isolated, timed
+from src.data.preprocessing import process_input_data, iter_feature_chunks
+from src.utils.config import RAW_SENSOR_COLS, FEATURE_COLS
+
+MODES = ["legacy", "numpy"]
+# Relatif terhadap nilai maksimum; input float32 dihitung pandas sebagian dalam float32
+TOLERANCE = {np.dtype(np.float64): 1e-9, np.dtype(np.float32): 1e-6}
+SAMPLES_DIR = ROOT_DIR / "data" / "test_samples"
+
+
+def legacy_add_features(df_clean):
+    df_clean['TP2_grad'] = df_clean['TP2'].diff().fillna(0)
+    df_clean['Oil_temp_grad'] = df_clean['Oil_temperature'].diff().fillna(0)
+    df_clean['Efficiency_Index'] = df_clean['TP3'] / (df_clean['Motor_current'] + 0.1)
+    df_clean['TP3_roll_std'] = df_clean['TP3'].rolling(window=5).std().fillna(0)
+    return df_clean[FEATURE_COLS].dropna()
+
+
+def legacy_process_input_data(df):
+    df_clean = df[RAW_SENSOR_COLS].copy()
+    if isinstance(df_clean.index, pd.DatetimeIndex):
+        df_clean = df_clean.resample('1min').mean().dropna()
+    return legacy_add_features(df_clean)
+
+
+def synthetic_raw(n_rows, seed=0, messy=False):
+    """Pembacaan tiap 10 detik; messy=True menambah NaN, gap beberapa menit dan urutan acak."""
+    rng = np.random.default_rng(seed)
+    timestamps = pd.Timestamp("2020-02-01").value + np.arange(n_rows, dtype=np.int64) * 10**10
+    values = rng.normal(5.0, 2.0, size=(n_rows, len(RAW_SENSOR_COLS)))
+    if messy:
+        timestamps = timestamps + rng.integers(0, 10**10, n_rows)
+        values[rng.random(values.shape) < 0.02] = np.nan
+        # Satu kolom kosong selama satu menit penuh -> bar itu dibuang dropna
+        values[60:66, 2] = np.nan
+        keep = (timestamps // (60 * 10**9)) % 17 != 3
+        timestamps, values = timestamps[keep], values[keep]
+        order = rng.permutation(len(timestamps))
+        timestamps, values = timestamps[order], values[order]
+    index = pd.DatetimeIndex(timestamps.view("datetime64[ns]"), name="timestamp")
+    return pd.DataFrame(values.astype(np.float32), index=index, columns=RAW_SENSOR_COLS)
+
+
+def assert_equivalent(expected, actual, label, dtype=np.float64):
+    assert list(actual.columns) == FEATURE_COLS, label
+    assert len(actual) == len(expected), f"{label}: {len(actual)} baris != {len(expected)}"
+    assert (actual.index == expected.index).all(), f"{label}: index berbeda"
+    diff = np.abs(actual.to_numpy(np.float64) - expected.to_numpy(np.float64))
+    assert np.nanmax(diff, initial=0.0) <= TOLERANCE[np.dtype(dtype)] * max(1.0, np.nanmax(np.abs(expected.to_numpy(np.float64)))), (
+        f"{label}: selisih maksimum {diff.max()}"
+    )
+    return float(diff.max(initial=0.0))
+
+
+def check_equivalence():
+    cases = {}
+    for path in sorted(SAMPLES_DIR.glob("*.csv")):
+        cases[path.name] = pd.read_csv(path, index_col="timestamp", parse_dates=True)
+    cases["synthetic_clean"] = synthetic_raw(20_000)
+    cases["synthetic_messy"] = synthetic_raw(20_000, seed=1, messy=True)
+    cases["no_datetime_index"] = synthetic_raw(500, seed=2, messy=True).reset_index(drop=True)
+
+    results = {}
+    for name, df in cases.items():
+        dtype = df[RAW_SENSOR_COLS].to_numpy().dtype
+        results[name] = assert_equivalent(legacy_process_input_data(df), process_input_data(df), name, dtype)
+
+    # Chunk per 6 jam (batas menit) harus sama dengan sekali jalan
+    df = synthetic_raw(50_000, seed=3)
+    chunks = (group for _, group in df.groupby(df.index.floor("6h")))
+    results["iter_feature_chunks"] = assert_equivalent(
+        legacy_process_input_data(df), pd.concat(list(iter_feature_chunks(chunks))), "iter_feature_chunks", np.float32
+    )
+    return results
+
+
+def run_mode(mode, rows, repeat=5):
+    df = synthetic_raw(int(rows))
+    process = legacy_process_input_data if mode == "legacy" else process_input_data
+    process(df.iloc[:1000])  # pemanasan import/cache
+
+    seconds = min(timed(process, df)[1] for _ in range(repeat))
+    # Puncak alokasi sementara (numpy/pandas melapor ke tracemalloc), bukan RSS proses
+    tracemalloc.start()
+    out = process(df)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mode": mode,
+        "rows": int(rows),
+        "bars": len(out),
+        "seconds": round(seconds, 4),
+        "alloc_peak_mb": round(peak / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[360, 43_200, 1_000_000])
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(*args.child)))
+        return
+
+    for name, max_diff in check_equivalence().items():
+        print(f"setara  {name:<24} selisih maks {max_diff:.2e}")
+
+    print(f"\n{'rows':>9}  {'mode':<8}{'seconds':>10}{'alloc_peak_mb':>15}{'speedup':>9}")
+    results = []
+    for rows in args.rows:
+        pair = [run_isolated("benchmarks.bench_preprocessing", mode, rows) for mode in MODES]
+        for r in pair:
+            speedup = pair[0]["seconds"] / r["seconds"] if r["seconds"] else float("inf")
+            print(f"{r['rows']:>9}  {r['mode']:<8}{r['seconds']:>10}{r['alloc_peak_mb']:>15}{speedup:>8.1f}x")
+        results.extend(pair)
+    return results
+
+
+if __name__ == "__main__":
+    main()
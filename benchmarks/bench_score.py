@@ -0,0 +1,118 @@
+"""
+Bulk scoring offline (src/score.py): kesetaraan dengan /predict/timeline, resume dari checkpoint,
+sumber CSV vs Parquet, dan throughput window/detik per jumlah worker.
+
+    python -m benchmarks.bench_score
+    python -m benchmarks.bench_score --days 30 --workers 1 2 4
+
+Memakai artefak tiruan (NumpyBackend) di MODELS_DIR sementara, tanpa TensorFlow maupun dataset asli.
+"""
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+
+# Periode uji April-Agustus MetroPT-3 (untuk estimasi waktu backfill penuh)
+BACKFILL_WINDOWS = 153 * 24 * 60
+
+
+def read_parts(out_dir):
+    import pandas as pd
+
+    parts = sorted(Path(out_dir).glob("part-*"))
+    read = pd.read_parquet if parts[0].suffix == ".parquet" else lambda path: pd.read_csv(path, parse_dates=["timestamp"])
+    return pd.concat([read(path) for path in parts], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7, help="Hari data sintetis (pembacaan tiap 10 detik).")
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-score-"))
+    os.environ["MODELS_DIR"] = str(workdir / "models")
+    os.environ["DATA_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+
+    import numpy as np
+    import pandas as pd
+
+    from benchmarks.bench_preprocessing import synthetic_raw
+    from benchmarks.common import write_synthetic_artifacts
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR, SCORE_LOOKBACK_MINUTES
+    from src.inference import detector
+    from src.score import run_scoring
+
+    write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    publish_version("v1")
+
+    raw = synthetic_raw(args.days * 24 * 360, seed=4, messy=True).sort_index()
+    csv_path, parquet_path = workdir / "raw.csv", workdir / "raw.parquet"
+    raw.to_csv(csv_path, index_label="timestamp")
+    has_parquet = True
+    try:
+        raw.reset_index().to_parquet(parquet_path, index=False)
+    except ImportError:
+        has_parquet = False
+    output_format = "parquet" if has_parquet else "csv"
+
+    first_day = raw.index[0].normalize()
+    start = str((first_day + pd.Timedelta(days=1)).date())
+    end = str((first_day + pd.Timedelta(days=args.days - 1)).date())
+
+    # Referensi: /predict/timeline (stride 1) pada data mentah yang sama (termasuk lookback sebelum start)
+    lookback = pd.Timestamp(start) - pd.Timedelta(minutes=SCORE_LOOKBACK_MINUTES)
+    reference = detector.predict_timeline(raw.loc[lookback:end])
+    expected = pd.DataFrame({
+        "timestamp": pd.DatetimeIndex(reference["timestamps"]),
+        "risk_score": reference["risk_scores"],
+        "severity_level": reference["severity_levels"]
+    })
+    expected = expected[expected["timestamp"] >= pd.Timestamp(start)].reset_index(drop=True)
+
+    def check(out_dir, label):
+        actual = read_parts(out_dir)
+        assert len(actual) == len(expected), f"{label}: {len(actual)} window != {len(expected)}"
+        assert (actual["timestamp"].to_numpy() == expected["timestamp"].to_numpy()).all(), f"{label}: timestamp berbeda"
+        diff = np.abs(actual["risk_score"].to_numpy(np.float64) - expected["risk_score"].to_numpy())
+        assert diff.max() < 1e-5, f"{label}: selisih risk {diff.max()}"
+        assert (actual["severity_level"].to_numpy() == expected["severity_level"].to_numpy()).all(), label
+        print(f"setara  {label:<28} {len(actual)} window, selisih risk maks {diff.max():.2e}")
+
+    part_windows = max(len(expected) // 8, 1)
+    out = workdir / "out-csv"
+    run_scoring(out, start, end, csv_path, workers=1, part_windows=part_windows, output_format=output_format)
+    check(out, "sumber CSV")
+
+    # Resume: dua part terakhir "belum selesai" (file + entri manifest hilang) -> hanya dua part itu yang dihitung
+    manifest_path = out / "_manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    dropped = sorted(manifest["parts"], key=int)[-2:]
+    missing = sum(manifest["parts"].pop(part) for part in dropped)
+    manifest["completed"] = False
+    manifest_path.write_text(json.dumps(manifest))
+    for part in dropped:
+        next(out.glob(f"part-{int(part):05d}.*")).unlink()
+    resumed = run_scoring(out, start, end, csv_path, workers=1, part_windows=part_windows, output_format=output_format)
+    assert resumed["scored_now"] == missing, resumed
+    check(out, f"resume ({missing} window)")
+
+    if has_parquet:
+        out = workdir / "out-parquet-source"
+        run_scoring(out, start, end, parquet_path, workers=1, part_windows=part_windows, output_format=output_format)
+        check(out, "sumber Parquet")
+
+    print(f"\n{'workers':>8}{'windows':>10}{'seconds':>10}{'windows/s':>12}{'est. Apr-Agu':>14}")
+    for workers in args.workers:
+        out = workdir / f"out-w{workers}"
+        summary = run_scoring(out, start, end, csv_path, workers=workers, output_format=output_format)
+        check(out, f"workers={workers}")
+        rate = summary["windows_per_second"]
+        print(f"{workers:>8}{summary['windows']:>10}{summary['seconds']:>10}{rate:>12}{BACKFILL_WINDOWS / rate / 60:>12.1f}m")
+
+
+if __name__ == "__main__":
+    main()
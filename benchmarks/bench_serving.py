@@ -0,0 +1,150 @@
+"""
+Serving multi-proses (python -m api.serve): throughput dan latency POST /predict dari 1 sampai N worker,
+memori per worker (RSS, PSS = halaman bersama dibagi rata, USS = privat) dan pemakaian bersama bobot
+NumpyBackend yang di-memory-map.
+
+    python -m benchmarks.bench_serving
+    python -m benchmarks.bench_serving --workers 1 2 4 8 --concurrency 32 --requests 800
+
+Server dijalankan sebagai subprocess di port lokal (HTTP sungguhan), artefak tiruan NumpyBackend.
+Client load test berjalan di mesin yang sama dan ikut memakai CPU. Memori dibaca dari /proc (Linux).
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import ROOT_DIR
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_workers(base_url, n_workers, timeout=120):
+    """PID semua worker yang sudah memuat model (koneksi baru per cek, dibagi acak ke worker oleh kernel)."""
+    import httpx
+
+    ready, deadline = set(), time.monotonic() + timeout
+    while len(ready) < n_workers:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Hanya {len(ready)}/{n_workers} worker siap")
+        try:
+            health = httpx.get(f"{base_url}/health", timeout=5).json()
+            if health["model"]["state"] == "ready":
+                ready.add(health["worker_pid"])
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    return sorted(ready)
+
+
+def weight_mappings_kb(pid):
+    """(Rss, Pss) kB dari mapping file bobot bersama (*.mmap/*.npy) di /proc/<pid>/smaps."""
+    rss = pss = 0
+    in_weights = False
+    with open(f"/proc/{pid}/smaps") as f:
+        for line in f:
+            parts = line.split()
+            if "-" in parts[0] and len(parts) >= 5:
+                in_weights = len(parts) >= 6 and ".mmap/" in parts[-1]
+            elif in_weights and parts[0] == "Rss:":
+                rss += int(parts[1])
+            elif in_weights and parts[0] == "Pss:":
+                pss += int(parts[1])
+    return rss, pss
+
+
+async def load_test(base_url, bodies, concurrency, n_requests):
+    import httpx
+    import numpy as np
+
+    headers = {"content-type": "application/json"}
+    latencies, pending = [], iter(range(n_requests))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def worker():
+            for i in pending:
+                start = time.perf_counter()
+                response = await client.post("/predict", content=bodies[i % len(bodies)], headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return n_requests / elapsed, p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    cores = os.cpu_count() or 1
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, cores, 2 * cores}))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=400)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-serving-"))
+    env = {
+        **os.environ,
+        "MODELS_DIR": str(workdir / "models"),
+        "INFERENCE_BACKEND": "numpy",
+        "HISTORY_ENABLED": "0",
+        # Payload diulang: tanpa ini sebagian besar request hanya mengukur cache window
+        "WINDOW_CACHE_ENABLED": "0",
+        "LOG_LEVEL": "WARNING",
+    }
+    os.environ.update({key: env[key] for key in ("MODELS_DIR", "INFERENCE_BACKEND")})
+
+    from benchmarks.common import write_synthetic_artifacts
+    from benchmarks.suite import predict_payloads
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR
+    from src.utils.resources import process_memory_mb
+
+    write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    publish_version("v1")
+    bodies = predict_payloads(16)
+
+    print(f"{cores} core, konkurensi {args.concurrency}, {args.requests} request per konfigurasi\n")
+    print(f"{'workers':>7}{'req/s':>9}{'speedup':>9}{'p50_ms':>9}{'p99_ms':>9}"
+          f"{'rss/w':>8}{'pss/w':>8}{'uss/w':>8}{'pss_total':>11}{'bobot rss/pss kB':>18}")
+    baseline = None
+    for n_workers in args.workers:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "api.serve", "--workers", str(n_workers), "--host", "127.0.0.1", "--port", str(port)],
+            cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            pids = wait_for_workers(base_url, n_workers)
+            asyncio.run(load_test(base_url, bodies, args.concurrency, args.concurrency * 2))  # warm-up
+            throughput, p50, p99 = asyncio.run(load_test(base_url, bodies, args.concurrency, args.requests))
+
+            memory = [process_memory_mb(pid) for pid in pids]
+            weights = [weight_mappings_kb(pid) for pid in pids]
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        baseline = baseline or throughput
+        mean = {key: sum(m[key] for m in memory) / len(memory) for key in ("rss", "pss", "uss")}
+        weights_rss = sum(w[0] for w in weights) / len(weights)
+        weights_pss = sum(w[1] for w in weights) / len(weights)
+        print(f"{n_workers:>7}{throughput:>9.1f}{throughput / baseline:>8.2f}x{p50:>9.1f}{p99:>9.1f}"
+              f"{mean['rss']:>8.0f}{mean['pss']:>8.0f}{mean['uss']:>8.0f}{sum(m['pss'] for m in memory):>11.0f}"
+              f"{weights_rss:>11.0f} / {weights_pss:<5.0f}")
+    print("\nrss/pss/uss dalam MB per worker; bobot: mapping file *.mmap/ (pss < rss = dibagi antar worker)")
+
+
+if __name__ == "__main__":
+    main()
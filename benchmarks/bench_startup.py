@@ -0,0 +1,78 @@
+"""
+Guard waktu startup API: import api.main tanpa TensorFlow / model, dengan biaya import sendiri (di atas
+dependensi wajib numpy + pandas + fastapi) maksimal --budget detik.
+
+    python -m benchmarks.bench_startup --budget 0.25
+
+Di setiap proses probe dependensi di-import dan diukur lebih dulu, lalu api.main (schema, route, modul src);
+guard hanya memakai bagian kedua sehingga tidak bergantung pada kecepatan mesin untuk pandas/fastapi.
+Exit code 1 jika median biaya sendiri melebihi budget atau TensorFlow ikut ter-import.
+Waktu load model (detector.load_artifacts) dilaporkan terpisah sebagai informasi.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from benchmarks.common import ROOT_DIR
+
+# Dependensi wajib API (baseline) diukur dulu, biaya import-nya tidak bisa dipangkas dari api.main
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import numpy, pandas, fastapi
+baseline = time.perf_counter() - start
+import api.main
+total = time.perf_counter() - start
+print(json.dumps({"baseline_s": baseline, "own_s": total - baseline, "import_s": total,
+                  "tensorflow": "tensorflow" in sys.modules}))
+"""
+
+LOAD_PROBE = """
+import json, time
+from src.inference import detector
+start = time.perf_counter()
+detector.load_artifacts()
+print(json.dumps({"load_s": time.perf_counter() - start, "backend": detector.backend_name}))
+"""
+
+
+def probe(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=0.25,
+                        help="Batas median waktu import api.main di atas baseline numpy + pandas + fastapi (detik).")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-load", action="store_true", help="Lewati pengukuran load model.")
+    args = parser.parse_args()
+
+    runs = [probe(IMPORT_PROBE) for _ in range(args.runs)]
+    median_import = statistics.median(r["import_s"] for r in runs)
+    median_baseline = statistics.median(r["baseline_s"] for r in runs)
+    own_import = statistics.median(r["own_s"] for r in runs)
+    tensorflow_imported = any(r["tensorflow"] for r in runs)
+    print(f"import api.main : median {median_import:.3f}s dari {args.runs} run")
+    print(f"baseline        : median {median_baseline:.3f}s (numpy + pandas + fastapi)")
+    print(f"biaya sendiri   : {own_import:.3f}s (budget {args.budget:.2f}s)")
+    print(f"tensorflow      : {'ter-import' if tensorflow_imported else 'tidak ter-import'}")
+
+    if not args.skip_load:
+        try:
+            load = probe(LOAD_PROBE)
+            print(f"load model      : {load['load_s']:.3f}s (backend {load['backend']})")
+        except subprocess.CalledProcessError as e:
+            print(f"load model      : gagal ({e.stderr.strip().splitlines()[-1] if e.stderr else e})")
+
+    if own_import > args.budget or tensorflow_imported:
+        print("GAGAL: startup API melebihi budget.")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark persiapan data training/evaluasi: seluruh rentang di pandas (lama) vs
+chunk -> fitur memmap di disk -> window per batch (streaming).
+
+    python -m benchmarks.bench_training_data
+    python -m benchmarks.bench_training_data --synthetic-rows 6000000   # rentang lebih panjang
+
+Tanpa model: yang diukur hanya data (peak RSS & waktu), forward pass sama untuk keduanya.
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+from benchmarks.bench_ingestion import write_synthetic_csv
+from benchmarks.common import peak_rss_mb, run_isolated, timed
+from src.data.preprocessing import process_input_data, iter_feature_chunks, iter_lstm_batches
+from src.data.store import SensorStore, write_feature_memmap, scale_feature_memmap
+from src.utils.config import RAW_CSV_PATH, TIME_STEPS
+
+MODES = ["legacy", "streaming"]
+TRAIN_RANGE = ("2020-02-01", "2020-03-01")
+TEST_START = "2020-04-01"
+
+
+def prepare_legacy(store, work_dir):
+    scaler = MinMaxScaler()
+    train = scaler.fit_transform(process_input_data(store.load_range(*TRAIN_RANGE))).astype(np.float32)
+    test = scaler.transform(process_input_data(store.load_range(TEST_START))).astype(np.float32)
+    return train, test
+
+
+def prepare_streaming(store, work_dir):
+    scaler = MinMaxScaler()
+    write_feature_memmap(
+        iter_feature_chunks(store.iter_range_chunks(*TRAIN_RANGE)), work_dir / "train.f32", on_chunk=scaler.partial_fit
+    )
+    train = scale_feature_memmap(work_dir / "train.f32", scaler)
+    test, _ = write_feature_memmap(
+        iter_feature_chunks(store.iter_range_chunks(TEST_START)), work_dir / "test.f32", transform=scaler.transform
+    )
+    return train, test
+
+
+def run_mode(mode, csv_path, cache_dir):
+    store = SensorStore(csv_path, Path(cache_dir)).ensure()
+    work_dir = Path(tempfile.mkdtemp(prefix="bench-train-"))
+    rss_before = peak_rss_mb()
+
+    prepare = prepare_legacy if mode == "legacy" else prepare_streaming
+    (train, test), prep_seconds = timed(prepare, store, work_dir)
+    # Satu lintasan window seperti evaluasi (batch 1024)
+    n_windows, window_seconds = timed(lambda: sum(len(b) for b in iter_lstm_batches(test, TIME_STEPS, 1024)))
+    return {
+        "mode": mode,
+        "prep_s": round(prep_seconds, 3),
+        "windows_s": round(window_seconds, 3),
+        "train_rows": len(train),
+        "test_windows": n_windows,
+        "extra_rss_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default=RAW_CSV_PATH)
+    parser.add_argument("--synthetic-rows", type=int, default=0, help="Buat CSV tiruan sebanyak N baris.")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "CSV", "CACHE_DIR"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(*args.child)))
+        return
+
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-train-data-"))
+    csv_path = args.csv
+    if args.synthetic_rows:
+        csv_path = write_synthetic_csv(workdir / "synthetic.csv", args.synthetic_rows)
+    cache_dir = workdir / "cache"
+    SensorStore(csv_path, cache_dir).ensure()
+
+    results = [run_isolated("benchmarks.bench_training_data", mode, csv_path, cache_dir) for mode in MODES]
+    print(f"{'mode':<10}{'prep_s':>8}{'windows_s':>11}{'test_windows':>14}{'extra_rss_mb':>14}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['prep_s']:>8}{r['windows_s']:>11}{r['test_windows']:>14}{r['extra_rss_mb']:>14}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
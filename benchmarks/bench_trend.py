@@ -0,0 +1,109 @@
+"""
+Tren degradasi / RUL (src/trend.py): kesetaraan update O(1) vs regresi berbobot langsung (np.polyfit),
+biaya update per skor, dan akurasi waktu-sampai-CRITICAL pada deret dengan jarak antar skor tidak tetap.
+
+    python -m benchmarks.bench_trend
+    python -m benchmarks.bench_trend --units 10000 --updates 20
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.data.history import MINUTE_MS
+from src.trend import TrendState, TrendTracker, trend_from_series
+
+THRESH_CRITICAL, THRESH_WARNING = 0.33, 0.23
+HALF_LIFE = 60.0
+
+
+def degrading_series(n, seed=0, start=0.15, slope=0.0002, noise=0.004):
+    """Risk score naik linear (berakhir di zona WARNING) dengan noise; jarak antar skor 1-10 menit."""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([1, 1, 1, 2, 5, 10], size=n)
+    minutes = np.cumsum(steps) - steps[0]
+    scores = start + slope * minutes + rng.normal(0, noise, n)
+    timestamps = pd.Timestamp("2020-06-01") + pd.to_timedelta(minutes, unit="min")
+    true_minutes = (THRESH_CRITICAL - (start + slope * minutes[-1])) / slope
+    return timestamps, scores, true_minutes
+
+
+def check_equivalence():
+    timestamps, scores, _ = degrading_series(500)
+    order = np.random.default_rng(1).permutation(len(scores))  # termasuk skor terlambat (tidak urut)
+
+    incremental = TrendState(HALF_LIFE)
+    for t, score in zip(timestamps.as_unit("ms").asi8[order], scores[order]):
+        incremental.update(int(t), float(score))
+    vectorized = trend_from_series(timestamps[order], scores[order], HALF_LIFE)
+
+    x = (timestamps.as_unit("ms").asi8 - timestamps.as_unit("ms").asi8.max()) / MINUTE_MS
+    weights = np.exp(math.log(2) / HALF_LIFE * x)
+    slope, level = np.polyfit(x, scores, 1, w=np.sqrt(weights))
+
+    results = {}
+    for name, state in (("incremental", incremental), ("vectorized", vectorized)):
+        got_level, got_slope, _ = state.fit()
+        assert abs(got_slope - slope) < 1e-9 * max(1, abs(slope)) and abs(got_level - level) < 1e-9, name
+        results[name] = max(abs(got_slope - slope), abs(got_level - level))
+    return results
+
+
+def bench_update(units, updates):
+    tracker = TrendTracker(HALF_LIFE, max_units=units)
+    base = pd.Timestamp("2020-06-01")
+    minute = pd.Timedelta(minutes=1)
+    start = time.perf_counter()
+    for step in range(updates):
+        ts = base + step * minute
+        for unit in range(units):
+            tracker.update(f"unit-{unit}", ts, 0.1 + 0.001 * step, "v1")
+    per_update = (time.perf_counter() - start) / (units * updates) * 1e6
+
+    state = TrendState(HALF_LIFE)
+    start = time.perf_counter()
+    n = 200_000
+    for i in range(n):
+        state.update(i * MINUTE_MS, 0.1)
+    return per_update, (time.perf_counter() - start) / n * 1e6
+
+
+def accuracy(n_series=50, n_points=180):
+    """Galat estimasi menit sampai CRITICAL: tren EW (waktu nyata) vs polyfit yang menganggap jarak tetap 1 menit."""
+    errors = {"trend_ew": [], "polyfit_index": []}
+    for seed in range(n_series):
+        timestamps, scores, true_minutes = degrading_series(n_points, seed=seed)
+        report = trend_from_series(timestamps, scores, HALF_LIFE).assess(THRESH_CRITICAL, THRESH_WARNING)
+        if report["minutes_to_critical"] is not None:
+            errors["trend_ew"].append(abs(report["minutes_to_critical"] - true_minutes))
+
+        # Cara lama: sumbu x = indeks skor x langkah tetap
+        x = np.arange(len(scores), dtype=float)
+        slope, intercept = np.polyfit(x, scores, 1)
+        if slope > 0:
+            errors["polyfit_index"].append(abs((THRESH_CRITICAL - intercept) / slope - x[-1] - true_minutes))
+    return {name: float(np.median(values)) for name, values in errors.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=1000)
+    parser.add_argument("--updates", type=int, default=50)
+    args = parser.parse_args()
+
+    for name, max_diff in check_equivalence().items():
+        print(f"setara  {name:<12} vs np.polyfit berbobot, selisih maks {max_diff:.2e}")
+
+    tracker_us, state_us = bench_update(args.units, args.updates)
+    print(f"\nTrendTracker.update ({args.units} unit) : {tracker_us:.2f} us/skor (termasuk konversi timestamp + lock)")
+    print(f"TrendState.update                 : {state_us:.2f} us/skor")
+
+    print("\nmedian galat menit sampai CRITICAL (jarak antar skor 1-10 menit):")
+    for name, error in accuracy().items():
+        print(f"  {name:<14}{error:>10.1f} menit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Varian presisi TFLite (float32, float16, int8 dynamic-range): perbandingan dari training (F1/precision/recall
+pada threshold hasil kalibrasi, ukuran, latency per window; sama dengan yang dicatat di MLflow), lalu serving
+tiap varian lewat ModelBundle (INFERENCE_BACKEND=tflite, MODEL_VARIANT): throughput /predict/timeline dan
+kesamaan severity dengan float32.
+
+    python -m benchmarks.bench_variants
+    python -m benchmarks.bench_variants --epochs 2 --repeat 5
+
+Model dilatih kecil di proses terpisah dengan data sintetis (seperti benchmarks.bench_prefilter).
+"""
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import run_isolated
+
+VARIANTS = ["float16", "int8"]
+
+
+def run_training_child(workdir, epochs):
+    """Proses terpisah: training kecil dengan semua varian, kembalikan laporan variants.json versi yang dipublish."""
+    workdir = Path(workdir)
+    os.environ["MODELS_DIR"] = str(workdir / "models")
+    os.environ["DATA_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["RAW_CSV_PATH"] = str(workdir / "raw.csv")
+    os.chdir(workdir)
+
+    from src.models.registry import resolve_artifacts
+    from src.models.train import run_training
+
+    run_training(epochs=int(epochs), variants=VARIANTS)
+    _, paths = resolve_artifacts()
+    with open(paths["variants"]) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3, help="Pengulangan timeline per varian (diambil median).")
+    parser.add_argument("--child", nargs=2, metavar=("WORKDIR", "EPOCHS"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_training_child(*args.child)))
+        return
+
+    # Konfigurasi harus di-set sebelum modul src diimport (benchmarks.suite ikut mengimport src)
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-variants-"))
+    os.environ["MODELS_DIR"] = str(workdir / "models")
+    os.environ["INFERENCE_BACKEND"] = "tflite"
+    os.environ["HISTORY_ENABLED"] = "0"
+    os.environ["WINDOW_CACHE_ENABLED"] = "0"
+
+    from benchmarks.bench_prefilter import TEST_NORMAL_DAYS
+    from benchmarks.suite import TRAINING_DAYS, write_training_csv
+
+    write_training_csv(workdir / "raw.csv", TRAINING_DAYS + TEST_NORMAL_DAYS)
+    print(f"training kecil ({args.epochs} epoch, varian {', '.join(VARIANTS)}) di {workdir} ...")
+    report = run_isolated("benchmarks.bench_variants", workdir, args.epochs)
+
+    print(f"\nevaluasi training (threshold critical {report['threshold_critical']:.4f}, data uji sintetis April):")
+    print(f"{'varian':<9}{'kB':>8}{'ukuran':>8}{'precision':>11}{'recall':>8}{'f1':>8}{'f1_delta':>10}"
+          f"{'sev_sama':>10}{'galat_p99':>11}{'us/window':>11}{'speedup':>9}")
+    for variant, r in report["variants"].items():
+        print(f"{variant:<9}{r['size_bytes'] / 1024:>8.0f}{r['size_ratio']:>8.2f}{r['precision']:>11.4f}"
+              f"{r['recall']:>8.4f}{r['f1_score']:>8.4f}{r['f1_delta']:>+10.4f}{r['severity_agreement']:>10.4f}"
+              f"{r['risk_error_p99']:>11.2e}{r['latency_us_per_window']:>11.1f}{r['speedup']:>8.2f}x")
+
+    import numpy as np
+
+    from benchmarks.common import synthetic_compressor, timed
+    from src.inference import AnomalyDetector
+    from src.utils.config import RAW_SENSOR_COLS
+
+    day = synthetic_compressor(24 * 360, start="2020-06-01", profile="warning_trend", seed=21)[RAW_SENSOR_COLS]
+    print(f"\nserving (INFERENCE_BACKEND=tflite, /predict/timeline 1 hari, median {args.repeat}x):")
+    print(f"{'varian':<9}{'load_s':>8}{'ms':>9}{'window/s':>10}{'sev_sama':>10}{'galat_maks':>12}")
+    reference = None
+    for variant in ["float32", *VARIANTS]:
+        detector = AnomalyDetector(backend="tflite", variant=variant)
+        detector.load_artifacts()
+        timings = [timed(detector.predict_timeline, day) for _ in range(args.repeat)]
+        result, seconds = timings[0][0], float(np.median([t for _, t in timings]))
+        risk, severity = np.array(result["risk_scores"]), np.array(result["severity_levels"])
+        if reference is None:
+            reference = (risk, severity)
+        error = np.max(np.abs(risk - reference[0]) / np.maximum(np.abs(reference[0]), 1e-6))
+        print(f"{variant:<9}{detector.bundle.load_seconds:>8.2f}{seconds * 1000:>9.1f}{len(risk) / seconds:>10.0f}"
+              f"{np.mean(severity == reference[1]):>10.4f}{error:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark prepare_lstm_sequence: loop + np.array lama vs copy baru vs view zero-copy vs generator batch.
+
+    python -m benchmarks.bench_windowing --rows 43200
+"""
+import argparse
+import json
+
+import numpy as np
+
+from benchmarks.common import peak_rss_mb, run_isolated, timed
+from src.data.preprocessing import prepare_lstm_sequence, iter_lstm_batches
+from src.utils.config import FEATURE_COLS, TIME_STEPS
+
+MODES = ["legacy", "copy", "view", "view_f32", "batches"]
+
+
+def legacy_prepare_lstm_sequence(scaled_data, time_steps):
+    output = []
+    for i in range(len(scaled_data) - time_steps + 1):
+        output.append(scaled_data[i : (i + time_steps)])
+    return np.array(output)
+
+
+def consume(windows):
+    # Sentuh seluruh window agar view juga benar-benar dibaca
+    total = 0.0
+    for i in range(0, len(windows), 4096):
+        total += float(np.asarray(windows[i : i + 4096]).sum())
+    return total
+
+
+def run_mode(mode, rows):
+    data = np.random.default_rng(0).random((rows, len(FEATURE_COLS)))
+    rss_before = peak_rss_mb()
+
+    if mode == "legacy":
+        windows, seconds = timed(legacy_prepare_lstm_sequence, data, TIME_STEPS)
+    elif mode == "copy":
+        windows, seconds = timed(prepare_lstm_sequence, data, TIME_STEPS)
+    elif mode == "view":
+        windows, seconds = timed(prepare_lstm_sequence, data, TIME_STEPS, as_view=True)
+    elif mode == "view_f32":
+        windows, seconds = timed(prepare_lstm_sequence, data, TIME_STEPS, as_view=True, dtype=np.float32)
+    else:
+        # Generator: batch dibuat dan langsung dibuang, seperti di dalam pipeline tf.data
+        _, seconds = timed(lambda: sum(consume(b) for b in iter_lstm_batches(data, TIME_STEPS, batch_size=1024)))
+        windows = None
+
+    _, consume_seconds = timed(consume, windows) if windows is not None else (None, 0.0)
+    return {
+        "mode": mode,
+        "rows": rows,
+        "build_s": round(seconds, 4),
+        "consume_s": round(consume_seconds, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "extra_rss_mb": round(peak_rss_mb() - rss_before, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=43_200, help="Jumlah menit bersih (Feb-Mar ~ 43200).")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ROWS"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child[0], int(args.child[1]))))
+        return
+
+    results = [run_isolated("benchmarks.bench_windowing", mode, args.rows) for mode in MODES]
+    print(f"{'mode':<10}{'build_s':>10}{'consume_s':>12}{'peak_rss_mb':>14}{'extra_rss_mb':>14}")
+    for r in results:
+        print(f"{r['mode']:<10}{r['build_s']:>10}{r['consume_s']:>12}{r['peak_rss_mb']:>14}{r['extra_rss_mb']:>14}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
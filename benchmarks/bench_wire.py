@@ -0,0 +1,95 @@
+"""
+Waktu parse body -> DataFrame input untuk tiap format /predict:
+JSON per baris (PredictionRequest, lama), JSON kolumnar, raw float32 biner dan Arrow IPC (jika pyarrow ada).
+
+    python -m benchmarks.bench_wire
+    python -m benchmarks.bench_wire --rows 100 2500 100000 --repeat 5
+"""
+import argparse
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import timed
+from api.main import readings_to_frame, columnar_to_frame
+from api.schemas import PredictionRequest, ColumnarPredictionRequest
+from src.data.wire import frame_from_arrays, encode_raw, decode_raw, decode_arrow
+from src.utils.config import RAW_SENSOR_COLS
+
+
+def synthetic_readings(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = pd.date_range("2020-06-01", periods=n_rows, freq="10s").to_numpy()
+    values = rng.normal(5.0, 2.0, size=(n_rows, len(RAW_SENSOR_COLS))).astype(np.float32)
+    return timestamps, values
+
+
+def encode_row_json(timestamps, values):
+    iso = pd.DatetimeIndex(timestamps).strftime("%Y-%m-%dT%H:%M:%S").tolist()
+    readings = [dict(zip(RAW_SENSOR_COLS, row), timestamp=ts) for ts, row in zip(iso, values.astype(float).tolist())]
+    return json.dumps({"readings": readings}).encode()
+
+
+def encode_columnar_json(timestamps, values):
+    payload = {"timestamps": (timestamps.astype("datetime64[ms]").view(np.int64)).tolist()}
+    payload.update({col: values[:, i].astype(float).tolist() for i, col in enumerate(RAW_SENSOR_COLS)})
+    return json.dumps(payload).encode()
+
+
+def encode_arrow(timestamps, values):
+    import pyarrow as pa
+
+    table = pa.table({"timestamp": timestamps, **{col: values[:, i] for i, col in enumerate(RAW_SENSOR_COLS)}})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+FORMATS = {
+    "json_rows": (encode_row_json, lambda body: readings_to_frame(PredictionRequest.model_validate_json(body).readings)),
+    "json_columnar": (encode_columnar_json, lambda body: columnar_to_frame(ColumnarPredictionRequest.model_validate_json(body))),
+    "raw_f32": (encode_raw, lambda body: frame_from_arrays(*decode_raw(body))),
+    "arrow": (encode_arrow, lambda body: frame_from_arrays(*decode_arrow(body))),
+}
+
+
+def run(n_rows, repeat):
+    timestamps, values = synthetic_readings(n_rows)
+    results = []
+    for name, (encode, parse) in FORMATS.items():
+        try:
+            body = encode(timestamps, values)
+        except ImportError:
+            continue
+        frame = parse(body)
+        # Semua format harus menghasilkan frame yang sama (nilai float32 dari sisi klien)
+        assert np.allclose(frame[RAW_SENSOR_COLS].to_numpy(dtype=np.float64), values, atol=1e-5)
+        assert (frame.index.to_numpy() == timestamps).all()
+        seconds = min(timed(parse, body)[1] for _ in range(repeat))
+        results.append({"rows": n_rows, "format": name, "bytes": len(body), "parse_ms": round(seconds * 1000, 3)})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 2500, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}  {'format':<14}{'bytes':>12}{'parse_ms':>11}{'vs_json_rows':>14}")
+    all_results = []
+    for n_rows in args.rows:
+        results = run(n_rows, args.repeat)
+        baseline = results[0]["parse_ms"]
+        for r in results:
+            speedup = baseline / r["parse_ms"] if r["parse_ms"] else float("inf")
+            print(f"{r['rows']:>8}  {r['format']:<14}{r['bytes']:>12}{r['parse_ms']:>11}{speedup:>13.1f}x")
+        all_results.extend(results)
+    return all_results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from src.utils.resources import peak_rss_mb  # noqa: F401 (dipakai modul benchmark lain)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TEST_SAMPLES_DIR = ROOT_DIR / "data" / "test_samples"
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_isolated(module, *args):
+    """Jalankan satu mode benchmark di proses baru agar peak RSS tidak saling tercampur."""
+    out = subprocess.run(
+        [sys.executable, "-m", module, "--child", *map(str, args)],
+        cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def synthetic_compressor(n_rows, start="2020-02-01", profile="aman", seed=0, noise=0.05):
+    """
+    Data kompresor tiruan berbentuk seperti data/test_samples/test_<profile>.csv (aman, warning, bahaya, ...):
+    baris sampel diulang siklik (pola siklus kompresor tetap), kolom sensor diberi noise sebesar
+    noise x std kolom, timestamp baru tiap 10 detik. Semua kolom CSV asli, index timestamp.
+    """
+    import numpy as np
+    import pandas as pd
+
+    from src.utils.config import RAW_SENSOR_COLS
+
+    sample = pd.read_csv(TEST_SAMPLES_DIR / f"test_{profile}.csv", index_col="timestamp").drop(columns="Unnamed: 0")
+    rng = np.random.default_rng(seed)
+    values = np.resize(sample.to_numpy(dtype=float), (n_rows, sample.shape[1]))
+    sensors = [sample.columns.get_loc(col) for col in RAW_SENSOR_COLS]
+    scale = sample[RAW_SENSOR_COLS].std().to_numpy() * noise
+    values[:, sensors] += rng.normal(size=(n_rows, len(sensors))) * scale
+    index = pd.date_range(start, periods=n_rows, freq="10s", name="timestamp")
+    return pd.DataFrame(values, index=index, columns=sample.columns)
+
+
+def write_synthetic_artifacts(version_dir, seed=0, threshold_critical=0.33):
+    """
+    Artefak tiruan untuk NumpyBackend (scaler, config, bobot acak dengan arsitektur
+    build_autoencoder) agar benchmark bisa jalan tanpa TensorFlow maupun dataset.
+    """
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import MinMaxScaler
+
+    from src.models.registry import artifact_paths
+    from src.utils.config import FEATURE_COLS, TIME_STEPS
+
+    rng = np.random.default_rng(seed)
+    n_features = len(FEATURE_COLS)
+    paths = artifact_paths(version_dir)
+    Path(version_dir).mkdir(parents=True, exist_ok=True)
+
+    scaler = MinMaxScaler().fit(pd.DataFrame(rng.normal(size=(256, n_features)) * 10, columns=FEATURE_COLS))
+    joblib.dump(scaler, paths["scaler"])
+    joblib.dump({
+        "threshold_critical": threshold_critical,
+        "threshold_warning": threshold_critical * 0.7,
+        "features": FEATURE_COLS,
+        "time_steps": TIME_STEPS
+    }, paths["config"])
+
+    # LSTM(64) -> LSTM(32) -> RepeatVector -> LSTM(32) -> LSTM(64) -> Dense(F)
+    spec, arrays, n_in = [], {}, n_features
+    layers = [(64, True), (32, False), None, (32, True), (64, True)]
+    for i, layer in enumerate(layers):
+        name = f"layer_{i}"
+        if layer is None:
+            spec.append({"type": "RepeatVector", "name": name, "n": TIME_STEPS})
+            continue
+        units, return_sequences = layer
+        arrays[f"{name}/kernel"] = rng.normal(scale=0.1, size=(n_in, 4 * units))
+        arrays[f"{name}/recurrent_kernel"] = rng.normal(scale=0.1, size=(units, 4 * units))
+        arrays[f"{name}/bias"] = np.zeros(4 * units)
+        spec.append({
+            "type": "LSTM", "name": name, "activation": "tanh",
+            "recurrent_activation": "sigmoid", "return_sequences": return_sequences
+        })
+        n_in = units
+    arrays["layer_5/kernel"] = rng.normal(scale=0.1, size=(n_in, n_features))
+    arrays["layer_5/bias"] = np.zeros(n_features)
+    spec.append({"type": "Dense", "name": "layer_5", "activation": "linear"})
+
+    np.savez(paths["numpy"], spec=json.dumps(spec), **{key: value.astype(np.float32) for key, value in arrays.items()})
+    return paths
@@ -0,0 +1,101 @@
+"""
+Stress test hot-swap: /predict ditembak dari banyak thread sementara pointer CURRENT
+berganti-ganti antar versi. Semua response harus 200 dan versi harus benar-benar berganti.
+
+    python -m benchmarks.stress_hot_swap --threads 8 --swaps 10
+
+Memakai artefak tiruan (NumpyBackend) di MODELS_DIR sementara, tanpa TensorFlow.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+def make_payload(n_rows=40):
+    start = datetime(2020, 6, 1)
+    readings = []
+    for i in range(n_rows):
+        readings.append({
+            "timestamp": (start + timedelta(minutes=i)).isoformat(),
+            "TP2": 8.0 + 0.01 * i, "TP3": 9.0, "H1": 8.5, "DV_pressure": 0.1,
+            "Reservoirs": 9.0, "Oil_temperature": 60.0 + 0.05 * i, "Motor_current": 4.0
+        })
+    return {"readings": readings}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--swaps", type=int, default=10)
+    parser.add_argument("--swap-interval", type=float, default=0.3)
+    args = parser.parse_args()
+
+    # Konfigurasi harus di-set sebelum modul src/api diimport
+    models_dir = tempfile.mkdtemp(prefix="metropt-models-")
+    os.environ["MODELS_DIR"] = models_dir
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+    os.environ["ARTIFACT_POLL_SECONDS"] = "0.05"
+
+    from fastapi.testclient import TestClient
+
+    from benchmarks.common import write_synthetic_artifacts
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR
+    from api.main import app
+    from src.inference import detector
+
+    versions = ["v-a", "v-b"]
+    for seed, version in enumerate(versions):
+        write_synthetic_artifacts(VERSIONS_DIR / version, seed=seed, threshold_critical=0.3 + 0.1 * seed)
+    publish_version(versions[0])
+
+    payload = make_payload()
+    statuses, errors = {}, []
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    with TestClient(app) as client:
+        while not detector.is_ready:
+            time.sleep(0.05)
+
+        def hammer():
+            while not stop.is_set():
+                response = client.post("/predict", json=payload)
+                with lock:
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code != 200:
+                        errors.append(response.text[:200])
+
+        workers = [threading.Thread(target=hammer) for _ in range(args.threads)]
+        for worker in workers:
+            worker.start()
+
+        start = time.perf_counter()
+        for i in range(args.swaps):
+            time.sleep(args.swap_interval)
+            publish_version(versions[(i + 1) % len(versions)])
+        time.sleep(args.swap_interval)
+        stop.set()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+
+        health = client.get("/health").json()
+
+    total = sum(statuses.values())
+    print(f"requests: {total} ({total / elapsed:.1f} req/s), status: {statuses}")
+    print(f"swap_count: {health['model']['swap_count']}, versi aktif: {health['model']['version']}")
+    if errors:
+        print("contoh error:", errors[:3])
+
+    ok = set(statuses) == {200} and health["model"]["swap_count"] >= args.swaps // 2
+    print("OK" if ok else "GAGAL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
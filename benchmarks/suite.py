@@ -0,0 +1,277 @@
+"""
+Suite benchmark end-to-end untuk mendeteksi regresi performa:
+  micro     : process_input_data, prepare_lstm_sequence, generate_report(_batch), forward pass model
+  load      : POST /predict in-process (ASGI transport httpx, tanpa jaringan) di beberapa tingkat konkurensi,
+              throughput + latency p50/p95/p99 (termasuk overhead client di event loop yang sama)
+  training  : run_training ukuran kecil (dataset sintetis 4 hari, TensorFlow) di proses terpisah
+
+Hasil disimpan sebagai JSON ({"meta": ..., "results": {nama_metrik: angka}}) dan bisa dibandingkan
+dengan file hasil sebelumnya. Metrik *_rps lebih besar lebih baik, sisanya (waktu, memori) lebih kecil.
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json --tolerance 0.25   # exit 1 jika ada regresi
+    python -m benchmarks.suite --quick --no-training
+
+Data sintetis dibentuk dari data/test_samples; micro dan load memakai artefak tiruan (NumpyBackend).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks.common import ROOT_DIR, run_isolated, synthetic_compressor, timed
+
+# Dataset training kecil: dua hari sehat (rentang train Feb) + dua hari uji April (termasuk periode Air Leak 18 April)
+TRAINING_DAYS = [("2020-02-01", 2, "aman"), ("2020-04-17", 1, "warning"), ("2020-04-18", 1, "bahaya")]
+ROWS_PER_DAY = 24 * 360
+
+
+def measure_ms(fn, *args, min_runs=5, min_seconds=0.2):
+    """Median waktu satu panggilan (ms), setelah satu panggilan warm-up."""
+    import numpy as np
+
+    fn(*args)
+    times, start = [], time.perf_counter()
+    while len(times) < min_runs or time.perf_counter() - start < min_seconds:
+        times.append(timed(fn, *args)[1])
+    return round(float(np.median(times)) * 1000, 4)
+
+
+def run_micro(detector, bundle, quick):
+    from src.data.preprocessing import process_input_data, prepare_lstm_sequence
+    from src.utils.config import RAW_SENSOR_COLS, FEATURE_COLS, TIME_STEPS
+    from src.utils.diagnosis import generate_report, generate_report_batch
+
+    min_seconds = 0.05 if quick else 0.3
+    hour = synthetic_compressor(360, profile="aman")[RAW_SENSOR_COLS]
+    day = synthetic_compressor(ROWS_PER_DAY, profile="warning", seed=1)[RAW_SENSOR_COLS]
+    scaled = bundle.scaler.transform(process_input_data(day))
+    X_day = prepare_lstm_sequence(scaled, TIME_STEPS)
+    X_one, X_batch = X_day[:1], X_day[:1000]
+    rec_one, rec_batch = detector.forward(X_one, bundle=bundle), detector.forward(X_batch, bundle=bundle)
+    thresholds = (bundle.thresh_critical, bundle.thresh_warning)
+
+    cases = {
+        "process_input_data/1h": (process_input_data, hour),
+        "process_input_data/1d": (process_input_data, day),
+        "prepare_lstm_sequence/1d": (prepare_lstm_sequence, scaled, TIME_STEPS),
+        "generate_report/1": (lambda: generate_report(X_one, rec_one, FEATURE_COLS, *thresholds),),
+        "generate_report_batch/1000": (lambda: generate_report_batch(X_batch, rec_batch, FEATURE_COLS, *thresholds),),
+        "model_forward/1": (lambda: detector.forward(X_one, bundle=bundle),),
+        "model_forward/256": (lambda: detector.forward(X_day[:256], bundle=bundle),),
+    }
+    results = {}
+    for name, (fn, *args) in cases.items():
+        results[f"micro/{name}_ms"] = measure_ms(fn, *args, min_seconds=min_seconds)
+        print(f"  {name:<30}{results[f'micro/{name}_ms']:>10.3f} ms")
+    return results
+
+
+def predict_payloads(n_payloads, rows=360):
+    """Body JSON /predict siap kirim (1 jam data), masing-masing window berbeda agar tidak kena cache."""
+    from src.utils.config import RAW_SENSOR_COLS
+
+    profiles = ["aman", "warning", "bahaya", "warning_trend"]
+    bodies = []
+    for i in range(n_payloads):
+        frame = synthetic_compressor(rows, start="2020-06-01", profile=profiles[i % len(profiles)], seed=i)
+        readings = [
+            {"timestamp": ts.isoformat(), **dict(zip(RAW_SENSOR_COLS, map(float, values)))}
+            for ts, values in zip(frame.index, frame[RAW_SENSOR_COLS].to_numpy())
+        ]
+        bodies.append(json.dumps({"readings": readings}).encode())
+    return bodies
+
+
+async def load_test(app, bodies, concurrency_levels, n_requests):
+    import httpx
+    import numpy as np
+
+    from api.main import batcher
+
+    results = {}
+    headers = {"content-type": "application/json"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://suite") as client:
+        for body in bodies[:3]:  # warm-up
+            assert (await client.post("/predict", content=body, headers=headers)).status_code == 200
+
+        for concurrency in concurrency_levels:
+            latencies, pending = [], iter(range(n_requests))
+
+            async def worker():
+                for i in pending:
+                    start = time.perf_counter()
+                    response = await client.post("/predict", content=bodies[i % len(bodies)], headers=headers)
+                    latencies.append(time.perf_counter() - start)
+                    assert response.status_code == 200, response.text
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            prefix = f"load/predict/c{concurrency}"
+            results[f"{prefix}/throughput_rps"] = round(n_requests / elapsed, 2)
+            results[f"{prefix}/p50_ms"] = round(float(p50), 3)
+            results[f"{prefix}/p95_ms"] = round(float(p95), 3)
+            results[f"{prefix}/p99_ms"] = round(float(p99), 3)
+            print(f"  c={concurrency:<4}{n_requests / elapsed:>10.1f} req/s   p50 {p50:>8.2f}   p95 {p95:>8.2f}   p99 {p99:>8.2f} ms")
+    await batcher.stop()
+    return results
+
+
+def write_training_csv(path, training_days=TRAINING_DAYS):
+    import pandas as pd
+
+    frames = [
+        synthetic_compressor(days * ROWS_PER_DAY, start=start, profile=profile, seed=i)
+        for i, (start, days, profile) in enumerate(training_days)
+    ]
+    # Kolom index tanpa nama di depan, seperti CSV MetroPT3 asli
+    pd.concat(frames).reset_index().to_csv(path)
+    return path
+
+
+def run_training_child(workdir, epochs):
+    """Dijalankan di proses terpisah: konfigurasi path harus di-set sebelum modul src diimport."""
+    workdir = Path(workdir)
+    os.environ["MODELS_DIR"] = str(workdir / "models")
+    os.environ["DATA_CACHE_DIR"] = str(workdir / "cache")
+    os.environ["RAW_CSV_PATH"] = str(workdir / "raw.csv")
+    # Artefak run MLflow ditulis ke ./mlruns relatif terhadap direktori kerja
+    os.chdir(workdir)
+
+    import mlflow
+
+    from src.models.train import run_training
+
+    ok, wall = timed(run_training, epochs=int(epochs))
+    metrics = mlflow.last_active_run().data.metrics if ok else {}
+    return {
+        "training/wall_s": round(wall, 3),
+        "training/fit_s": round(metrics.get("fit_seconds", float("nan")), 3),
+        "training/eval_s": round(metrics.get("eval_seconds", float("nan")), 3),
+        "training/peak_rss_mb": round(metrics.get("peak_rss_mb", float("nan")), 1),
+    }
+
+
+def higher_is_better(name):
+    return name.endswith("_rps")
+
+
+def compare(results, baseline, tolerance):
+    """Cetak perubahan per metrik terhadap baseline, kembalikan daftar metrik yang memburuk > tolerance."""
+    regressions = []
+    print(f"\n{'metrik':<44}{'baseline':>12}{'sekarang':>12}{'perubahan':>11}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        change = value / base - 1
+        worse = -change if higher_is_better(name) else change
+        flag = ""
+        if worse > tolerance:
+            regressions.append(name)
+            flag = "  REGRESI"
+        print(f"{name:<44}{base:>12.3f}{value:>12.3f}{change * 100:>+10.1f}%{flag}")
+    return regressions
+
+
+def environment_meta():
+    import numpy as np
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=None, help="File JSON hasil (default: benchmarks/results/<waktu>.json).")
+    parser.add_argument("--baseline", default=None, help="File JSON hasil sebelumnya untuk dibandingkan.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Batas perubahan relatif sebelum dianggap regresi.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Request per tingkat konkurensi.")
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--quick", action="store_true", help="Waktu ukur lebih singkat dan request lebih sedikit.")
+    parser.add_argument("--no-training", action="store_true")
+    parser.add_argument("--child", nargs=2, metavar=("WORKDIR", "EPOCHS"))
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_training_child(*args.child)))
+        return
+
+    # Konfigurasi harus di-set sebelum modul src/api diimport
+    workdir = Path(tempfile.mkdtemp(prefix="metropt-suite-"))
+    os.environ["MODELS_DIR"] = str(workdir / "serving-models")
+    os.environ["INFERENCE_BACKEND"] = "numpy"
+    os.environ["HISTORY_ENABLED"] = "0"
+    os.environ["METRICS_ENABLED"] = "1"
+    # Setiap request harus melewati forward pass, bukan cache window
+    os.environ["WINDOW_CACHE_ENABLED"] = "0"
+
+    from benchmarks.common import write_synthetic_artifacts
+    from src.models.registry import publish_version
+    from src.utils.config import VERSIONS_DIR
+    from api.main import app
+    from src.inference import detector
+
+    write_synthetic_artifacts(VERSIONS_DIR / "v1")
+    publish_version("v1")
+    detector.load_artifacts()
+    bundle = detector.acquire()
+    results = {}
+
+    print("micro (median per panggilan):")
+    results.update(run_micro(detector, bundle, args.quick))
+
+    n_requests = max(args.requests // 4, 20) if args.quick else args.requests
+    print(f"\nload test POST /predict ({n_requests} request per tingkat, in-process):")
+    results.update(asyncio.run(load_test(app, predict_payloads(16), args.concurrency, n_requests)))
+
+    if not args.no_training:
+        print(f"\ntraining kecil ({sum(days for _, days, _ in TRAINING_DAYS)} hari sintetis, {args.epochs} epoch):")
+        write_training_csv(workdir / "raw.csv")
+        training = run_isolated("benchmarks.suite", workdir, args.epochs)
+        for name, value in training.items():
+            print(f"  {name:<30}{value:>10}")
+        results.update(training)
+
+    output = Path(args.output) if args.output else ROOT_DIR / "benchmarks" / "results" / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"meta": environment_meta(), "results": results}, indent=2))
+    print(f"\nhasil disimpan: {output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metrik memburuk lebih dari {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\ntidak ada regresi di atas {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Penerima webhook lokal untuk mencoba sink alert (ALERT_WEBHOOK_URL): setiap POST berisi JSON list event
+dicetak satu baris per event, dan opsional ditulis ke file JSON lines.
+
+    python -m benchmarks.webhook_receiver --port 9000
+    ALERT_WEBHOOK_URL=http://127.0.0.1:9000/alerts python -m api.serve
+
+Juga dipakai in-process oleh benchmarks.bench_alerting (WebhookReceiver).
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class WebhookReceiver:
+    """HTTP server di thread background yang mengumpulkan semua event yang diterima."""
+
+    def __init__(self, host="127.0.0.1", port=0, on_events=None):
+        self.events = []
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._on_events = on_events
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                try:
+                    events = json.loads(body)
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                receiver.receive(events if isinstance(events, list) else [events])
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}/alerts"
+        self._thread = None
+
+    def receive(self, events):
+        with self._lock:
+            self.events.extend(events)
+            self.requests += 1
+        if self._on_events is not None:
+            self._on_events(events)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="webhook-receiver", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--output", default=None, help="File JSON lines untuk menyimpan event yang diterima.")
+    args = parser.parse_args()
+
+    output = open(args.output, "a") if args.output else None
+
+    def on_events(events):
+        for event in events:
+            print(f"[{event.get('id')}] {event.get('unit_id')}: {event.get('from')} -> {event.get('to')} "
+                  f"(risk {event.get('risk_score')}, window {event.get('timestamp')})", flush=True)
+            if output is not None:
+                output.write(json.dumps(event) + "\n")
+                output.flush()
+
+    receiver = WebhookReceiver(args.host, args.port, on_events)
+    print(f"Menunggu event di {receiver.url} (Ctrl+C untuk berhenti)")
+    try:
+        receiver.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.server.server_close()
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import pandas as pd
 import os
 from pathlib import Path
 
+from src.data.store import sensor_store
+
 print("Pembuatan file testing...")
 
 # Path Setup
@@ -14,15 +16,12 @@ RAW_CSV_PATH = BASE_DIR / "data" / "raw" / "MetroPT3(AirCompressor).csv"
 OUTPUT_DIR = BASE_DIR / "data" / "test_samples"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Load raw data
-if not RAW_CSV_PATH.exists():
+# Load raw data (lewat cache kolumnar, CSV hanya dibaca sekali saat cache dibangun)
+if not RAW_CSV_PATH.exists() and not sensor_store.is_fresh():
     print(f"❌ File tidak ditemukan di: {RAW_CSV_PATH}")
     exit()
 
 print("Reading RAW Data...")
-df = pd.read_csv(RAW_CSV_PATH)
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-df.set_index('timestamp', inplace=True)
 
 # Jumlah baris 2500 baris = ~41 menit data per detik
 NUM_ROWS = 2500 
@@ -30,13 +29,13 @@ NUM_ROWS = 2500
 # Skenario Aman
 print("🟢 Membuat test_aman.csv ...")
 # Mengambil data dari bulan Februari (Periode Sehat)
-df_aman = df['2020-02-05 10:00:00':'2020-02-05 11:00:00'].head(NUM_ROWS).copy()
+df_aman = sensor_store.load_range('2020-02-05 10:00:00', '2020-02-05 11:00:00').head(NUM_ROWS)
 df_aman.to_csv(OUTPUT_DIR / "test_aman.csv")
 
 # Skenario Bahaya
 print("🔴 Membuat test_bahaya.csv ...")
 # Mengambil data tepat di tengah jadwal kerusakan (Air Leak) - 18 April 2020
-df_bahaya = df['2020-04-18 12:00:00':'2020-04-18 13:00:00'].head(NUM_ROWS).copy()
+df_bahaya = sensor_store.load_range('2020-04-18 12:00:00', '2020-04-18 13:00:00').head(NUM_ROWS)
 df_bahaya.to_csv(OUTPUT_DIR / "test_bahaya.csv")
 
 # Skenario Warning
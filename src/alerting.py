@@ -0,0 +1,389 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+import urllib.request
+from collections import OrderedDict, deque
+
+import pandas as pd
+
+from src.utils.config import (
+    ALERT_ENABLED, ALERT_RAISE_N, ALERT_RAISE_M, ALERT_CLEAR_WINDOWS, ALERT_CLEAR_RATIO, ALERT_COOLDOWN_MINUTES,
+    ALERT_QUEUE_SIZE, ALERT_MAX_UNITS, ALERT_EVENT_BUFFER, ALERT_SUBSCRIBER_QUEUE, ALERT_WEBHOOK_URL,
+    ALERT_WEBHOOK_TIMEOUT_SECONDS, ALERT_WEBHOOK_BATCH, ALERT_WEBHOOK_RETRIES, HISTORY_DEFAULT_UNIT
+)
+from src.data.history import to_epoch_ms, MINUTE_MS
+from src.utils.logger import get_logger
+
+logger = get_logger("alerting")
+
+# Alerting per unit di atas risk score yang sudah di-scoring (/predict*, fleet, session streaming).
+# Jalur request hanya memasukkan skor ke antrian; thread alert-engine menerapkan hysteresis dan
+# menerbitkan event hanya saat status unit berubah (normal <-> warning <-> critical).
+# State per proses: dengan beberapa worker (api.serve), unit yang sama sebaiknya selalu ke worker yang sama.
+
+LEVEL_NAMES = ("normal", "warning", "critical")
+_STOP = object()
+
+class AlertState:
+    """
+    State hysteresis satu unit, O(1) dan berukuran tetap: level aktif, bitmask M window terakhir
+    per level (N dari M = popcount), dan hitungan window tenang berturut-turut.
+    """
+    __slots__ = ("level", "warning_bits", "critical_bits", "calm", "changed_ms", "last_ms", "risk_score", "version")
+
+    def __init__(self):
+        self.level = 0
+        self.warning_bits = 0
+        self.critical_bits = 0
+        self.calm = 0
+        self.changed_ms = None
+        self.last_ms = None
+        self.risk_score = None
+        self.version = None
+
+    def update(self, t_ms, risk_score, severity, thresh_critical, thresh_warning, raise_n=ALERT_RAISE_N,
+               raise_m=ALERT_RAISE_M, clear_windows=ALERT_CLEAR_WINDOWS, clear_ratio=ALERT_CLEAR_RATIO,
+               cooldown_ms=ALERT_COOLDOWN_MINUTES * MINUTE_MS):
+        """Tambah satu skor; kembalikan (level lama, level baru) jika status berubah, selain itu None."""
+        mask = (1 << raise_m) - 1
+        self.warning_bits = ((self.warning_bits << 1) | (severity >= 1)) & mask
+        self.critical_bits = ((self.critical_bits << 1) | (severity >= 2)) & mask
+        self.last_ms, self.risk_score = t_ms, risk_score
+
+        if self.critical_bits.bit_count() >= raise_n:
+            target = 2
+        elif self.warning_bits.bit_count() >= raise_n:
+            target = 1
+        else:
+            target = 0
+
+        # Ambang turun lebih rendah dari ambang naik (hysteresis)
+        if self.level and risk_score < clear_ratio * (thresh_critical if self.level == 2 else thresh_warning):
+            self.calm += 1
+        else:
+            self.calm = 0
+
+        cooled = self.changed_ms is None or t_ms - self.changed_ms >= cooldown_ms
+        previous = self.level
+        if target > self.level and (target == 2 or cooled):
+            self.level = target
+        elif target < self.level and self.calm >= clear_windows and cooled:
+            self.level = target
+        if self.level == previous:
+            return None
+
+        self.calm = 0
+        self.changed_ms = t_ms
+        return previous, self.level
+
+    def describe(self):
+        return {
+            "level": self.level,
+            "state": LEVEL_NAMES[self.level],
+            "since": pd.Timestamp(self.changed_ms, unit="ms").isoformat() if self.changed_ms is not None else None,
+            "last_window": pd.Timestamp(self.last_ms, unit="ms").isoformat() if self.last_ms is not None else None,
+            "risk_score": self.risk_score,
+            "warning_windows": self.warning_bits.bit_count(),
+            "critical_windows": self.critical_bits.bit_count(),
+            "calm_windows": self.calm,
+            "version": self.version
+        }
+
+class Subscription:
+    """Subscriber async (SSE/WebSocket): antrian asyncio terbatas milik event loop subscriber."""
+
+    def __init__(self, loop, maxsize=ALERT_SUBSCRIBER_QUEUE):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, event):
+        # Dijalankan di event loop subscriber; penuh = event terlama dibuang
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Event loop sudah ditutup
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+class AlertBus:
+    """Pub/sub in-process: id event berurutan, buffer event terakhir untuk replay, subscriber async dan sink."""
+
+    def __init__(self, buffer_size=ALERT_EVENT_BUFFER):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._sinks = []
+        self._recent = deque(maxlen=buffer_size)
+        self.next_id = 1
+        self.published = 0
+
+    def subscribe(self, loop=None, maxsize=ALERT_SUBSCRIBER_QUEUE, since_id=None):
+        """Subscriber baru di event loop aktif. since_id: event di buffer dengan id > since_id dikirim lebih dulu."""
+        subscription = Subscription(loop or asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if since_id is not None:
+                for event in self._recent:
+                    if event["id"] > since_id:
+                        subscription.deliver(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def add_sink(self, sink):
+        """sink.publish(events) dipanggil dari thread engine, harus cepat (mis. hanya masuk antrian)."""
+        self._sinks.append(sink)
+
+    def publish(self, events):
+        if not events:
+            return
+        with self._lock:
+            for event in events:
+                event["id"] = self.next_id
+                self.next_id += 1
+                self._recent.append(event)
+                for subscription in self._subscribers:
+                    subscription.deliver(event)
+            self.published += len(events)
+        for sink in self._sinks:
+            sink.publish(events)
+
+    def recent(self, since_id=0, limit=ALERT_EVENT_BUFFER):
+        with self._lock:
+            events = [event for event in self._recent if event["id"] > since_id]
+        return events[-limit:]
+
+    def status(self):
+        with self._lock:
+            return {
+                "published": self.published,
+                "subscribers": len(self._subscribers),
+                "subscriber_dropped": sum(s.dropped for s in self._subscribers),
+                "buffered": len(self._recent),
+                "last_id": self.next_id - 1
+            }
+
+class WebhookSink:
+    """Kirim event ke URL webhook per batch (POST JSON list) dari thread sendiri, dengan retry + backoff."""
+
+    def __init__(self, url, timeout=ALERT_WEBHOOK_TIMEOUT_SECONDS, batch_size=ALERT_WEBHOOK_BATCH,
+                 retries=ALERT_WEBHOOK_RETRIES, queue_size=ALERT_QUEUE_SIZE):
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.retries = retries
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self.stats = {"sent": 0, "failed": 0, "dropped": 0, "requests": 0}
+
+    def publish(self, events):
+        for event in events:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.stats["dropped"] += 1
+
+    def post(self, events):
+        body = json.dumps(events, default=str).encode()
+        request = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        for attempt in range(self.retries + 1):
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    response.read()
+                self.stats["requests"] += 1
+                self.stats["sent"] += len(events)
+                return True
+            except OSError as e:
+                if attempt == self.retries:
+                    self.stats["failed"] += len(events)
+                    logger.error(f"[ALERT] Webhook gagal ({len(events)} event): {e}", extra={"fields": {"url": self.url}})
+                    return False
+                time.sleep(0.5 * 2 ** attempt)
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                break
+            batch = [event]
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    self.post(batch)
+                    return
+                batch.append(event)
+            self.post(batch)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="alert-webhook", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def status(self):
+        return {**self.stats, "url": self.url, "pending": self._queue.qsize()}
+
+class AlertEngine:
+    """AlertState per unit (LRU, maks max_units) yang diperbarui oleh satu thread dari antrian skor."""
+
+    def __init__(self, bus, enabled=ALERT_ENABLED, queue_size=ALERT_QUEUE_SIZE, max_units=ALERT_MAX_UNITS,
+                 raise_n=ALERT_RAISE_N, raise_m=ALERT_RAISE_M, clear_windows=ALERT_CLEAR_WINDOWS,
+                 clear_ratio=ALERT_CLEAR_RATIO, cooldown_minutes=ALERT_COOLDOWN_MINUTES):
+        if not 1 <= raise_n <= raise_m:
+            raise ValueError(f"ALERT_RAISE_N harus di antara 1 dan ALERT_RAISE_M ({raise_n} dari {raise_m})")
+        self.bus = bus
+        self.enabled = enabled
+        self.max_units = max_units
+        self.rules = {
+            "raise_n": raise_n, "raise_m": raise_m, "clear_windows": clear_windows,
+            "clear_ratio": clear_ratio, "cooldown_ms": cooldown_minutes * MINUTE_MS
+        }
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self.stats = {"processed": 0, "events": 0, "dropped": 0, "late": 0}
+
+    def submit(self, unit_id, timestamp, risk_score, severity, thresh_critical, thresh_warning, version=None):
+        """Jalur request: hanya masuk antrian (tidak pernah menunggu). Antrian penuh = dibuang."""
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((
+                unit_id or HISTORY_DEFAULT_UNIT, timestamp, float(risk_score), int(severity),
+                thresh_critical, thresh_warning, version
+            ))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def process(self, items):
+        """Terapkan batch skor ke state unit; kembalikan event perubahan status (belum diterbitkan)."""
+        events = []
+        with self._lock:
+            for unit_id, timestamp, risk_score, severity, thresh_critical, thresh_warning, version in items:
+                t_ms = timestamp if isinstance(timestamp, int) else to_epoch_ms(timestamp)
+                state = self._states.get(unit_id)
+                if state is None:
+                    state = self._states[unit_id] = AlertState()
+                    while len(self._states) > self.max_units:
+                        self._states.popitem(last=False)
+                else:
+                    self._states.move_to_end(unit_id)
+                # Window lebih lama dari yang sudah diproses (upload ulang data lama) tidak mengubah status
+                if state.last_ms is not None and t_ms <= state.last_ms:
+                    self.stats["late"] += 1
+                    continue
+
+                state.version = version
+                change = state.update(t_ms, risk_score, severity, thresh_critical, thresh_warning, **self.rules)
+                if change is not None:
+                    previous, level = change
+                    events.append({
+                        "unit_id": unit_id,
+                        "type": "raised" if level > previous else "cleared",
+                        "from": LEVEL_NAMES[previous],
+                        "to": LEVEL_NAMES[level],
+                        "level": level,
+                        "timestamp": pd.Timestamp(t_ms, unit="ms").isoformat(),
+                        "risk_score": risk_score,
+                        "threshold_critical": thresh_critical,
+                        "threshold_warning": thresh_warning,
+                        "version": version,
+                        "emitted_at": time.time()
+                    })
+            self.stats["processed"] += len(items)
+            self.stats["events"] += len(events)
+        return events
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            # Ambil semua yang sudah menunggu: satu lock dan satu publish per batch
+            batch = [item]
+            stopping = False
+            while len(batch) < 10_000:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self.bus.publish(self.process(batch))
+            except Exception as e:
+                logger.error(f"[ALERT] Gagal memproses {len(batch)} skor: {e}")
+            if stopping:
+                break
+
+    def start(self):
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name="alert-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Hentikan thread setelah semua skor di antrian diproses."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def units(self, active_only=True):
+        """State unit, yang paling parah lebih dulu. active_only: hanya unit berstatus warning/critical."""
+        with self._lock:
+            states = [{"unit_id": unit_id, **state.describe()} for unit_id, state in self._states.items()
+                      if state.level or not active_only]
+        return sorted(states, key=lambda s: -s["level"])
+
+    def unit(self, unit_id):
+        with self._lock:
+            state = self._states.get(unit_id)
+            return {"unit_id": unit_id, **state.describe()} if state is not None else None
+
+    def status(self):
+        with self._lock:
+            levels = [0, 0, 0]
+            for state in self._states.values():
+                levels[state.level] += 1
+        return {
+            **self.stats,
+            "enabled": self.enabled,
+            "pending": self._queue.qsize(),
+            "units": sum(levels),
+            "units_by_state": dict(zip(LEVEL_NAMES, levels)),
+            "rules": {**self.rules, "cooldown_minutes": self.rules["cooldown_ms"] / MINUTE_MS}
+        }
+
+# Inisialisasi Singleton
+alert_bus = AlertBus()
+alert_engine = AlertEngine(alert_bus)
+webhook_sink = WebhookSink(ALERT_WEBHOOK_URL) if ALERT_WEBHOOK_URL else None
+if webhook_sink is not None:
+    alert_bus.add_sink(webhook_sink)
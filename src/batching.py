@@ -0,0 +1,139 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.utils.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+
+class BatchStats:
+    """Statistik batcher: ukuran batch, waktu tunggu antrian dan waktu model."""
+
+    def __init__(self, window=2048):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.queue_wait_ms = deque(maxlen=window)
+        self.model_ms = deque(maxlen=window)
+
+    def record(self, batch_size, waits_ms, model_ms):
+        with self._lock:
+            self.batches += 1
+            self.items += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.batch_sizes.append(batch_size)
+            self.queue_wait_ms.extend(waits_ms)
+            self.model_ms.append(model_ms)
+
+    def snapshot(self):
+        def percentiles(values):
+            if not values:
+                return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3)}
+
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "batch_size": percentiles(list(self.batch_sizes)),
+                "queue_wait_ms": percentiles(list(self.queue_wait_ms)),
+                "model_ms": percentiles(list(self.model_ms))
+            }
+
+class PredictionBatcher:
+    """
+    Menggabungkan window dari request yang datang bersamaan menjadi satu panggilan predict_fn.
+    Batch dikirim saat mencapai max_batch_size atau setelah max_wait_ms sejak window pertama.
+
+    predict_fn(windows, context) dipanggil per context (mis. bundle versi model), sehingga
+    window yang di-scale dengan versi lama tidak tercampur dengan versi baru saat hot-swap.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.stats = BatchStats()
+
+        # Model dijalankan di satu thread khusus agar forward pass tidak saling berebut
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batcher")
+        self._loop = None
+        self._queue = None
+        self._worker = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, window, context=None):
+        """window: (TIME_STEPS, F) yang sudah di-scale. Mengembalikan rekonstruksinya."""
+        self._ensure_started()
+        future = self._loop.create_future()
+        await self._queue.put((window, future, time.perf_counter(), context))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+
+        # Ambil semua yang sudah mengantri, lalu tunggu sisa slot hingga max_wait
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            dispatched = time.perf_counter()
+            waits_ms = [(dispatched - item[2]) * 1000 for item in batch]
+
+            # Kelompokkan per context (biasanya hanya satu)
+            groups = {}
+            for item in batch:
+                groups.setdefault(id(item[3]), []).append(item)
+
+            for items in groups.values():
+                windows = np.stack([item[0] for item in items])
+                try:
+                    reconstruction = await self._loop.run_in_executor(
+                        self._executor, self.predict_fn, windows, items[0][3]
+                    )
+                except Exception as e:
+                    for _, future, _, _ in items:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                for i, (_, future, _, _) in enumerate(items):
+                    if not future.done():
+                        future.set_result(reconstruction[i])
+
+            self.stats.record(len(batch), waits_ms, (time.perf_counter() - dispatched) * 1000)
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
@@ -0,0 +1,289 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+from src.utils.config import (
+    FEATURE_COLS, HISTORY_ENABLED, HISTORY_DB_PATH, HISTORY_FLUSH_ROWS, HISTORY_FLUSH_SECONDS,
+    HISTORY_QUEUE_SIZE, HISTORY_DEFAULT_UNIT, HISTORY_TOP_K, HISTORY_MAX_POINTS
+)
+
+logger = get_logger("history")
+
+# Riwayat hasil scoring per unit dan per menit (akhir window), di SQLite mode WAL:
+# satu thread penulis (batch per transaksi), pembaca /history tidak memblokir penulis.
+#   scores  : PK (unit_id, ts) WITHOUT ROWID -> tersusun per unit lalu waktu, query rentang = range scan
+#   rollups : min/mean/max risk per bucket 5 menit dan 1 jam untuk grafik rentang panjang
+
+MINUTE_MS = 60_000
+ROLLUP_RESOLUTIONS = {"5m": 5 * MINUTE_MS, "1h": 60 * MINUTE_MS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    unit_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    risk_score REAL NOT NULL,
+    severity INTEGER NOT NULL,
+    top_features TEXT NOT NULL,
+    mae BLOB NOT NULL,
+    version TEXT,
+    PRIMARY KEY (unit_id, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollups (
+    unit_id TEXT NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    risk_min REAL NOT NULL,
+    risk_sum REAL NOT NULL,
+    risk_max REAL NOT NULL,
+    severity_max INTEGER NOT NULL,
+    PRIMARY KEY (unit_id, resolution, bucket)
+) WITHOUT ROWID;
+"""
+
+# Menit yang sama dari unit yang sama di-scoring ulang -> hasil terbaru menang
+UPSERT_SCORE = """
+INSERT INTO scores (unit_id, ts, risk_score, severity, top_features, mae, version)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (unit_id, ts) DO UPDATE SET
+    risk_score = excluded.risk_score, severity = excluded.severity,
+    top_features = excluded.top_features, mae = excluded.mae, version = excluded.version
+"""
+
+# Bucket yang tersentuh batch dihitung ulang dari tabel scores (idempoten terhadap upsert di atas)
+REFRESH_ROLLUP = """
+INSERT OR REPLACE INTO rollups (unit_id, resolution, bucket, n, risk_min, risk_sum, risk_max, severity_max)
+SELECT unit_id, ?, ?, COUNT(*), MIN(risk_score), SUM(risk_score), MAX(risk_score), MAX(severity)
+FROM scores WHERE unit_id = ? AND ts >= ? AND ts < ?
+GROUP BY unit_id
+"""
+
+_STOP = object()
+
+def to_epoch_ms(timestamp):
+    return pd.Timestamp(timestamp).value // 1_000_000
+
+def _iso(ms):
+    return pd.to_datetime(np.asarray(ms, dtype=np.int64), unit="ms").strftime("%Y-%m-%dT%H:%M:%S").tolist()
+
+def pick_resolution(start_ms, end_ms, max_points=HISTORY_MAX_POINTS):
+    """Resolusi paling detail yang jumlah titiknya (1 per menit per bucket) masih <= max_points."""
+    span = max(end_ms - start_ms, 0)
+    if span / MINUTE_MS <= max_points:
+        return "raw"
+    for name, size in ROLLUP_RESOLUTIONS.items():
+        if span / size <= max_points:
+            return name
+    return "1h"
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB_PATH, flush_rows=HISTORY_FLUSH_ROWS,
+                 flush_seconds=HISTORY_FLUSH_SECONDS, queue_size=HISTORY_QUEUE_SIZE, enabled=HISTORY_ENABLED):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._local = threading.local()
+        self.stats = {"written": 0, "dropped": 0, "batches": 0, "last_batch_ms": 0.0}
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _reader(self):
+        # Satu koneksi baca per thread (endpoint sync FastAPI berjalan di threadpool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # Penulisan
+
+    def record(self, unit_id, timestamp, report, mae, version=None):
+        """Jalur request: hanya masuk antrian (tidak pernah menunggu disk). Antrian penuh = dibuang."""
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait((
+                unit_id or HISTORY_DEFAULT_UNIT, to_epoch_ms(timestamp), float(report["risk_score"]),
+                int(report["severity_level"]), np.asarray(mae, dtype=np.float32), version
+            ))
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def write_batch(self, items, conn=None):
+        """Tulis banyak hasil scoring dalam satu transaksi + perbarui rollup bucket yang tersentuh."""
+        if not items:
+            return 0
+        conn = conn or self._reader()
+        start = time.perf_counter()
+
+        mae = np.stack([item[4] for item in items])
+        top_idx = np.argsort(-mae, axis=1, kind="stable")[:, :HISTORY_TOP_K]
+        names = np.array(FEATURE_COLS, dtype=object)[top_idx]
+        rows = [
+            (unit_id, ts, risk, severity, json.dumps(list(top)), mae_row.tobytes(), version)
+            for (unit_id, ts, risk, severity, _, version), top, mae_row in zip(items, names, mae)
+        ]
+
+        touched = {(unit_id, ts) for unit_id, ts, *_ in items}
+        refresh = []
+        for size in ROLLUP_RESOLUTIONS.values():
+            buckets = {(unit_id, ts - ts % size) for unit_id, ts in touched}
+            refresh.extend((size, bucket, unit_id, bucket, bucket + size) for unit_id, bucket in buckets)
+
+        with conn:
+            conn.executemany(UPSERT_SCORE, rows)
+            conn.executemany(REFRESH_ROLLUP, refresh)
+
+        self.stats["written"] += len(rows)
+        self.stats["batches"] += 1
+        self.stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return len(rows)
+
+    def _run(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                continue
+            if item is _STOP:
+                break
+
+            # Kumpulkan sampai flush_rows atau flush_seconds sejak item pertama
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.flush_rows:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self.write_batch(batch, conn)
+            except Exception as e:
+                self.stats["dropped"] += len(batch)
+                logger.error(f"[HISTORY] Gagal menulis {len(batch)} baris: {e}")
+
+        # Sisa antrian saat shutdown
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        self.write_batch(remaining, conn)
+        conn.close()
+
+    def start(self):
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Hentikan thread penulis setelah semua antrian tertulis."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def status(self):
+        return {**self.stats, "enabled": self.enabled, "pending": self._queue.qsize(), "path": str(self.path)}
+
+    # Pembacaan
+
+    def units(self):
+        rows = self._reader().execute(
+            "SELECT unit_id, COUNT(*), MIN(ts), MAX(ts) FROM scores GROUP BY unit_id"
+        ).fetchall()
+        return [
+            {"unit_id": unit_id, "windows": n, "first": _iso([first])[0], "last": _iso([last])[0]}
+            for unit_id, n, first, last in rows
+        ]
+
+    def query(self, unit_id, start=None, end=None, resolution="auto"):
+        """
+        Riwayat satu unit dalam rentang [start, end]. Default: 24 jam terakhir yang tercatat untuk unit itu.
+        resolution: raw (per menit), 5m, 1h atau auto (paling detail dengan <= HISTORY_MAX_POINTS titik).
+        Maksimal HISTORY_MAX_POINTS titik terawal; truncated=True jika rentang punya lebih banyak titik.
+        """
+        conn = self._reader()
+        if end is None:
+            (last,) = conn.execute("SELECT MAX(ts) FROM scores WHERE unit_id = ?", (unit_id,)).fetchone()
+            if last is None:
+                return None
+            end_ms = last
+        else:
+            end_ms = to_epoch_ms(end)
+        start_ms = to_epoch_ms(start) if start is not None else end_ms - 24 * 60 * MINUTE_MS
+
+        if resolution == "auto":
+            resolution = pick_resolution(start_ms, end_ms)
+        if resolution != "raw" and resolution not in ROLLUP_RESOLUTIONS:
+            raise ValueError(f"Resolusi '{resolution}' tidak dikenal. Pilihan: raw, {', '.join(ROLLUP_RESOLUTIONS)}, auto")
+
+        result = {"unit_id": unit_id, "resolution": resolution, "start": _iso([start_ms])[0], "end": _iso([end_ms])[0]}
+        if resolution == "raw":
+            rows = conn.execute(
+                "SELECT ts, risk_score, severity, top_features, mae, version FROM scores "
+                "WHERE unit_id = ? AND ts BETWEEN ? AND ? ORDER BY ts LIMIT ?",
+                (unit_id, start_ms, end_ms, HISTORY_MAX_POINTS + 1)
+            ).fetchall()
+            truncated, rows = len(rows) > HISTORY_MAX_POINTS, rows[:HISTORY_MAX_POINTS]
+            ts, risk, severity, top, mae, versions = zip(*rows) if rows else ([],) * 6
+            mae = np.frombuffer(b"".join(mae), dtype=np.float32).reshape(len(rows), len(FEATURE_COLS))
+            return {
+                **result,
+                "truncated": truncated,
+                "timestamps": _iso(ts),
+                "risk_score": list(risk),
+                "severity_level": list(severity),
+                "top_features": [json.loads(item) for item in top],
+                "mae_per_feature": {name: mae[:, i].astype(float).round(6).tolist() for i, name in enumerate(FEATURE_COLS)},
+                "versions": sorted(set(v for v in versions if v))
+            }
+
+        size = ROLLUP_RESOLUTIONS[resolution]
+        rows = conn.execute(
+            "SELECT bucket, n, risk_min, risk_sum, risk_max, severity_max FROM rollups "
+            "WHERE unit_id = ? AND resolution = ? AND bucket BETWEEN ? AND ? ORDER BY bucket LIMIT ?",
+            (unit_id, size, start_ms - start_ms % size, end_ms, HISTORY_MAX_POINTS + 1)
+        ).fetchall()
+        truncated, rows = len(rows) > HISTORY_MAX_POINTS, rows[:HISTORY_MAX_POINTS]
+        bucket, n, risk_min, risk_sum, risk_max, severity_max = zip(*rows) if rows else ([],) * 6
+        return {
+            **result,
+            "truncated": truncated,
+            "timestamps": _iso(bucket),
+            "count": list(n),
+            "risk_min": list(risk_min),
+            "risk_mean": [total / count for total, count in zip(risk_sum, n)],
+            "risk_max": list(risk_max),
+            "severity_max": list(severity_max)
+        }
+
+# Inisialisasi Singleton
+history_store = HistoryStore()
@@ -1,26 +1,255 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from src.utils.config import RAW_SENSOR_COLS, FEATURE_COLS
 
+# Jumlah bar terakhir yang dibawa ke chunk berikutnya (diff butuh 1, rolling std butuh 4)
+FEATURE_CARRY_BARS = 4
+ROLL_WINDOW = 5
+MINUTE_NS = 60 * 10**9
+
+# Posisi kolom mentah yang dipakai fitur turunan
+IDX_TP2 = RAW_SENSOR_COLS.index('TP2')
+IDX_TP3 = RAW_SENSOR_COLS.index('TP3')
+IDX_OIL = RAW_SENSOR_COLS.index('Oil_temperature')
+IDX_MOTOR = RAW_SENSOR_COLS.index('Motor_current')
+RAW_COLUMNS = pd.Index(RAW_SENSOR_COLS)
+
+def _raw_values(frame: pd.DataFrame) -> np.ndarray:
+    """Kolom RAW_SENSOR_COLS sebagai array; tanpa seleksi kolom (mahal per frame) jika urutannya sudah sama."""
+    if frame.columns.equals(RAW_COLUMNS):
+        return frame.to_numpy()
+    return frame[RAW_SENSOR_COLS].to_numpy()
+
+def _bucket_means(keys: np.ndarray, values: np.ndarray):
+    """
+    Rata-rata values per nilai keys (int64) yang sama, hanya bucket tanpa NaN (setara mean().dropna()).
+    Jumlah per bucket lewat np.add.reduceat; sort hanya jika keys belum terurut.
+    Mengembalikan (key unik terurut (M,), rata-rata float64 (M, F)).
+    """
+    values = np.asarray(values)
+    if len(values) == 0:
+        return np.empty(0, dtype=np.int64), np.empty((0, values.shape[1]))
+
+    step = np.diff(keys)
+    if (step < 0).any():
+        order = np.argsort(keys, kind='stable')
+        keys, values = keys[order], values[order]
+        step = np.diff(keys)
+
+    starts = np.r_[0, np.flatnonzero(step) + 1]
+    # Per kolom: values.T dari DataFrame sudah contiguous (blok pandas disimpan per kolom).
+    # Akumulasi dalam dtype input (float32 dari cache SensorStore), hasil akhir float64.
+    columns = values.T if values.dtype.kind == 'f' else values.T.astype(np.float64)
+    sums = np.add.reduceat(columns, starts, axis=1)
+    if np.isnan(sums).any():
+        # Ada NaN: rata-rata per kolom mengabaikan NaN (skipna), bucket tanpa nilai sama sekali jadi NaN
+        missing = np.isnan(columns)
+        sums = np.add.reduceat(np.where(missing, 0, columns), starts, axis=1)
+        counts = np.add.reduceat(~missing, starts, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bars = sums / counts.astype(columns.dtype)
+    else:
+        bars = sums / np.diff(np.r_[starts, len(keys)]).astype(columns.dtype)
+    bars = bars.astype(np.float64)
+
+    complete = ~np.isnan(bars).any(axis=0)
+    return keys[starts][complete], bars[:, complete].T
+
+def minute_bars(timestamps_ns: np.ndarray, values: np.ndarray):
+    """
+    Rata-rata per menit, setara resample('1min').mean().dropna().
+    Menit = floor(timestamp ns / 60 detik). Mengembalikan (awal menit ns (M,), bar float64 (M, F)).
+    """
+    minutes, bars = _bucket_means(np.asarray(timestamps_ns, dtype=np.int64) // MINUTE_NS, values)
+    return minutes * MINUTE_NS, bars
+
+def _diff_fill(x):
+    out = np.zeros_like(x)
+    np.subtract(x[1:], x[:-1], out=out[1:])
+    out[np.isnan(out)] = 0
+    return out
+
+def _rolling_std(x, window=ROLL_WINDOW):
+    """Std sampel (ddof=1) bergulir; dua lintasan atas slice bergeser agar stabil untuk nilai konstan."""
+    out = np.zeros_like(x)
+    n = len(x) - window + 1
+    if n > 0:
+        shifted = [x[k : k + n] for k in range(window)]
+        mean = sum(shifted) / window
+        out[window - 1:] = np.sqrt(sum((s - mean) ** 2 for s in shifted) / (window - 1))
+        out[np.isnan(out)] = 0
+    return out
+
+def compute_features(bars: np.ndarray, segment_pos: np.ndarray = None):
+    """
+    Bar (M, RAW_SENSOR_COLS) -> (fitur (M, FEATURE_COLS) float64, mask baris tanpa NaN).
+    Sama dengan add_features versi pandas: diff/rolling std diisi 0 di awal, baris NaN dibuang pemanggil.
+    segment_pos: posisi bar di dalam segmennya (banyak unit digabung), awal tiap segmen diperlakukan
+    seperti awal data.
+    """
+    bars = np.asarray(bars, dtype=np.float64)
+
+    def diff(x):
+        out = _diff_fill(x)
+        if segment_pos is not None:
+            out[segment_pos == 0] = 0
+        return out
+
+    def rolling_std(x):
+        out = _rolling_std(x)
+        if segment_pos is not None:
+            out[segment_pos < ROLL_WINDOW - 1] = 0
+        return out
+
+    derived = {
+        'TP2_grad': lambda: diff(bars[:, IDX_TP2]),
+        'Oil_temp_grad': lambda: diff(bars[:, IDX_OIL]),
+        'Efficiency_Index': lambda: bars[:, IDX_TP3] / (bars[:, IDX_MOTOR] + 0.1),
+        'TP3_roll_std': lambda: rolling_std(bars[:, IDX_TP3]),
+    }
+
+    # Disusun per kolom (F, M): .T langsung menjadi blok DataFrame tanpa salinan
+    features = np.empty((len(FEATURE_COLS), len(bars)))
+    for i, col in enumerate(FEATURE_COLS):
+        features[i] = derived[col]() if col in derived else bars[:, RAW_SENSOR_COLS.index(col)]
+    return features.T, ~np.isnan(features).any(axis=0)
+
+def _feature_frame(features, valid, index):
+    if valid.all():
+        return pd.DataFrame(features, index=index, columns=FEATURE_COLS, copy=False)
+    return pd.DataFrame(features[valid], index=index[valid], columns=FEATURE_COLS, copy=False)
+
+def _minute_index(minutes_ns, like: pd.DatetimeIndex):
+    index = pd.DatetimeIndex(minutes_ns.view('datetime64[ns]'), name=like.name)
+    if like.tz is not None:
+        index = index.tz_localize('UTC').tz_convert(like.tz)
+    return index.as_unit(like.unit)
+
+def add_features(df_clean: pd.DataFrame) -> pd.DataFrame:
+    """Fitur turunan dari bar per menit (kolom RAW_SENSOR_COLS)."""
+    features, valid = compute_features(df_clean[RAW_SENSOR_COLS].to_numpy(dtype=np.float64))
+    return _feature_frame(features, valid, df_clean.index)
+
 def process_input_data(df: pd.DataFrame) -> pd.DataFrame:
-    df_clean = df[RAW_SENSOR_COLS].copy()
-    
-    if isinstance(df_clean.index, pd.DatetimeIndex):
-        df_clean = df_clean.resample('1min').mean().dropna()
-    
-    df_clean['TP2_grad'] = df_clean['TP2'].diff().fillna(0)
-    df_clean['Oil_temp_grad'] = df_clean['Oil_temperature'].diff().fillna(0)
-    df_clean['Efficiency_Index'] = df_clean['TP3'] / (df_clean['Motor_current'] + 0.1)
-    df_clean['TP3_roll_std'] = df_clean['TP3'].rolling(window=5).std().fillna(0)
-    
-    return df_clean[FEATURE_COLS].dropna()
-
-def prepare_lstm_sequence(scaled_data: np.ndarray, time_steps: int = 30):
-    output = []
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return add_features(df)
+
+    minutes, bars = minute_bars(df.index.as_unit('ns').asi8, df[RAW_SENSOR_COLS].to_numpy())
+    features, valid = compute_features(bars)
+    return _feature_frame(features, valid, _minute_index(minutes, df.index))
+
+def iter_feature_chunks(raw_chunks):
+    """
+    process_input_data untuk data yang datang per chunk (batas chunk harus di batas menit).
+    Bar terakhir chunk sebelumnya ikut dihitung agar diff/rolling sama dengan hasil sekali jalan.
+    """
+    carry = np.empty((0, len(RAW_SENSOR_COLS)))
+    for chunk in raw_chunks:
+        minutes, bars = minute_bars(chunk.index.as_unit('ns').asi8, chunk[RAW_SENSOR_COLS].to_numpy())
+        if not len(bars):
+            continue
+        n_carry = len(carry)
+        combined = np.concatenate([carry, bars])
+        carry = combined[-FEATURE_CARRY_BARS:]
+        features, valid = compute_features(combined)
+        yield _feature_frame(features[n_carry:], valid[n_carry:], _minute_index(minutes, chunk.index))
+
+def fleet_feature_windows(frames, time_steps: int = 30):
+    """
+    Window fitur terakhir (belum di-scale) untuk banyak unit dalam satu lintasan, setara
+    process_input_data(frame).iloc[-time_steps:] per unit. Semua pembacaan digabung dengan
+    key (unit, menit), dirata-rata sekali, lalu fitur dihitung sekali dengan reset di awal tiap unit.
+
+    Mengembalikan (windows (K, time_steps, F) untuk unit yang datanya cukup, indeks unit tsb (K,),
+    jumlah bar bersih per unit (N,), menit terakhir window per unit yang cukup (datetime64[ns] (K,))).
+    """
+    n_units = len(frames)
+    lengths = np.array([len(frame) for frame in frames])
+    n_features = len(FEATURE_COLS)
+    if lengths.sum() == 0:
+        empty = np.empty((0, time_steps, n_features))
+        return empty, np.empty(0, dtype=np.intp), np.zeros(n_units, dtype=np.int64), np.empty(0, dtype='datetime64[ns]')
+
+    minutes = np.concatenate([frame.index.as_unit('ns').asi8 for frame in frames]) // MINUTE_NS
+    values = np.concatenate([_raw_values(frame) for frame in frames])
+    base = minutes.min()
+    span = minutes.max() - base + 1
+    keys = np.repeat(np.arange(n_units, dtype=np.int64), lengths) * span + (minutes - base)
+
+    keys, bars = _bucket_means(keys, values)
+    bar_unit = keys // span
+
+    # Posisi bar di dalam unitnya (0 = bar pertama unit itu)
+    first_bar = np.searchsorted(bar_unit, np.arange(n_units))
+    segment_pos = np.arange(len(bars)) - first_bar[bar_unit]
+    features, valid = compute_features(bars, segment_pos)
+
+    valid_rows = np.flatnonzero(valid)
+    n_clean = np.bincount(bar_unit[valid_rows], minlength=n_units)
+    ok_units = np.flatnonzero(n_clean >= time_steps)
+
+    # time_steps bar bersih terakhir per unit (baris valid tersusun per unit lalu menit)
+    last = np.cumsum(n_clean)[ok_units] - 1
+    rows = valid_rows[last[:, None] - time_steps + 1 + np.arange(time_steps)]
+    window_end = ((keys[rows[:, -1]] % span + base) * MINUTE_NS).view('datetime64[ns]')
+    return features[rows], ok_units, n_clean, window_end
+
+def window_end_positions(n_rows: int, time_steps: int = 30, stride: int = 1) -> np.ndarray:
+    """Posisi baris terakhir tiap window. Window dijangkarkan ke data terbaru."""
+    first_start = (n_rows - time_steps) % stride
+    return np.arange(first_start, n_rows - time_steps + 1, stride) + time_steps - 1
+
+def prepare_lstm_sequence(scaled_data: np.ndarray, time_steps: int = 30, stride: int = 1,
+                          as_view: bool = False, dtype=None):
+    """
+    Susun data 2D (N, F) menjadi window 3D (jumlah_window, time_steps, F).
+
+    as_view=True mengembalikan sliding-window view read-only tanpa menyalin data;
+    dtype (mis. np.float32) hanya mengkonversi array 2D sumbernya, bukan window 3D.
+    """
     if len(scaled_data) < time_steps:
         raise ValueError(f"Data kurang panjang! Butuh min {time_steps} baris, punya {len(scaled_data)}.")
-        
-    for i in range(len(scaled_data) - time_steps + 1):
-        output.append(scaled_data[i : (i + time_steps)])
-    
-    return np.array(output)
\ No newline at end of file
+
+    data = np.asarray(scaled_data, dtype=dtype)
+    first_start = (len(data) - time_steps) % stride
+
+    # sliding_window_view -> (N - T + 1, F, T), ditukar menjadi (N - T + 1, T, F)
+    windows = sliding_window_view(data, time_steps, axis=0).transpose(0, 2, 1)[first_start::stride]
+
+    if as_view:
+        return windows
+    return np.ascontiguousarray(windows)
+
+def count_windows(n_rows: int, time_steps: int = 30, stride: int = 1) -> int:
+    if n_rows < time_steps:
+        return 0
+    return (n_rows - time_steps) // stride + 1
+
+def iter_lstm_batches(scaled_data: np.ndarray, time_steps: int = 30, batch_size: int = 256,
+                      stride: int = 1, start: int = 0, end: int = None, dtype=np.float32):
+    """Generator batch window (copy hanya sebesar satu batch). start/end = indeks window."""
+    windows = prepare_lstm_sequence(scaled_data, time_steps, stride=stride, as_view=True)
+    end = len(windows) if end is None else min(end, len(windows))
+
+    for i in range(start, end, batch_size):
+        yield np.ascontiguousarray(windows[i : min(i + batch_size, end)], dtype=dtype)
+
+def make_window_dataset(scaled_data: np.ndarray, time_steps: int = 30, batch_size: int = 64,
+                        stride: int = 1, start: int = 0, end: int = None, autoencoder: bool = True):
+    """
+    Sumber tf.data untuk fit/predict tanpa memuat seluruh tensor 3D ke memori.
+    autoencoder=True menghasilkan pasangan (x, x) untuk model.fit.
+    """
+    import tensorflow as tf
+
+    n_features = np.shape(scaled_data)[1]
+    signature = tf.TensorSpec(shape=(None, time_steps, n_features), dtype=tf.float32)
+
+    dataset = tf.data.Dataset.from_generator(
+        lambda: iter_lstm_batches(scaled_data, time_steps, batch_size, stride, start, end),
+        output_signature=signature
+    )
+    if autoencoder:
+        dataset = dataset.map(lambda x: (x, x))
+    return dataset.prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,198 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.utils.logger import get_logger
+from src.utils.config import RAW_CSV_PATH, RAW_SENSOR_COLS, FEATURE_COLS, DATA_CACHE_DIR, INGEST_CHUNK_ROWS
+
+MINUTE_NS = 60 * 10**9
+
+logger = get_logger("store")
+
+# Cache kolumnar dataset mentah: timestamps.npy (int64 ns, terurut) + values.npy (float32, N x RAW_SENSOR_COLS).
+# Keduanya dibaca dengan memory-map, sehingga baca rentang tanggal hanya menyentuh halaman yang dibutuhkan.
+
+def range_bound(value, side):
+    """Batas rentang dengan semantik partial-string pandas: '2020-03-01' sebagai end = sampai akhir hari itu."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        period = pd.Period(value)
+        return (period.start_time if side == "start" else period.end_time).value
+    return pd.Timestamp(value).value
+
+class SensorStore:
+    def __init__(self, csv_path=RAW_CSV_PATH, cache_dir=DATA_CACHE_DIR):
+        self.csv_path = str(csv_path)
+        self.cache_dir = cache_dir
+        self.timestamps_path = cache_dir / "timestamps.npy"
+        self.values_path = cache_dir / "values.npy"
+        self.meta_path = cache_dir / "meta.json"
+        self._timestamps = None
+        self._values = None
+
+    def _source_signature(self):
+        stat = os.stat(self.csv_path)
+        return {"path": self.csv_path, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+    def is_fresh(self):
+        """Cache ada dan dibuat dari CSV yang sama (ukuran + waktu modifikasi)."""
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        if meta.get("columns") != RAW_SENSOR_COLS:
+            return False
+        if not os.path.exists(self.csv_path):
+            return True  # CSV sudah dihapus, cache tetap bisa dipakai
+        return meta.get("source") == self._source_signature()
+
+    def build(self, chunksize=INGEST_CHUNK_ROWS):
+        """Konversi CSV/Parquet sekali jalan, per chunk: hanya kolom sensor, float32."""
+        if not os.path.exists(self.csv_path):
+            raise FileNotFoundError(f"File tidak ditemukan di {self.csv_path}")
+
+        logger.info(f"[STORE] Membangun cache dari {self.csv_path} ...")
+        ts_chunks, value_chunks = [], []
+        for chunk in self._read_source(chunksize):
+            ts_chunks.append(pd.to_datetime(chunk["timestamp"]).to_numpy("datetime64[ns]").view(np.int64))
+            value_chunks.append(chunk[RAW_SENSOR_COLS].to_numpy(np.float32))
+
+        timestamps = np.concatenate(ts_chunks)
+        values = np.concatenate(value_chunks)
+        if len(timestamps) > 1 and np.any(np.diff(timestamps) < 0):
+            order = np.argsort(timestamps, kind="stable")
+            timestamps, values = timestamps[order], values[order]
+
+        # Tulis ke file sementara lalu os.replace agar pembaca tidak melihat cache setengah jadi
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for path, array in ((self.timestamps_path, timestamps), (self.values_path, values)):
+            tmp_path = path.with_name(path.stem + ".tmp.npy")
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+
+        meta = {
+            "source": self._source_signature(),
+            "columns": RAW_SENSOR_COLS,
+            "rows": int(len(timestamps)),
+            "first": str(pd.Timestamp(timestamps[0])) if len(timestamps) else None,
+            "last": str(pd.Timestamp(timestamps[-1])) if len(timestamps) else None
+        }
+        with open(self.meta_path, "w") as f:
+            json.dump(meta, f, indent=2)
+
+        self._timestamps = self._values = None
+        logger.info(f"[STORE] Selesai: {meta['rows']} baris ({meta['first']} s/d {meta['last']}).")
+        return meta
+
+    def _read_source(self, chunksize):
+        """Chunk DataFrame (timestamp + RAW_SENSOR_COLS) dari CSV, atau Parquet per row group (pyarrow opsional)."""
+        columns = ["timestamp"] + RAW_SENSOR_COLS
+        if self.csv_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            for batch in pq.ParquetFile(self.csv_path).iter_batches(batch_size=chunksize, columns=columns):
+                yield batch.to_pandas()
+            return
+        yield from pd.read_csv(
+            self.csv_path, usecols=columns, dtype={col: np.float32 for col in RAW_SENSOR_COLS}, chunksize=chunksize
+        )
+
+    def ensure(self):
+        if not self.is_fresh():
+            self.build()
+        if self._timestamps is None:
+            self._timestamps = np.load(self.timestamps_path, mmap_mode="r")
+            self._values = np.load(self.values_path, mmap_mode="r")
+        return self
+
+    def range_slice(self, start=None, end=None):
+        """Indeks baris [lo, hi) untuk rentang tanggal (binary search pada timestamps)."""
+        self.ensure()
+        start, end = range_bound(start, "start"), range_bound(end, "end")
+        lo = 0 if start is None else int(np.searchsorted(self._timestamps, start, side="left"))
+        hi = len(self._timestamps) if end is None else int(np.searchsorted(self._timestamps, end, side="right"))
+        return slice(lo, max(lo, hi))
+
+    def load_range(self, start=None, end=None, columns=None):
+        """
+        DataFrame sensor (index timestamp) untuk rentang tanggal, setara df[start:end] pada CSV mentah.
+        Hanya baris dalam rentang yang disalin dari memory-map.
+        """
+        return self._frame(self.range_slice(start, end), columns)
+
+    def iter_range_chunks(self, start=None, end=None, chunk_rows=INGEST_CHUNK_ROWS):
+        """
+        load_range per chunk ~chunk_rows baris. Batas chunk digeser ke batas menit
+        agar resample 1 menit per chunk sama dengan resample sekali jalan.
+        """
+        rows = self.range_slice(start, end)
+        position = rows.start
+        while position < rows.stop:
+            stop = min(position + chunk_rows, rows.stop)
+            if stop < rows.stop:
+                minute_end = (int(self._timestamps[stop - 1]) // MINUTE_NS + 1) * MINUTE_NS
+                stop = min(int(np.searchsorted(self._timestamps, minute_end, side="left")), rows.stop)
+            yield self._frame(slice(position, stop))
+            position = stop
+
+    def _frame(self, rows, columns=None):
+        columns = columns or RAW_SENSOR_COLS
+        col_idx = [RAW_SENSOR_COLS.index(col) for col in columns]
+
+        index = pd.DatetimeIndex(np.array(self._timestamps[rows]).view("datetime64[ns]"), name="timestamp")
+        # Fancy indexing sudah menghasilkan salinan, DataFrame tidak perlu menyalin lagi
+        return pd.DataFrame(self._values[rows][:, col_idx], index=index, columns=columns, copy=False)
+
+def write_feature_memmap(feature_chunks, path, transform=None, on_chunk=None):
+    """
+    Tulis chunk fitur (DataFrame FEATURE_COLS) ke file float32 mentah di disk.
+    transform: mis. scaler.transform; on_chunk: mis. scaler.partial_fit.
+    Mengembalikan (memmap (N, F), timestamps int64 ns).
+    """
+    path = str(path)
+    timestamps = []
+    with open(path, "wb") as f:
+        for chunk in feature_chunks:
+            if on_chunk is not None:
+                on_chunk(chunk)
+            values = chunk if transform is None else transform(chunk)
+            np.asarray(values, dtype=np.float32).tofile(f)
+            timestamps.append(chunk.index.values.astype("datetime64[ns]").view(np.int64))
+
+    if not timestamps or os.path.getsize(path) == 0:
+        raise ValueError("Tidak ada data bersih pada rentang yang diminta.")
+    return open_feature_memmap(path), np.concatenate(timestamps)
+
+def open_feature_memmap(path, mode="r"):
+    return np.memmap(path, dtype=np.float32, mode=mode).reshape(-1, len(FEATURE_COLS))
+
+def scale_feature_memmap(path, scaler, chunk_rows=INGEST_CHUNK_ROWS):
+    """Terapkan scaler ke file fitur per chunk (in-place), memori tetap sebesar satu chunk."""
+    features = open_feature_memmap(path, mode="r+")
+    for i in range(0, len(features), chunk_rows):
+        block = pd.DataFrame(features[i : i + chunk_rows], columns=FEATURE_COLS)
+        features[i : i + chunk_rows] = scaler.transform(block)
+    features.flush()
+    return open_feature_memmap(path)
+
+# Inisialisasi Singleton
+sensor_store = SensorStore()
+
+def load_range(start=None, end=None, columns=None):
+    return sensor_store.load_range(start, end, columns)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bangun cache kolumnar dari CSV MetroPT-3.")
+    parser.add_argument("--rebuild", action="store_true", help="Bangun ulang walau cache masih valid.")
+    args = parser.parse_args()
+
+    if args.rebuild or not sensor_store.is_fresh():
+        sensor_store.build()
+    else:
+        print(f"[STORE] Cache masih valid: {sensor_store.cache_dir}")
@@ -0,0 +1,79 @@
+import struct
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import RAW_SENSOR_COLS
+
+# Format input kolumnar /predict tanpa objek Python per baris.
+#
+# Raw biner (application/octet-stream), little-endian:
+#   header  : magic b"MPT1", uint32 n_rows, uint16 n_cols (= len(RAW_SENSOR_COLS)), uint16 reserved
+#   body    : int64[n_rows] timestamp epoch ns, lalu float32[n_cols][n_rows] per kolom RAW_SENSOR_COLS
+#
+# Arrow IPC stream (application/vnd.apache.arrow.stream): kolom "timestamp" + RAW_SENSOR_COLS (butuh pyarrow).
+
+RAW_MAGIC = b"MPT1"
+RAW_HEADER = struct.Struct("<4sIHH")
+
+RAW_CONTENT_TYPE = "application/octet-stream"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+def frame_from_arrays(timestamps, values):
+    """timestamps (N,) datetime64/epoch ns + values (N, F) -> DataFrame seperti readings_to_frame."""
+    index = pd.DatetimeIndex(np.asarray(timestamps).astype("datetime64[ns]"), name="timestamp")
+    return pd.DataFrame(values, index=index, columns=RAW_SENSOR_COLS, copy=False)
+
+def parse_timestamps(timestamps):
+    """Timestamp dari JSON kolumnar: list epoch milidetik (int) atau string ISO-8601."""
+    if len(timestamps) and isinstance(timestamps[0], str):
+        return pd.to_datetime(timestamps, format="ISO8601").to_numpy("datetime64[ns]")
+    return np.asarray(timestamps, dtype=np.int64).astype("datetime64[ms]").astype("datetime64[ns]")
+
+def encode_raw(timestamps, values):
+    """Kebalikan decode_raw (dipakai klien & benchmark)."""
+    timestamps = np.asarray(timestamps).astype("datetime64[ns]").view(np.int64)
+    values = np.asarray(values, dtype=np.float32)
+    n_rows, n_cols = values.shape
+    header = RAW_HEADER.pack(RAW_MAGIC, n_rows, n_cols, 0)
+    return header + timestamps.astype("<i8").tobytes() + np.ascontiguousarray(values.T).astype("<f4").tobytes()
+
+def decode_raw(body):
+    """Body biner -> (timestamps datetime64[ns] (N,), values float32 (N, F)) tanpa menyalin per baris."""
+    if len(body) < RAW_HEADER.size:
+        raise ValueError("Body terlalu pendek untuk header.")
+    magic, n_rows, n_cols, _ = RAW_HEADER.unpack_from(body)
+    if magic != RAW_MAGIC:
+        raise ValueError("Magic header tidak dikenal (harus MPT1).")
+    if n_cols != len(RAW_SENSOR_COLS):
+        raise ValueError(f"Butuh {len(RAW_SENSOR_COLS)} kolom ({', '.join(RAW_SENSOR_COLS)}), dapat {n_cols}.")
+
+    expected = RAW_HEADER.size + n_rows * 8 + n_rows * n_cols * 4
+    if len(body) != expected:
+        raise ValueError(f"Ukuran body {len(body)} byte, seharusnya {expected} byte untuk {n_rows} baris.")
+
+    offset = RAW_HEADER.size
+    timestamps = np.frombuffer(body, dtype="<i8", count=n_rows, offset=offset).view("datetime64[ns]")
+    columns = np.frombuffer(body, dtype="<f4", count=n_rows * n_cols, offset=offset + n_rows * 8)
+    return timestamps, columns.reshape(n_cols, n_rows).T
+
+def decode_arrow(body):
+    """Arrow IPC stream -> (timestamps, values). pyarrow opsional; ImportError jika tidak terpasang."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all()
+    missing = [col for col in ["timestamp"] + RAW_SENSOR_COLS if col not in table.column_names]
+    if missing:
+        raise ValueError(f"Kolom tidak ada: {', '.join(missing)}")
+
+    timestamps = table.column("timestamp").to_numpy().astype("datetime64[ns]")
+    values = np.column_stack([table.column(col).to_numpy().astype(np.float32, copy=False) for col in RAW_SENSOR_COLS])
+    return timestamps, values
+
+def decode_body(body, content_type):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    if content_type == RAW_CONTENT_TYPE:
+        return decode_raw(body)
+    if content_type == ARROW_CONTENT_TYPE:
+        return decode_arrow(body)
+    raise ValueError(f"Content-Type '{content_type}' tidak didukung. Pakai {RAW_CONTENT_TYPE} atau {ARROW_CONTENT_TYPE}.")
@@ -1,54 +1,456 @@
-import joblib
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime
+
 import numpy as np
-import tensorflow as tf
+import pandas as pd
+
+from src.utils.config import (
+    FEATURE_COLS, TIME_STEPS, TIMELINE_BATCH_SIZE, INFERENCE_BACKEND, ARTIFACT_POLL_SECONDS,
+    PREFILTER_ENABLED, MODEL_VARIANT
+)
+from src.models.backends import load_backend
+from src.models.registry import resolve_artifacts, current_version
+from src.data.preprocessing import process_input_data, prepare_lstm_sequence, window_end_positions, fleet_feature_windows
+from src.utils.diagnosis import generate_report, generate_report_batch, classify_severity, screened_report
+from src.monitoring.drift import DriftProfile
+from src.models.prefilter import Prefilter
+from src.trend import trend_from_series
+from src.cache import WindowCache, window_keys
+from src.utils.logger import get_logger, stage
+
+logger = get_logger("inference")
+
+def artifact_version(path):
+    """Versi artefak: sha256 singkat + waktu modifikasi file."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    modified = datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+    return {"path": path, "sha256": digest.hexdigest()[:12], "modified": modified}
+
+class ModelBundle:
+    """
+    Satu set artefak (model, scaler, threshold) dari satu versi. Tidak diubah setelah dibuat,
+    sehingga request yang sedang berjalan tetap konsisten walau detector sudah berganti versi.
+    """
+
+    def __init__(self, backend_name, version=None, variant=MODEL_VARIANT):
+        # joblib di-import saat load (bukan saat import api.main, lihat benchmarks/bench_startup.py)
+        import joblib
+
+        start = time.perf_counter()
+        self.version, self.paths = resolve_artifacts(version)
+
+        self.config = joblib.load(self.paths["config"])
+        self.thresh_critical = self.config.get('threshold_critical', 0.33)
+        self.thresh_warning = self.config.get('threshold_warning', 0.23)
+        self.scaler = joblib.load(self.paths["scaler"])
+        # Varian presisi (float16/int8) memakai threshold yang sama dengan model float32 versi ini
+        self.variant = variant
+        self.backend = load_backend(backend_name, self.paths, variant)
 
-from tensorflow.keras.models import load_model
-from src.utils.config import MODEL_PATH, SCALER_PATH, CONFIG_PATH, FEATURE_COLS, TIME_STEPS
-from src.data.preprocessing import process_input_data, prepare_lstm_sequence
-from src.utils.diagnosis import generate_report
+        # Profil referensi drift hanya ada untuk versi hasil training baru (bukan layout legacy)
+        reference_path = self.paths.get("drift_reference")
+        self.drift_reference = DriftProfile.load(reference_path) if reference_path and os.path.exists(reference_path) else None
+        # Prefilter hasil kalibrasi training (versi lama tidak punya; semua window lewat LSTM)
+        prefilter_path = self.paths.get("prefilter")
+        self.prefilter = Prefilter.load(prefilter_path) if prefilter_path and os.path.exists(prefilter_path) else None
+
+        # Warm-up: forward pass pertama (tracing graph) tidak dibebankan ke request pertama
+        for n in (1, 2):
+            self.backend.predict(np.zeros((n, TIME_STEPS, len(FEATURE_COLS)), dtype=np.float32))
+
+        self.artifact_versions = {
+            "model": artifact_version(self.backend.artifact_path),
+            "scaler": artifact_version(self.paths["scaler"]),
+            "config": artifact_version(self.paths["config"])
+        }
+        self.load_seconds = time.perf_counter() - start
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
 
 class AnomalyDetector:
-    def __init__(self):
-        self.model = None
-        self.scaler = None
-        self.config = {}
-        self.load_artifacts()
+    """
+    Model dimuat secara lazy: saat pertama dipakai (ensure_loaded) atau lebih awal
+    lewat start_background_load() ketika API startup. Versi baru (pointer CURRENT)
+    dimuat di samping versi lama lalu ditukar secara atomik oleh reload_if_changed().
+    """
+
+    def __init__(self, backend=INFERENCE_BACKEND, variant=MODEL_VARIANT):
+        self.backend_name = backend
+        self.variant = variant
+        self.bundle = None
+
+        self.state = "not_loaded"
+        self.load_error = None
+        self.reload_error = None
+        self.swap_count = 0
+        self._load_lock = threading.Lock()
+        self._watcher = None
+        # Rekonstruksi window yang pernah di-scoring (upload ulang / prefix yang tumbuh dari dashboard)
+        self.cache = WindowCache()
+        self.prefilter_enabled = PREFILTER_ENABLED
+        self.screen_counts = {"windows": 0, "screened": 0}
+        self._screen_lock = threading.Lock()
+
+    @property
+    def is_ready(self):
+        return self.bundle is not None
+
+    # Akses langsung ke artefak versi aktif
+    @property
+    def scaler(self):
+        return self.acquire().scaler
+
+    @property
+    def backend(self):
+        return self.acquire().backend
+
+    @property
+    def config(self):
+        return self.bundle.config if self.bundle else {}
+
+    @property
+    def thresh_critical(self):
+        return self.bundle.thresh_critical if self.bundle else 0.33
+
+    @property
+    def thresh_warning(self):
+        return self.bundle.thresh_warning if self.bundle else 0.23
+
+    @property
+    def artifact_versions(self):
+        return self.bundle.artifact_versions if self.bundle else {}
+
+    def load_config(self):
+        """Config versi aktif tanpa memuat model (dipakai /health sebelum model siap)."""
+        if self.bundle:
+            return self.bundle.config
+        import joblib
+
+        _, paths = resolve_artifacts()
+        return joblib.load(paths["config"])
 
     def load_artifacts(self):
-        print("Loading artifacts...")
-        try:
-            self.config = joblib.load(CONFIG_PATH)
-            self.thresh_critical = self.config.get('threshold_critical', 0.33)
-            self.thresh_warning = self.config.get('threshold_warning', 0.23)
-            
-            self.scaler = joblib.load(SCALER_PATH)
-            
+        with self._load_lock:
+            if self.is_ready:
+                return
+            logger.info("Loading artifacts...")
+            self.state = "loading"
+            try:
+                self.bundle = ModelBundle(self.backend_name, variant=self.variant)
+                self.load_error = None
+                self.state = "ready"
+                logger.info("System Loaded Successfully!", extra={"fields": {
+                    "version": self.bundle.version, "backend": self.backend_name, "variant": self.variant,
+                    "load_seconds": round(self.bundle.load_seconds, 3)
+                }})
+            except Exception as e:
+                self.state = "failed"
+                self.load_error = str(e)
+                logger.exception(f"Error loading artifacts: {e}")
+                raise e
+
+    def reload_if_changed(self):
+        """Muat versi baru jika pointer CURRENT berubah, lalu tukar bundle. Versi lama tetap melayani selama loading."""
+        if not self.is_ready:
+            return False
+        version = current_version() or "legacy"
+        if version == self.bundle.version:
+            return False
+
+        with self._load_lock:
+            if version == self.bundle.version:
+                return False
             try:
-                self.model = load_model(MODEL_PATH, custom_objects={'mae': tf.keras.losses.MeanAbsoluteError})
-            except:
-                self.model = load_model(MODEL_PATH, compile=False)
-                
-            print("System Loaded Successfully!")
-        except Exception as e:
-            print(f"Error loading artifacts: {e}")
-            raise e
+                new_bundle = ModelBundle(self.backend_name, version, self.variant)
+            except Exception as e:
+                self.reload_error = f"{version}: {e}"
+                logger.error(f"Gagal memuat versi {version}, tetap memakai {self.bundle.version}: {e}")
+                return False
+
+            old_version = self.bundle.version
+            self.bundle = new_bundle
+            self.swap_count += 1
+            self.cache.clear()
+            self.reload_error = None
+            logger.info(f"Model di-swap: {old_version} -> {new_bundle.version}", extra={"fields": {
+                "load_seconds": round(new_bundle.load_seconds, 3)
+            }})
+            return True
+
+    def start_background_load(self):
+        """Muat artefak di thread terpisah agar startup API tidak terblokir."""
+        def load():
+            try:
+                self.load_artifacts()
+            except Exception:
+                pass  # Sudah dicatat di state/load_error dan dilaporkan lewat /health
+        thread = threading.Thread(target=load, name="detector-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def start_watcher(self, poll_seconds=ARTIFACT_POLL_SECONDS):
+        """Thread yang memantau pointer CURRENT dan melakukan hot-swap."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        def watch():
+            while True:
+                time.sleep(poll_seconds)
+                try:
+                    self.reload_if_changed()
+                except Exception as e:
+                    self.reload_error = str(e)
+
+        self._watcher = threading.Thread(target=watch, name="artifact-watcher", daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def ensure_loaded(self):
+        if not self.is_ready:
+            self.load_artifacts()
+
+    def acquire(self):
+        """Bundle aktif saat ini. Simpan dan teruskan ke method lain agar satu request memakai satu versi."""
+        self.ensure_loaded()
+        return self.bundle
+
+    def status(self):
+        bundle = self.bundle
+        return {
+            "state": self.state,
+            "backend": self.backend_name,
+            "variant": self.variant,
+            "version": bundle.version if bundle else None,
+            "load_seconds": round(bundle.load_seconds, 3) if bundle else None,
+            "loaded_at": bundle.loaded_at if bundle else None,
+            "swap_count": self.swap_count,
+            "error": self.load_error,
+            "reload_error": self.reload_error,
+            "cache": self.cache.stats(),
+            "prefilter": {
+                "enabled": self.prefilter_enabled,
+                "available": bool(bundle and bundle.prefilter is not None),
+                **self.screen_counts
+            }
+        }
 
     def predict(self, df_input):
+        bundle = self.acquire()
+        X_seq, error = self.prepare_window(df_input, bundle)
+        if error:
+            return {"error": error}
+
+        reports, _ = self.score_batch(X_seq, bundle=bundle)
+        return reports[0]
+
+    def prepare_window(self, df_input, bundle=None):
+        """Preprocessing + scaling window terakhir. Mengembalikan (X_seq, None) atau (None, pesan_error)."""
+        with stage("process_input_data"):
+            df_clean = process_input_data(df_input)
+
+        if len(df_clean) < TIME_STEPS:
+            return None, f"Data kurang. Butuh {TIME_STEPS} baris data bersih, punya {len(df_clean)}."
+
+        return self.scale_window(df_clean.iloc[-TIME_STEPS:], bundle), None
+
+    def scale_window(self, window, bundle=None):
+        """Window fitur (TIME_STEPS, FEATURE_COLS) yang belum di-scale -> X_seq (1, TIME_STEPS, F)."""
+        bundle = bundle or self.acquire()
+        if not isinstance(window, pd.DataFrame):
+            window = pd.DataFrame(window, columns=FEATURE_COLS)
+
+        with stage("scaler_transform"):
+            X_scaled = bundle.scaler.transform(window)
+        return np.array([X_scaled[-TIME_STEPS:]])
+
+    def reconstruct(self, X_batch, batch_size=TIMELINE_BATCH_SIZE, bundle=None, use_cache=True):
+        """
+        Rekonstruksi batch window (N, TIME_STEPS, F). Window yang sudah ada di cache tidak masuk model;
+        sisanya di-forward per batch_size lalu disimpan ke cache.
+        """
+        bundle = bundle or self.acquire()
+        X_batch = np.asarray(X_batch, dtype=np.float32)
+        if not (use_cache and self.cache.enabled):
+            return self.forward(X_batch, batch_size, bundle)
+
+        keys, cached = self.cached_reconstruction(X_batch, bundle)
+        missing = [i for i, value in enumerate(cached) if value is None]
+        if not missing:
+            return np.stack(cached)
+
+        computed = self.forward(X_batch[missing], batch_size, bundle)
+        self.cache.store([keys[i] for i in missing], computed)
+        if len(missing) == len(X_batch):
+            return computed
+
+        reconstruction = np.empty((len(X_batch),) + computed.shape[1:], dtype=computed.dtype)
+        reconstruction[missing] = computed
+        for i, value in enumerate(cached):
+            if value is not None:
+                reconstruction[i] = value
+        return reconstruction
+
+    def cached_reconstruction(self, X_batch, bundle):
+        """(kunci per window, rekonstruksi dari cache atau None per window)."""
+        if not self.cache.enabled:
+            return None, [None] * len(X_batch)
+        with stage("cache_lookup"):
+            keys = window_keys(X_batch, bundle.version)
+            return keys, self.cache.lookup(keys)
+
+    def forward(self, X_batch, batch_size=TIMELINE_BATCH_SIZE, bundle=None):
+        """Forward pass model tanpa cache, dipecah per batch_size."""
+        backend = (bundle or self.acquire()).backend
+        X_batch = np.asarray(X_batch, dtype=np.float32)
+        with stage("model_predict"):
+            if len(X_batch) <= batch_size:
+                return backend.predict(X_batch)
+            return np.concatenate([
+                backend.predict(X_batch[i : i + batch_size]) for i in range(0, len(X_batch), batch_size)
+            ])
+
+    def screen(self, X_batch, bundle):
+        """Prefilter versi bundle: (lolos, estimasi risk, MAE per fitur), atau None jika nonaktif / tidak tersedia."""
+        if not self.prefilter_enabled or bundle.prefilter is None:
+            return None
+        with stage("prefilter"):
+            passed, risk, mae = bundle.prefilter.screen(X_batch, bundle.thresh_warning)
+        with self._screen_lock:
+            self.screen_counts["windows"] += len(passed)
+            self.screen_counts["screened"] += int(passed.sum())
+        return passed, risk, mae
+
+    def score_batch(self, X_batch, batch_size=TIMELINE_BATCH_SIZE, bundle=None):
+        """
+        (laporan, MAE per fitur) untuk batch window ter-scale (N, TIME_STEPS, F). Window yang lolos
+        prefilter langsung mendapat laporan AMAN; sisanya lewat reconstruct (cache + LSTM).
+        """
+        bundle = bundle or self.acquire()
+        X_batch = np.asarray(X_batch)
+        reports = [None] * len(X_batch)
+        mae = np.empty((len(X_batch), X_batch.shape[2]))
+        todo = np.arange(len(X_batch))
+
+        screened = self.screen(X_batch, bundle)
+        if screened is not None:
+            passed, risk, screen_mae = screened
+            for i in np.flatnonzero(passed):
+                reports[i] = screened_report(risk[i])
+            mae[passed] = screen_mae[passed]
+            todo = np.flatnonzero(~passed)
+
+        if len(todo):
+            X_todo = X_batch[todo]
+            reconstruction = self.reconstruct(X_todo, batch_size, bundle)
+            for i, report in zip(todo, self.build_reports(X_todo, reconstruction, bundle)):
+                reports[i] = report
+            mae[todo] = np.mean(np.abs(reconstruction - X_todo), axis=1)
+        return reports, mae
+
+    def build_report(self, X_seq, reconstruction, bundle=None):
+        bundle = bundle or self.acquire()
+        with stage("generate_report"):
+            return generate_report(
+                X_seq, reconstruction, FEATURE_COLS,
+                bundle.thresh_critical, bundle.thresh_warning
+            )
+
+    def prepare_fleet(self, frames, bundle=None):
+        """
+        Window ter-scale untuk banyak unit sekaligus (satu lintasan preprocessing, satu scaler.transform).
+        Mengembalikan (X (K, TIME_STEPS, F), indeks unit yang cukup data, menit akhir window, {indeks: pesan_error}).
+        """
+        bundle = bundle or self.acquire()
+        with stage("process_input_data"):
+            windows, ok_units, n_clean, window_end = fleet_feature_windows(frames, TIME_STEPS)
+
+        errors = {
+            int(i): f"Data kurang. Butuh {TIME_STEPS} baris data bersih, punya {n_clean[i]}."
+            for i in np.flatnonzero(n_clean < TIME_STEPS)
+        }
+        n_features = len(FEATURE_COLS)
+        X = np.empty((0, TIME_STEPS, n_features))
+        if len(ok_units):
+            with stage("scaler_transform"):
+                flat = pd.DataFrame(windows.reshape(-1, n_features), columns=FEATURE_COLS, copy=False)
+                X = bundle.scaler.transform(flat).reshape(len(ok_units), TIME_STEPS, n_features)
+        return X, ok_units, window_end, errors
+
+    def build_reports(self, X_batch, reconstruction, bundle=None):
+        """Laporan untuk banyak window sekaligus (generate_report_batch)."""
+        bundle = bundle or self.acquire()
+        with stage("generate_report"):
+            return generate_report_batch(
+                X_batch, reconstruction, FEATURE_COLS,
+                bundle.thresh_critical, bundle.thresh_warning
+            )
+
+    def predict_window(self, window):
+        """Scoring satu window fitur (TIME_STEPS, FEATURE_COLS) yang belum di-scale."""
+        return self.score_window(window)[0]
+
+    def score_window(self, window):
+        """Seperti predict_window, ditambah MAE per fitur dan bundle yang men-scoring (versi + threshold, untuk riwayat & alert)."""
+        bundle = self.acquire()
+        X_seq = self.scale_window(window, bundle)
+        reports, mae = self.score_batch(X_seq, bundle=bundle)
+        return reports[0], mae[0], bundle
+
+    def predict_timeline(self, df_input, stride=1, batch_size=TIMELINE_BATCH_SIZE):
+        """Scoring semua window dari satu upload sekaligus (preprocessing sekali, predict batch)."""
+        bundle = self.acquire()
         df_clean = process_input_data(df_input)
-        
+
         if len(df_clean) < TIME_STEPS:
             return {"error": f"Data kurang. Butuh {TIME_STEPS} baris data bersih, punya {len(df_clean)}."}
 
-        X_scaled = self.scaler.transform(df_clean)
-        X_seq = np.array([X_scaled[-TIME_STEPS:]]) 
-        
-        reconstruction = self.model.predict(X_seq, verbose=0)
-        
-        result = generate_report(
-            X_seq, reconstruction, FEATURE_COLS, 
-            self.thresh_critical, self.thresh_warning
+        X_scaled = bundle.scaler.transform(df_clean)
+        X_seq = prepare_lstm_sequence(X_scaled, TIME_STEPS, stride=stride)
+        window_ends = df_clean.index[window_end_positions(len(df_clean), TIME_STEPS, stride)]
+
+        # Window yang lolos prefilter memakai estimasi risk, hanya sisanya yang di-forward
+        risk_scores = np.empty(len(X_seq))
+        todo, passed = slice(None), None
+        screened = self.screen(X_seq, bundle)
+        if screened is not None:
+            passed, risk, _ = screened
+            risk_scores[passed] = risk[passed]
+            todo = np.flatnonzero(~passed)
+
+        X_todo = X_seq[todo]
+        reconstruction = self.reconstruct(X_todo, batch_size=batch_size, bundle=bundle) if len(X_todo) else None
+        if reconstruction is not None:
+            risk_scores[todo] = np.mean(np.abs(reconstruction - X_todo), axis=(1, 2))
+        severity = classify_severity(risk_scores, bundle.thresh_critical, bundle.thresh_warning)
+
+        # Laporan lengkap hanya untuk window terakhir (kondisi saat ini)
+        if passed is not None and passed[-1]:
+            latest = screened_report(risk_scores[-1])
+        else:
+            latest = generate_report(
+                X_seq[-1:], reconstruction[-1:], FEATURE_COLS,
+                bundle.thresh_critical, bundle.thresh_warning
+            )
+        # Tren degradasi atas seluruh kurva (waktu nyata antar window, bukan asumsi jarak tetap)
+        rul = trend_from_series(window_ends, risk_scores, version=bundle.version).assess(
+            bundle.thresh_critical, bundle.thresh_warning
         )
-        return result
+        return {
+            "timestamps": list(window_ends),
+            "risk_scores": risk_scores.astype(float).tolist(),
+            "severity_levels": severity.astype(int).tolist(),
+            "stride": stride,
+            "latest": latest,
+            "screened_windows": int(passed.sum()) if passed is not None else 0,
+            "rul": rul
+        }
 
 # Inisialisasi Singleton
-detector = AnomalyDetector()
\ No newline at end of file
+detector = AnomalyDetector()
@@ -0,0 +1,259 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from src.utils.config import (
+    MODEL_PATH, TFLITE_MODEL_PATH, ONNX_MODEL_PATH, NUMPY_WEIGHTS_PATH, INFERENCE_BACKEND, NUMPY_WEIGHTS_MMAP,
+    MODEL_VARIANTS, MODEL_VARIANT
+)
+
+# Backend inference untuk LSTM autoencoder. Semua backend punya predict(X) -> rekonstruksi (N, T, F).
+# variants: varian presisi yang bisa dilayani (artefak "<artifact>_<varian>", float32 = artefak utama).
+
+class KerasBackend:
+    name = "keras"
+    artifact = "model"
+    variants = ("float32",)
+
+    def __init__(self, model_path=MODEL_PATH):
+        from tensorflow.keras.models import load_model
+
+        # Inference tidak butuh loss/optimizer, jadi model dimuat tanpa compile
+        self.model = load_model(model_path, compile=False)
+        self.artifact_path = model_path
+
+    def predict(self, X):
+        # predict_on_batch melewati overhead data adapter model.predict (~100ms per panggilan)
+        return np.asarray(self.model.predict_on_batch(X))
+
+class TFLiteBackend:
+    """
+    Interpreter TFLite (ai_edge_litert / tflite_runtime / tf.lite). Model diekspor dengan batch tetap.
+    Interpreter memetakan file .tflite dengan mmap, jadi worker serving berbagi satu salinan bobot.
+    """
+    name = "tflite"
+    artifact = "tflite"
+    variants = MODEL_VARIANTS
+
+    def __init__(self, model_path=TFLITE_MODEL_PATH):
+        interpreter_cls = self._interpreter_class()
+        self.interpreter = interpreter_cls(model_path=model_path)
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]['index']
+        self.output_index = self.interpreter.get_output_details()[0]['index']
+        self.batch_size = int(self.interpreter.get_input_details()[0]['shape'][0])
+        self.artifact_path = model_path
+
+    @staticmethod
+    def _interpreter_class():
+        try:
+            from ai_edge_litert.interpreter import Interpreter
+        except ImportError:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                from tensorflow.lite import Interpreter
+        return Interpreter
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(X), self.batch_size):
+            chunk = X[start : start + self.batch_size]
+            n = len(chunk)
+            if n < self.batch_size:
+                # Batch terakhir dipadding sampai ukuran batch model
+                chunk = np.concatenate([chunk, np.zeros((self.batch_size - n,) + chunk.shape[1:], dtype=np.float32)])
+            self.interpreter.set_tensor(self.input_index, chunk)
+            self.interpreter.invoke()
+            outputs.append(self.interpreter.get_tensor(self.output_index)[:n])
+        return np.concatenate(outputs)
+
+class OnnxBackend:
+    name = "onnx"
+    artifact = "onnx"
+    variants = ("float32",)
+
+    def __init__(self, model_path=ONNX_MODEL_PATH):
+        import onnxruntime as ort
+
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.artifact_path = model_path
+
+    def predict(self, X):
+        return self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})[0]
+
+ACTIVATIONS = {
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "hard_sigmoid": lambda x: np.clip(0.2 * x + 0.5, 0, 1),
+    "linear": lambda x: x,
+}
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def _is_extracted(mmap_dir, signature):
+    try:
+        with open(mmap_dir / "source.json") as f:
+            return json.load(f) == signature
+    except (OSError, ValueError):
+        return False
+
+def load_shared_weights(npz_path):
+    """
+    (spec, bobot) dari .npz, dengan bobot sebagai memmap read-only. Isi .npz diekstrak sekali ke
+    <nama>.mmap/<array>.npy (member zip tidak ter-align, file .npy ter-align), sehingga semua worker
+    memetakan file yang sama dan berbagi satu salinan bobot di page cache.
+    Jika direktori tidak bisa ditulis (mis. volume read-only), bobot dimuat biasa per proses.
+    """
+    npz_path = Path(npz_path)
+    mmap_dir = npz_path.with_suffix(".mmap")
+    with np.load(npz_path) as archive:
+        spec = str(archive["spec"])
+        names = [key for key in archive.files if key != "spec"]
+        files = {name: name.replace("/", "__") + ".npy" for name in names}
+        signature = {"source": _file_signature(npz_path), "arrays": files}
+
+        if not _is_extracted(mmap_dir, signature):
+            # Ditulis ke direktori sementara lalu di-rename: worker lain tidak pernah melihat ekstraksi setengah jadi
+            tmp_dir = npz_path.with_name(f"{mmap_dir.name}.tmp-{os.getpid()}")
+            try:
+                tmp_dir.mkdir(exist_ok=True)
+                for name, file_name in files.items():
+                    np.save(tmp_dir / file_name, np.ascontiguousarray(archive[name]))
+                with open(tmp_dir / "source.json", "w") as f:
+                    json.dump(signature, f)
+                # Sisa ekstraksi dari isi .npz lama (layout legacy yang ditimpa di tempat)
+                if mmap_dir.exists() and not _is_extracted(mmap_dir, signature):
+                    shutil.rmtree(mmap_dir, ignore_errors=True)
+                try:
+                    os.rename(tmp_dir, mmap_dir)
+                except OSError:
+                    pass  # Worker lain sudah lebih dulu mengekstrak versi yang sama
+            except OSError:
+                return spec, {name: archive[name] for name in names}
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return spec, {name: np.load(mmap_dir / file_name, mmap_mode="r") for name, file_name in files.items()}
+
+class NumpyBackend:
+    """Forward pass LSTM autoencoder murni NumPy dari bobot hasil export_numpy_weights."""
+    name = "numpy"
+    artifact = "numpy"
+    variants = ("float32",)
+
+    def __init__(self, model_path=NUMPY_WEIGHTS_PATH, mmap=NUMPY_WEIGHTS_MMAP):
+        if mmap:
+            spec, self.weights = load_shared_weights(model_path)
+        else:
+            with np.load(model_path) as weights:
+                spec = str(weights["spec"])
+                self.weights = {key: weights[key] for key in weights.files if key != "spec"}
+        self.layers = json.loads(spec)
+        self.artifact_path = model_path
+
+    def _lstm(self, x, layer):
+        kernel = self.weights[f"{layer['name']}/kernel"]
+        recurrent_kernel = self.weights[f"{layer['name']}/recurrent_kernel"]
+        bias = self.weights[f"{layer['name']}/bias"]
+        activation = ACTIVATIONS[layer["activation"]]
+        recurrent_activation = ACTIVATIONS[layer["recurrent_activation"]]
+        units = recurrent_kernel.shape[0]
+
+        # Proyeksi input untuk semua timestep sekaligus, lalu loop rekuren per timestep
+        x_proj = x @ kernel + bias
+        h = np.zeros((x.shape[0], units), dtype=x.dtype)
+        c = np.zeros_like(h)
+        outputs = []
+        for t in range(x.shape[1]):
+            z = x_proj[:, t] + h @ recurrent_kernel
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units : 2 * units])
+            c = f * c + i * activation(z[:, 2 * units : 3 * units])
+            o = recurrent_activation(z[:, 3 * units :])
+            h = o * activation(c)
+            if layer["return_sequences"]:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if layer["return_sequences"] else h
+
+    def predict(self, X):
+        x = np.asarray(X, dtype=np.float32)
+        for layer in self.layers:
+            if layer["type"] == "LSTM":
+                x = self._lstm(x, layer)
+            elif layer["type"] == "RepeatVector":
+                x = np.repeat(x[:, np.newaxis, :], layer["n"], axis=1)
+            elif layer["type"] == "Dense":
+                x = ACTIVATIONS[layer["activation"]](
+                    x @ self.weights[f"{layer['name']}/kernel"] + self.weights[f"{layer['name']}/bias"]
+                )
+        return x
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+    OnnxBackend.name: OnnxBackend,
+    NumpyBackend.name: NumpyBackend,
+}
+
+def variant_artifact(backend_cls, variant):
+    return backend_cls.artifact if variant == "float32" else f"{backend_cls.artifact}_{variant}"
+
+def load_backend(name=INFERENCE_BACKEND, paths=None, variant=MODEL_VARIANT):
+    """
+    paths: dict artefak dari registry.resolve_artifacts; default path lama di models_store.
+    variant: varian presisi (float16/int8 hanya tflite, diekspor saat training dengan EXPORT_VARIANTS).
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Backend '{name}' tidak dikenal. Pilihan: {', '.join(BACKENDS)}")
+    backend_cls = BACKENDS[name]
+    if variant not in backend_cls.variants:
+        raise ValueError(f"Varian '{variant}' tidak tersedia untuk backend {name}. Pilihan: {', '.join(backend_cls.variants)}")
+    if variant == "float32":
+        return backend_cls() if paths is None else backend_cls(model_path=paths[backend_cls.artifact])
+
+    path = (paths or {}).get(variant_artifact(backend_cls, variant))
+    if path is None or not os.path.exists(path):
+        raise FileNotFoundError(
+            f"Artefak varian {variant} ({name}) tidak ada di versi ini. Training dengan EXPORT_VARIANTS={variant}."
+        )
+    return backend_cls(model_path=path)
+
+def export_numpy_weights(model, path=NUMPY_WEIGHTS_PATH):
+    """Simpan bobot + spesifikasi layer model Keras untuk NumpyBackend (Dropout dilewati saat inference)."""
+    spec, arrays = [], {}
+    for i, layer in enumerate(model.layers):
+        layer_type = type(layer).__name__
+        name = f"layer_{i}"
+
+        if layer_type == "TimeDistributed":
+            layer, layer_type = layer.layer, type(layer.layer).__name__
+
+        config = layer.get_config()
+        if layer_type == "LSTM":
+            kernel, recurrent_kernel, bias = layer.get_weights()
+            arrays.update({f"{name}/kernel": kernel, f"{name}/recurrent_kernel": recurrent_kernel, f"{name}/bias": bias})
+            spec.append({
+                "type": "LSTM", "name": name, "activation": config["activation"],
+                "recurrent_activation": config["recurrent_activation"],
+                "return_sequences": config["return_sequences"]
+            })
+        elif layer_type == "Dense":
+            kernel, bias = layer.get_weights()
+            arrays.update({f"{name}/kernel": kernel, f"{name}/bias": bias})
+            spec.append({"type": "Dense", "name": name, "activation": config["activation"]})
+        elif layer_type == "RepeatVector":
+            spec.append({"type": "RepeatVector", "name": name, "n": config["n"]})
+        elif layer_type not in ("Dropout", "InputLayer"):
+            raise ValueError(f"Layer {layer_type} belum didukung NumpyBackend.")
+
+    np.savez(path, spec=json.dumps(spec), **{key: value.astype(np.float32) for key, value in arrays.items()})
+    return path
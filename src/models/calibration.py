@@ -0,0 +1,208 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import CALIBRATION_HIST_BINS, CALIBRATION_CHUNK_SIZE
+from src.models.registry import (
+    ARTIFACT_FILES, artifact_paths, create_version_dir, publish_version, resolve_artifacts
+)
+
+# Sesuaikan jadwal berdasarkan pdf
+FAILURE_PERIODS = [
+    ('2020-04-18 00:00:00', '2020-04-18 23:59:00', 'Air Leak (High Stress)'),
+    ('2020-05-29 23:30:00', '2020-05-30 06:00:00', 'Air Leak (High Stress)'),
+    ('2020-06-05 10:00:00', '2020-06-07 14:30:00', 'Air Leak (High Stress)'),
+    ('2020-07-15 14:30:00', '2020-07-15 19:00:00', 'Air Leak (High Stress)')
+]
+
+# Warning diset di 70% dari Critical
+WARNING_RATIO = 0.7
+
+def period_bounds(periods=FAILURE_PERIODS):
+    """Batas periode (ns, inklusif) yang sudah diurutkan dan digabung jika tumpang tindih."""
+    bounds = sorted((pd.Timestamp(start).value, pd.Timestamp(end).value) for start, end, _ in periods)
+    merged = []
+    for start, end in bounds:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    merged = np.array(merged, dtype=np.int64).reshape(-1, 2)
+    return merged[:, 0], merged[:, 1]
+
+def failure_labels(timestamps, periods=FAILURE_PERIODS):
+    """Label 1 untuk timestamp di dalam jadwal rusak, 0 untuk aman (searchsorted, satu lintasan)."""
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == "M":
+        timestamps = timestamps.astype("datetime64[ns]").view(np.int64)
+
+    starts, ends = period_bounds(periods)
+    idx = np.searchsorted(starts, timestamps, side="right") - 1
+    inside = idx >= 0
+    inside[inside] = timestamps[inside] <= ends[idx[inside]]
+    return inside.astype(np.int8)
+
+def _metrics_at(tp, fp, positives, total):
+    """Metrik klasifikasi dari jumlah TP/FP untuk satu threshold."""
+    fn = positives - tp
+    tn = total - positives - fp
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / positives if positives else 0.0
+    return {
+        "accuracy": float((tp + tn) / total) if total else 0.0,
+        "precision": float(precision),
+        "recall": float(recall),
+        # Cegah pembagian dengan nol
+        "f1_score": float(2 * precision * recall / (precision + recall + 1e-6))
+    }
+
+def _result(threshold, tp, fp, positives, total, mode):
+    return {
+        "threshold_critical": float(threshold),
+        "threshold_warning": float(threshold) * WARNING_RATIO,
+        **_metrics_at(int(tp), int(fp), int(positives), int(total)),
+        "n_scores": int(total),
+        "n_positive": int(positives),
+        "mode": mode
+    }
+
+def calibrate_exact(scores, labels):
+    """
+    Threshold critical dengan F1 tertinggi (prediksi rusak = score >= threshold).
+    Satu sort + cumsum; kandidat threshold = setiap nilai score unik.
+    """
+    scores = np.asarray(scores)
+    labels = np.asarray(labels, dtype=bool)
+    order = np.argsort(scores, kind="stable")[::-1]
+    sorted_scores = scores[order]
+
+    tp = np.cumsum(labels[order], dtype=np.int64)
+    # Hanya posisi terakhir dari tiap nilai yang sama (semua score >= nilai itu ikut terprediksi)
+    last = np.flatnonzero(np.append(sorted_scores[1:] != sorted_scores[:-1], True))
+    tp = tp[last]
+    predicted = last + 1
+    positives = int(labels.sum())
+
+    precision = tp / predicted
+    recall = tp / positives if positives else np.zeros_like(precision)
+    f1 = 2 * precision * recall / (precision + recall + 1e-6)
+
+    best = int(np.argmax(f1))
+    return _result(sorted_scores[last[best]], tp[best], predicted[best] - tp[best], positives, len(scores), "exact")
+
+def iter_chunks(array, chunk_size=CALIBRATION_CHUNK_SIZE):
+    for i in range(0, len(array), chunk_size):
+        yield np.asarray(array[i : i + chunk_size])
+
+def metrics_at_threshold(scores, labels, threshold, chunk_size=CALIBRATION_CHUNK_SIZE):
+    """Akurasi/precision/recall/F1 pada threshold tetap (prediksi rusak = score >= threshold), per chunk."""
+    tp = fp = positives = 0
+    for score_chunk, label_chunk in zip(iter_chunks(scores, chunk_size), iter_chunks(labels, chunk_size)):
+        predicted, label_chunk = score_chunk >= threshold, label_chunk.astype(bool)
+        tp += int((predicted & label_chunk).sum())
+        fp += int((predicted & ~label_chunk).sum())
+        positives += int(label_chunk.sum())
+    return _metrics_at(tp, fp, positives, len(scores))
+
+def calibrate_histogram(scores, labels, bins=CALIBRATION_HIST_BINS, chunk_size=CALIBRATION_CHUNK_SIZE):
+    """
+    Versi memori terbatas: histogram score per label (dibaca per chunk, cocok untuk memmap).
+    Threshold dibulatkan ke tepi bin; selisih dari mode exact maksimal satu lebar bin.
+    """
+    lo = min(float(chunk.min()) for chunk in iter_chunks(scores, chunk_size))
+    hi = max(float(chunk.max()) for chunk in iter_chunks(scores, chunk_size))
+    width = (hi - lo) / bins or 1.0
+
+    pos_counts = np.zeros(bins, dtype=np.int64)
+    neg_counts = np.zeros(bins, dtype=np.int64)
+    for score_chunk, label_chunk in zip(iter_chunks(scores, chunk_size), iter_chunks(labels, chunk_size)):
+        bin_idx = np.minimum(((score_chunk - lo) / width).astype(np.int64), bins - 1)
+        label_chunk = label_chunk.astype(bool)
+        pos_counts += np.bincount(bin_idx[label_chunk], minlength=bins)
+        neg_counts += np.bincount(bin_idx[~label_chunk], minlength=bins)
+
+    # Threshold = tepi bawah bin b: semua bin >= b terprediksi rusak
+    tp = np.cumsum(pos_counts[::-1])[::-1]
+    fp = np.cumsum(neg_counts[::-1])[::-1]
+    positives, total = int(pos_counts.sum()), int(pos_counts.sum() + neg_counts.sum())
+
+    predicted = np.maximum(tp + fp, 1)
+    precision = tp / predicted
+    recall = tp / positives if positives else np.zeros(bins)
+    f1 = 2 * precision * recall / (precision + recall + 1e-6)
+
+    best = int(np.argmax(f1))
+    return _result(lo + best * width, tp[best], fp[best], positives, total, "histogram")
+
+def calibrate(scores, labels, mode="exact", bins=CALIBRATION_HIST_BINS):
+    if len(scores) == 0:
+        raise ValueError("Tidak ada risk score untuk dikalibrasi.")
+    if mode == "exact":
+        return calibrate_exact(scores, labels)
+    if mode == "histogram":
+        return calibrate_histogram(scores, labels, bins)
+    raise ValueError(f"Mode kalibrasi '{mode}' tidak dikenal. Pilihan: exact, histogram")
+
+def load_eval_scores(version=None):
+    """Risk score + timestamp data uji yang disimpan training di direktori versi."""
+    version, paths = resolve_artifacts(version)
+    if "eval_scores" not in paths or not os.path.exists(paths["eval_scores"]):
+        raise FileNotFoundError(f"Versi {version} tidak punya risk score evaluasi tersimpan. Jalankan training ulang.")
+    scores = np.load(paths["eval_scores"], mmap_mode="r")
+    timestamps = np.load(paths["eval_timestamps"], mmap_mode="r")
+    return version, paths, scores, timestamps
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+# Artefak yang dihitung terhadap threshold versi sumber: tidak ikut ke versi hasil kalibrasi ulang
+# (prefilter dikalibrasi dengan thresh_critical/thresh_warning lama; tanpa artefak ini versi baru dilayani tanpa prefilter;
+# metrik variants.json diukur pada threshold lama, hitung ulang dengan `python -m src.models.train --export-only --variants`)
+THRESHOLD_DEPENDENT_ARTIFACTS = {"config", "prefilter", "variants"}
+
+def recalibrate(version=None, mode="exact", bins=CALIBRATION_HIST_BINS, publish=True):
+    """
+    Hitung ulang threshold dari risk score tersimpan tanpa training ulang.
+    Hasilnya versi baru (artefak model di-hardlink, config ditulis ulang, prefilter dan laporan varian tidak dibawa).
+    """
+    import joblib
+
+    source_version, source_paths, scores, timestamps = load_eval_scores(version)
+    result = calibrate(scores, failure_labels(timestamps), mode, bins)
+
+    version_dir = create_version_dir()
+    paths = artifact_paths(version_dir)
+    for key in ARTIFACT_FILES:
+        if key not in THRESHOLD_DEPENDENT_ARTIFACTS and os.path.exists(source_paths[key]):
+            _link_or_copy(source_paths[key], paths[key])
+
+    config_data = dict(joblib.load(source_paths["config"]))
+    config_data.update({
+        'threshold_critical': result["threshold_critical"],
+        'threshold_warning': result["threshold_warning"],
+        'calibrated_from': source_version,
+        'calibration_mode': mode
+    })
+    joblib.dump(config_data, paths["config"])
+
+    if publish:
+        publish_version(version_dir)
+    return {**result, "source_version": source_version, "version": version_dir.name, "published": publish}
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Kalibrasi ulang threshold dari risk score evaluasi tersimpan.")
+    parser.add_argument("--version", help="Versi sumber (default: versi aktif).")
+    parser.add_argument("--mode", choices=["exact", "histogram"], default="exact")
+    parser.add_argument("--bins", type=int, default=CALIBRATION_HIST_BINS)
+    parser.add_argument("--no-publish", action="store_true", help="Buat versi baru tanpa mengaktifkannya.")
+    args = parser.parse_args()
+
+    print(json.dumps(recalibrate(args.version, args.mode, args.bins, publish=not args.no_publish), indent=2))
@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: tanpa lock antar proses
+    fcntl = None
+
+from src.utils.config import TRAINING_NICE, TRAINING_LOCK_PATH
+
+# Exit code proses training yang batal karena training lain (dari worker serving lain) sedang berjalan
+EXIT_LOCKED = 75
+
+def acquire_training_lock(path=TRAINING_LOCK_PATH, attempts=1):
+    """
+    File lock non-blocking, dipegang proses training sampai selesai (lepas otomatis walau crash).
+    Mengembalikan handle file, atau None jika dipegang proses lain.
+    """
+    if fcntl is None:
+        return True
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a")
+    for attempt in range(attempts):
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            if attempt + 1 < attempts:
+                time.sleep(0.1)
+    handle.close()
+    return None
+
+def training_locked(path=TRAINING_LOCK_PATH):
+    """True jika ada proses training (dari worker mana pun) yang sedang memegang lock."""
+    handle = acquire_training_lock(path)
+    if handle is None:
+        return True
+    if handle is not True:
+        handle.close()
+    return False
+
+def training_entrypoint():
+    """Dijalankan di proses terpisah (spawn): TensorFlow training tidak berbagi proses dengan API."""
+    # Beberapa percobaan: training_locked() di worker lain memegang lock sesaat saat cek status
+    lock = acquire_training_lock(attempts=20)
+    if lock is None:
+        sys.exit(EXIT_LOCKED)
+
+    try:
+        os.nice(TRAINING_NICE)
+    except (AttributeError, OSError):
+        pass
+
+    from src.models.train import run_training
+    sys.exit(0 if run_training() else 1)
+
+class TrainingJob:
+    """
+    Satu proses training dalam satu waktu, juga antar worker serving (file lock TRAINING_LOCK_PATH).
+    Hasilnya dipublikasikan lewat pointer CURRENT.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.started_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running or training_locked():
+                return False
+            context = multiprocessing.get_context("spawn")
+            self.process = context.Process(target=training_entrypoint, name="metropt-training")
+            self.process.start()
+            self.started_at = datetime.now().isoformat(timespec="seconds")
+            return True
+
+    def status(self):
+        process = self.process
+        return {
+            "running": self.running,
+            # Training yang dimulai lewat worker serving lain
+            "running_elsewhere": not self.running and training_locked(),
+            "pid": process.pid if process else None,
+            "started_at": self.started_at,
+            "exitcode": process.exitcode if process else None
+        }
+
+# Inisialisasi Singleton
+training_job = TrainingJob()
@@ -0,0 +1,163 @@
+import json
+
+import numpy as np
+
+from src.utils.config import (
+    PREFILTER_COMPONENTS, PREFILTER_BOUND_QUANTILE, PREFILTER_BOUND_MARGIN,
+    PREFILTER_MAX_RECALL_LOSS, PREFILTER_MAX_FLIP_RATE, DRIFT_CHUNK_SIZE
+)
+
+# Screening murah sebelum LSTM, dikalibrasi saat training pada data Feb-Mar yang sama.
+# Window dianggap jelas normal jika semua baris di dalam batas per fitur dan galat rekonstruksi
+# PCA (per baris, ruang ter-scale) rata-rata di bawah threshold. Window itu langsung AMAN;
+# sisanya (borderline / mencurigakan) tetap lewat LSTM.
+
+class Prefilter:
+    def __init__(self, mean, components, lower, upper, threshold=-np.inf, risk_intercept=0.0, risk_slope=0.0,
+                 stats=None):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.components = np.asarray(components, dtype=np.float32)
+        self.lower = np.asarray(lower, dtype=np.float32)
+        self.upper = np.asarray(upper, dtype=np.float32)
+        self.threshold = float(threshold)
+        # Estimasi risk score LSTM dari skor PCA (agar riwayat & tren tetap satu skala)
+        self.risk_intercept = float(risk_intercept)
+        self.risk_slope = float(risk_slope)
+        self.stats = stats or {}
+
+    @classmethod
+    def fit(cls, train_scaled, n_components=PREFILTER_COMPONENTS, quantile=PREFILTER_BOUND_QUANTILE,
+            margin=PREFILTER_BOUND_MARGIN, chunk_size=DRIFT_CHUNK_SIZE):
+        """PCA + batas kuantil per fitur dari data training ter-scale (bisa memmap, dibaca per chunk)."""
+        n_features = np.shape(train_scaled)[1]
+        total = np.zeros(n_features)
+        outer = np.zeros((n_features, n_features))
+        for i in range(0, len(train_scaled), chunk_size):
+            chunk = np.asarray(train_scaled[i : i + chunk_size], dtype=np.float64)
+            total += chunk.sum(axis=0)
+            outer += chunk.T @ chunk
+        n = len(train_scaled)
+        mean = total / n
+        covariance = outer / n - np.outer(mean, mean)
+
+        eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+        top = np.argsort(eigenvalues)[::-1][:n_components]
+        components = eigenvectors[:, top].T
+
+        lower, upper = np.quantile(np.asarray(train_scaled), [quantile, 1 - quantile], axis=0)
+        prefilter = cls(mean, components, lower - margin, upper + margin)
+        prefilter.stats["explained_variance"] = float(eigenvalues[top].sum() / max(eigenvalues.sum(), 1e-12))
+        return prefilter
+
+    def row_residuals(self, rows):
+        """|x - rekonstruksi PCA| per baris (M, F)."""
+        centered = np.asarray(rows, dtype=np.float32) - self.mean
+        return np.abs(centered - (centered @ self.components.T) @ self.components)
+
+    def out_of_bounds(self, rows):
+        rows = np.asarray(rows)
+        return ((rows < self.lower) | (rows > self.upper)).any(axis=1)
+
+    def screen(self, X_batch, thresh_warning):
+        """
+        (lolos, estimasi risk, MAE per fitur) untuk batch window ter-scale (N, T, F).
+        Window lolos hanya jika estimasi risk juga di bawah threshold WARNING versi yang melayani.
+        """
+        X_batch = np.asarray(X_batch)
+        n, steps, n_features = X_batch.shape
+        rows = X_batch.reshape(-1, n_features)
+        mae = self.row_residuals(rows).reshape(n, steps, n_features).mean(axis=1)
+        scores = mae.mean(axis=1)
+        in_bounds = ~self.out_of_bounds(rows).reshape(n, steps).any(axis=1)
+        risk = self.risk_intercept + self.risk_slope * scores
+        passed = in_bounds & (scores <= self.threshold) & (risk < thresh_warning)
+        return passed, risk, mae
+
+    def series_scores(self, scaled, time_steps, chunk_size=DRIFT_CHUNK_SIZE):
+        """
+        Skor PCA dan status di-dalam-batas untuk semua window stride 1 dari deret (N, F), urutan sama
+        dengan prepare_lstm_sequence / compute_risk_scores. Rata-rata bergulir lewat cumsum per baris.
+        """
+        row_score = np.empty(len(scaled))
+        row_out = np.empty(len(scaled), dtype=np.int64)
+        for i in range(0, len(scaled), chunk_size):
+            chunk = scaled[i : i + chunk_size]
+            row_score[i : i + len(chunk)] = self.row_residuals(chunk).mean(axis=1)
+            row_out[i : i + len(chunk)] = self.out_of_bounds(chunk)
+
+        def rolling_sum(values):
+            cumsum = np.concatenate([[0], np.cumsum(values)])
+            return cumsum[time_steps:] - cumsum[:-time_steps]
+
+        return rolling_sum(row_score) / time_steps, rolling_sum(row_out) == 0
+
+    def calibrate(self, scores, in_bounds, risk, labels, thresh_critical, thresh_warning,
+                  max_recall_loss=PREFILTER_MAX_RECALL_LOSS, max_flip_rate=PREFILTER_MAX_FLIP_RATE):
+        """
+        Pilih threshold skor PCA terbesar yang masih memenuhi: recall CRITICAL pada FAILURE_PERIODS turun
+        maks max_recall_loss, dan maks max_flip_rate window yang lolos menurut LSTM >= WARNING.
+        scores/in_bounds dari series_scores, risk = risk score LSTM per window, labels = failure_labels.
+        """
+        scores, risk = np.asarray(scores, dtype=float), np.asarray(risk, dtype=float)
+        labels, in_bounds = np.asarray(labels).astype(bool), np.asarray(in_bounds)
+        critical, flagged = risk > thresh_critical, risk > thresh_warning
+
+        # Peta skor PCA -> risk LSTM dari window normal di dalam batas (least squares)
+        normal = in_bounds & ~flagged
+        if normal.sum() >= 2 and np.ptp(scores[normal]) > 0:
+            self.risk_slope, self.risk_intercept = map(float, np.polyfit(scores[normal], risk[normal], 1))
+        if self.risk_slope <= 0:
+            self.risk_slope, self.risk_intercept = 0.0, float(np.median(risk[normal])) if normal.any() else 0.0
+
+        candidates = np.flatnonzero(in_bounds)
+        order = candidates[np.argsort(scores[candidates], kind="stable")]
+        sorted_scores = scores[order]
+        n_passed = np.arange(1, len(order) + 1)
+        positives = int(labels.sum())
+        lost = np.cumsum(labels[order] & critical[order])
+        flips = np.cumsum(flagged[order])
+
+        # Hanya ujung grup skor yang sama (semua window dengan skor <= threshold ikut lolos)
+        group_end = np.append(sorted_scores[1:] != sorted_scores[:-1], True) if len(order) else np.zeros(0, bool)
+        valid = (
+            group_end
+            & (lost <= max_recall_loss * positives)
+            & (flips <= max_flip_rate * n_passed)
+            & (self.risk_intercept + self.risk_slope * sorted_scores < thresh_warning)
+        )
+        best = np.flatnonzero(valid)
+        passed = 0
+        self.threshold = -np.inf
+        if len(best):
+            passed = int(best[-1]) + 1
+            self.threshold = float(sorted_scores[passed - 1])
+
+        recall = float((labels & critical).sum() / positives) if positives else 0.0
+        lost_count = int(lost[passed - 1]) if passed else 0
+        self.stats.update({
+            "threshold": self.threshold,
+            "skip_fraction": passed / len(scores) if len(scores) else 0.0,
+            "recall": recall,
+            "recall_with_prefilter": recall - (lost_count / positives if positives else 0.0),
+            "recall_loss": lost_count / positives if positives else 0.0,
+            "flip_rate": int(flips[passed - 1]) / passed if passed else 0.0,
+            "risk_intercept": self.risk_intercept,
+            "risk_slope": self.risk_slope
+        })
+        return dict(self.stats)
+
+    def save(self, path):
+        np.savez(
+            path, mean=self.mean, components=self.components, lower=self.lower, upper=self.upper,
+            threshold=self.threshold, risk_intercept=self.risk_intercept, risk_slope=self.risk_slope,
+            stats=json.dumps(self.stats)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        return cls(
+            data["mean"], data["components"], data["lower"], data["upper"], float(data["threshold"]),
+            float(data["risk_intercept"]), float(data["risk_slope"]), json.loads(str(data["stats"]))
+        )
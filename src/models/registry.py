@@ -0,0 +1,78 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+from src.utils.config import (
+    MODEL_PATH, SCALER_PATH, CONFIG_PATH, TFLITE_MODEL_PATH, ONNX_MODEL_PATH, NUMPY_WEIGHTS_PATH,
+    VERSIONS_DIR, CURRENT_POINTER_PATH
+)
+
+# Nama file artefak di dalam setiap direktori versi (sama dengan layout lama di models_store)
+LEGACY_PATHS = {
+    "model": MODEL_PATH,
+    "scaler": SCALER_PATH,
+    "config": CONFIG_PATH,
+    "tflite": TFLITE_MODEL_PATH,
+    "onnx": ONNX_MODEL_PATH,
+    "numpy": NUMPY_WEIGHTS_PATH,
+}
+ARTIFACT_FILES = {key: os.path.basename(path) for key, path in LEGACY_PATHS.items()}
+# Hasil evaluasi training (risk score data uji per window), hanya ada di direktori versi
+ARTIFACT_FILES.update({"eval_scores": "eval_risk_scores.npy", "eval_timestamps": "eval_timestamps.npy"})
+# Profil distribusi fitur training untuk drift monitor
+ARTIFACT_FILES["drift_reference"] = "drift_reference.npz"
+# Screening sebelum LSTM (src/models/prefilter.py)
+ARTIFACT_FILES["prefilter"] = "prefilter.npz"
+# Varian presisi TFLite (opsional, EXPORT_VARIANTS) + laporan perbandingan akurasi vs kecepatan
+ARTIFACT_FILES.update({
+    "tflite_float16": "metropt_lstm_model_float16.tflite",
+    "tflite_int8": "metropt_lstm_model_int8.tflite",
+    "variants": "variants.json"
+})
+
+def artifact_paths(version_dir):
+    return {key: (Path(version_dir) / name).as_posix() for key, name in ARTIFACT_FILES.items()}
+
+def create_version_dir():
+    """Direktori versi baru (belum aktif sampai publish_version dipanggil)."""
+    base = datetime.now().strftime("%Y%m%d-%H%M%S")
+    name, suffix = base, 1
+    while (VERSIONS_DIR / name).exists():
+        name = f"{base}-{suffix}"
+        suffix += 1
+    version_dir = VERSIONS_DIR / name
+    version_dir.mkdir(parents=True)
+    return version_dir
+
+def publish_version(version):
+    """Ganti pointer CURRENT secara atomik (tulis file sementara lalu os.replace)."""
+    version = Path(version).name
+    if not (VERSIONS_DIR / version).is_dir():
+        raise FileNotFoundError(f"Versi {version} tidak ditemukan di {VERSIONS_DIR}")
+
+    tmp_path = CURRENT_POINTER_PATH.with_name(CURRENT_POINTER_PATH.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CURRENT_POINTER_PATH)
+    return version
+
+def current_version():
+    try:
+        with open(CURRENT_POINTER_PATH) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def resolve_artifacts(version=None):
+    """(versi, path artefak). Tanpa pointer CURRENT dipakai layout lama models_store (versi 'legacy')."""
+    version = version or current_version()
+    if version is None:
+        return "legacy", dict(LEGACY_PATHS)
+    return version, artifact_paths(VERSIONS_DIR / version)
+
+def list_versions():
+    if not VERSIONS_DIR.is_dir():
+        return []
+    return sorted(path.name for path in VERSIONS_DIR.iterdir() if path.is_dir())
@@ -1,5 +1,7 @@
+import json
 import os
-import pandas as pd
+import tempfile
+import time
 import numpy as np
 import joblib
 import tensorflow as tf
@@ -8,32 +10,22 @@ import mlflow
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout, RepeatVector, TimeDistributed
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import precision_recall_curve, accuracy_score, precision_score, recall_score, f1_score
-from src.utils.config import MODEL_PATH, SCALER_PATH, CONFIG_PATH, MLFLOW_DB_PATH, RAW_CSV_PATH, FEATURE_COLS, TIME_STEPS
-from src.data.preprocessing import process_input_data, prepare_lstm_sequence
-
-# Sesuaikan jadwal berdasarkan pdf
-FAILURE_PERIODS = [
-    ('2020-04-18 00:00:00', '2020-04-18 23:59:00', 'Air Leak (High Stress)'),
-    ('2020-05-29 23:30:00', '2020-05-30 06:00:00', 'Air Leak (High Stress)'),
-    ('2020-06-05 10:00:00', '2020-06-07 14:30:00', 'Air Leak (High Stress)'),
-    ('2020-07-15 14:30:00', '2020-07-15 19:00:00', 'Air Leak (High Stress)')
-]
-
-def apply_failure_labels(df):
-    """Memberikan label 1 pada data yang masuk jadwal rusak, 0 untuk aman."""
-    df['y_true_manual'] = 0
-    if not isinstance(df.index, pd.DatetimeIndex):
-        df.index = pd.to_datetime(df.index)
-
-    print("   [LABELING] Menerapkan Ground Truth...")
-    for start, end, label in FAILURE_PERIODS:
-        mask = (df.index >= start) & (df.index <= end)
-        df.loc[mask, 'y_true_manual'] = 1
-        count = mask.sum()
-        if count > 0:
-            print(f"{label}: Ditandai {count} baris data.")
-    return df
+from src.utils.config import (
+    MLFLOW_DB_PATH, RAW_CSV_PATH, FEATURE_COLS, TIME_STEPS, TFLITE_BATCH_SIZE, DATA_CACHE_DIR, EXPORT_VARIANTS,
+    MODEL_VARIANTS, VARIANT_LATENCY_WINDOWS
+)
+from src.utils.resources import peak_rss_mb
+from src.utils.logger import get_logger
+from src.data.store import sensor_store, write_feature_memmap, scale_feature_memmap
+from src.data.preprocessing import iter_feature_chunks, count_windows, iter_lstm_batches, make_window_dataset
+from src.models.backends import TFLiteBackend, export_numpy_weights, variant_artifact
+from src.monitoring.drift import build_reference_profile
+from src.models.calibration import FAILURE_PERIODS, failure_labels, calibrate, metrics_at_threshold, load_eval_scores
+from src.utils.diagnosis import classify_severity
+from src.models.prefilter import Prefilter
+from src.models.registry import LEGACY_PATHS, artifact_paths, create_version_dir, publish_version, resolve_artifacts
+
+logger = get_logger("train")
 
 def build_autoencoder(input_shape):
     """Membangun Arsitektur Jaringan Saraf LSTM"""
@@ -50,117 +42,377 @@ def build_autoencoder(input_shape):
     model.compile(optimizer='adam', loss='mae')
     return model
 
-def run_training():
-    print("\n[TRAINING] Memulai proses training dengan MLflow & Kalibrasi F1")
+def convert_tflite(model, variant="float32"):
+    """
+    Flatbuffer TFLite batch tetap. float16: bobot disimpan half precision (dihitung float32 di CPU);
+    int8: kuantisasi dynamic-range (bobot int8, aktivasi float, kernel hybrid).
+    """
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+
+    n_features = model.input_shape[-1]
+
+    # LSTM hanya bisa dikonversi ke TFLite sebagai graph beku dengan batch tetap
+    @tf.function(input_signature=[tf.TensorSpec([TFLITE_BATCH_SIZE, TIME_STEPS, n_features], tf.float32)])
+    def serve_fixed(x):
+        return model(x, training=False)
+
+    frozen = convert_variables_to_constants_v2(serve_fixed.get_concrete_function())
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([frozen])
+    if variant in ("float16", "int8"):
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+def _unlink_existing(path):
+    # Artefak versi hasil recalibrate adalah hardlink ke versi sumber: file lama dilepas dulu
+    # agar penulisan ulang tidak ikut mengubah versi sumber (yang mungkin sedang di-memory-map worker)
+    if os.path.exists(path):
+        os.remove(path)
+
+def export_inference_artifacts(model, paths=None, variants=()):
+    """
+    Ekspor artefak inference ringan: bobot NumPy, TFLite dan ONNX (jika tf2onnx terpasang),
+    plus varian presisi TFLite yang diminta (float16, int8).
+    """
+    paths = paths or LEGACY_PATHS
+    _unlink_existing(paths["numpy"])
+    exported = {"numpy": export_numpy_weights(model, paths["numpy"])}
+    n_features = model.input_shape[-1]
+
+    for variant in ["float32", *variants]:
+        if variant not in MODEL_VARIANTS:
+            raise ValueError(f"Varian '{variant}' tidak dikenal. Pilihan: {', '.join(MODEL_VARIANTS)}")
+        key = variant_artifact(TFLiteBackend, variant)
+        if key not in paths:
+            raise ValueError(f"Varian {variant} hanya bisa diekspor ke direktori versi (models_store/versions).")
+        flatbuffer = convert_tflite(model, variant)
+        _unlink_existing(paths[key])
+        with open(paths[key], "wb") as f:
+            f.write(flatbuffer)
+        exported[key] = paths[key]
+
+    try:
+        import tf2onnx
+    except ImportError:
+        logger.info("[EXPORT] tf2onnx tidak terpasang, ekspor ONNX dilewati.")
+        return exported
+
+    signature = [tf.TensorSpec([None, TIME_STEPS, n_features], tf.float32, name="windows")]
+
+    @tf.function(input_signature=signature)
+    def serve_dynamic(x):
+        return model(x, training=False)
+
+    _unlink_existing(paths["onnx"])
+    tf2onnx.convert.from_function(serve_dynamic, input_signature=signature, opset=13, output_path=paths["onnx"])
+    exported["onnx"] = paths["onnx"]
+    return exported
+
+def compute_risk_scores(model, scaled_data, time_steps=TIME_STEPS, batch_size=1024, out_path=None):
+    """
+    Risk score (MAE rata-rata) per window, dihitung per batch agar memori tetap kecil.
+    model: model Keras atau backend inference (predict). out_path: tulis langsung ke file .npy (memmap).
+    """
+    predict = model.predict_on_batch if hasattr(model, "predict_on_batch") else model.predict
+    n_windows = count_windows(len(scaled_data), time_steps)
+    if out_path is None:
+        risk = np.empty(n_windows, dtype=np.float32)
+    else:
+        risk = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(n_windows,))
+
+    position = 0
+    for X_batch in iter_lstm_batches(scaled_data, time_steps, batch_size):
+        reconstruction = predict(X_batch)
+        risk[position : position + len(X_batch)] = np.mean(np.abs(reconstruction - X_batch), axis=(1, 2))
+        position += len(X_batch)
+
+    if out_path is not None:
+        risk.flush()
+    return risk
+
+def calibrate_prefilter(model, train_scaled, test_scaled, test_risk, test_labels, thresh_critical, thresh_warning,
+                        out_path, sample_windows=4096, batch_size=1024):
+    """
+    Prefilter di-fit pada data training, threshold dikalibrasi pada data uji berlabel. Throughput diukur
+    pada sampel window uji: semua lewat LSTM vs screening + LSTM hanya untuk window yang tidak lolos.
+    """
+    prefilter = Prefilter.fit(train_scaled)
+    scores, in_bounds = prefilter.series_scores(test_scaled, TIME_STEPS)
+    stats = prefilter.calibrate(scores, in_bounds, test_risk, test_labels, thresh_critical, thresh_warning)
+
+    X_sample = next(iter_lstm_batches(test_scaled, TIME_STEPS, sample_windows))
+    started = time.perf_counter()
+    for i in range(0, len(X_sample), batch_size):
+        model.predict_on_batch(X_sample[i : i + batch_size])
+    lstm_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    prefilter.screen(X_sample, thresh_warning)
+    screen_seconds = time.perf_counter() - started
+
+    stats.update({
+        "lstm_ms_per_1k_windows": lstm_seconds / len(X_sample) * 1000 * 1000,
+        "screen_ms_per_1k_windows": screen_seconds / len(X_sample) * 1000 * 1000,
+        "throughput_gain": lstm_seconds / (screen_seconds + (1 - stats["skip_fraction"]) * lstm_seconds)
+    })
+    prefilter.stats = stats
+    prefilter.save(out_path)
+    return stats
+
+def evaluate_variants(paths, variants, test_scaled, test_risk, test_labels, thresh_critical, thresh_warning,
+                      sample_windows=VARIANT_LATENCY_WINDOWS, repeats=3):
+    """
+    Bandingkan varian TFLite dengan model float32 pada data uji berlabel memakai threshold hasil kalibrasi:
+    precision/recall/F1, kesamaan severity dan galat relatif risk score terhadap float32 (Keras; penyebut minimal
+    threshold WARNING karena risk window normal bisa mendekati nol), ukuran file,
+    dan latency CPU per window (median beberapa kali predict atas sampel window uji).
+    float32: metrik dari risk score Keras yang dipakai kalibrasi, latency dari TFLite float32.
+    """
+    reference_severity = classify_severity(test_risk, thresh_critical, thresh_warning)
+    X_sample = next(iter_lstm_batches(test_scaled, TIME_STEPS, sample_windows))
+    base_size = os.path.getsize(paths["tflite"])
+    report = {"threshold_critical": thresh_critical, "threshold_warning": thresh_warning, "variants": {}}
+
+    for variant in ["float32", *variants]:
+        path = paths[variant_artifact(TFLiteBackend, variant)]
+        backend = TFLiteBackend(path)
+        backend.predict(X_sample[:TFLITE_BATCH_SIZE])
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            backend.predict(X_sample)
+            timings.append(time.perf_counter() - started)
+
+        risk = test_risk if variant == "float32" else compute_risk_scores(backend, test_scaled, TIME_STEPS)
+        report["variants"][variant] = {
+            "artifact": os.path.basename(path),
+            "size_bytes": os.path.getsize(path),
+            "size_ratio": os.path.getsize(path) / base_size,
+            **metrics_at_threshold(risk, test_labels, thresh_critical),
+            "severity_agreement": float(np.mean(classify_severity(risk, thresh_critical, thresh_warning) == reference_severity)),
+            "risk_error_p99": float(np.quantile(
+                np.abs(risk - test_risk) / np.maximum(np.abs(test_risk), thresh_warning), 0.99
+            )),
+            "latency_us_per_window": float(np.median(timings)) / len(X_sample) * 1e6
+        }
+
+    baseline = report["variants"]["float32"]
+    for result in report["variants"].values():
+        result["f1_delta"] = result["f1_score"] - baseline["f1_score"]
+        result["speedup"] = baseline["latency_us_per_window"] / result["latency_us_per_window"]
+    with open(paths["variants"], "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def export_only(variants=()):
+    """
+    Ekspor ulang artefak inference dari model versi aktif. Varian yang diminta dievaluasi ulang
+    (variants.json) dengan risk score uji tersimpan dan threshold di config versi itu.
+    """
+    from tensorflow.keras.models import load_model
+
+    version, paths = resolve_artifacts()
+    exported = export_inference_artifacts(load_model(paths["model"], compile=False), paths, variants)
+    if not variants:
+        return exported
+
+    _, _, test_risk, test_timestamps = load_eval_scores(version)
+    config = joblib.load(paths["config"])
+    scaler = joblib.load(paths["scaler"])
+    sensor_store.ensure()
+    DATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="features-", dir=DATA_CACHE_DIR) as work_dir:
+        test_scaled, _ = write_feature_memmap(
+            iter_feature_chunks(sensor_store.iter_range_chunks('2020-04-01')),
+            os.path.join(work_dir, "test_features.f32"), transform=scaler.transform
+        )
+        if count_windows(len(test_scaled), TIME_STEPS) != len(test_risk):
+            raise ValueError(f"Data uji berubah sejak training versi {version}; varian tidak bisa dievaluasi ulang.")
+        evaluate_variants(
+            paths, variants, test_scaled, np.asarray(test_risk), failure_labels(test_timestamps),
+            config['threshold_critical'], config['threshold_warning']
+        )
+    exported["variants"] = paths["variants"]
+    return exported
+
+def run_training(epochs=15, variants=EXPORT_VARIANTS):
+    logger.info("[TRAINING] Memulai proses training dengan MLflow & Kalibrasi F1")
     
     mlflow.set_tracking_uri(f"sqlite:///{MLFLOW_DB_PATH}")
     mlflow.set_experiment("MetroPT3_Anomaly_Detection")
+    started = time.perf_counter()
 
-    with mlflow.start_run(run_name="LSTM_F1_Optimized_Run"):
+    # Fitur per menit ditulis ke file sementara (memmap), bukan ditampung di memori
+    DATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with mlflow.start_run(run_name="LSTM_F1_Optimized_Run"), \
+            tempfile.TemporaryDirectory(prefix="features-", dir=DATA_CACHE_DIR) as work_dir:
         
         # Load data
-        if not os.path.exists(RAW_CSV_PATH):
-            print(f"[TRAINING] Error: File tidak ditemukan di {RAW_CSV_PATH}")
+        if not os.path.exists(RAW_CSV_PATH) and not sensor_store.is_fresh():
+            logger.error(f"[TRAINING] Error: File tidak ditemukan di {RAW_CSV_PATH}")
             return False
+
+        # Semua artefak ditulis ke direktori versi baru; API baru memakainya setelah publish_version
+        version_dir = create_version_dir()
+        paths = artifact_paths(version_dir)
+        mlflow.set_tag("artifact_version", version_dir.name)
             
-        print("[TRAINING] Membaca data mentah...")
-        df = pd.read_csv(RAW_CSV_PATH)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df.set_index('timestamp', inplace=True)
-        
-        print("[TRAINING] Memproses Data Sehat (Feb-Mar)...")
-        df_train_raw = df['2020-02-01':'2020-03-01']
-        df_train_clean = process_input_data(df_train_raw)
+        logger.info("[TRAINING] Membaca data mentah (cache kolumnar)...")
+        sensor_store.ensure()
         
+        logger.info("[TRAINING] Memproses Data Sehat (Feb-Mar)...")
+        # Data mentah dibaca per chunk; scaler di-fit inkremental lalu diterapkan ke file fitur
         scaler = MinMaxScaler()
-        train_scaled = scaler.fit_transform(df_train_clean)
-        joblib.dump(scaler, SCALER_PATH)
-        
-        X_train = prepare_lstm_sequence(train_scaled, TIME_STEPS)
+        train_path = os.path.join(work_dir, "train_features.f32")
+        write_feature_memmap(
+            iter_feature_chunks(sensor_store.iter_range_chunks('2020-02-01', '2020-03-01')),
+            train_path, on_chunk=scaler.partial_fit
+        )
+        train_scaled = scale_feature_memmap(train_path, scaler)
+        joblib.dump(scaler, paths["scaler"])
+        build_reference_profile(train_scaled).save(paths["drift_reference"])
         
-        epochs = 15
         batch_size = 64
+
+        # Window dibangkitkan per batch (tf.data), split sama seperti validation_split=0.1 tanpa shuffle
+        n_windows = count_windows(len(train_scaled), TIME_STEPS)
+        split_at = int(n_windows * (1 - 0.1))
+        train_ds = make_window_dataset(train_scaled, TIME_STEPS, batch_size, end=split_at)
+        val_ds = make_window_dataset(train_scaled, TIME_STEPS, batch_size, start=split_at)
         mlflow.log_params({
             "time_steps": TIME_STEPS, "epochs": epochs, "batch_size": batch_size,
-            "validation_split": 0.1, "shuffle": False
+            "validation_split": 0.1, "shuffle": False, "export_variants": ",".join(variants) or "none"
         })
 
         # Train
-        print("[TRAINING] Melatih model LSTM...")
-        model = build_autoencoder((X_train.shape[1], X_train.shape[2]))
+        logger.info("[TRAINING] Melatih model LSTM...")
+        model = build_autoencoder((TIME_STEPS, train_scaled.shape[1]))
         early_stop = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
         
+        fit_started = time.perf_counter()
         history = model.fit(
-            X_train, X_train, epochs=epochs, batch_size=batch_size, 
-            validation_split=0.1, callbacks=[early_stop], shuffle=False, verbose=1
+            train_ds, validation_data=val_ds, epochs=epochs,
+            callbacks=[early_stop], verbose=1
         )
-        model.save(MODEL_PATH)
+        fit_seconds = time.perf_counter() - fit_started
+        model.save(paths["model"])
         mlflow.log_metric("final_train_mae", history.history['loss'][-1])
 
+        logger.info("[TRAINING] Mengekspor artefak inference ringan...")
+        for path in export_inference_artifacts(model, paths, variants).values():
+            mlflow.log_artifact(path)
+
         # Evaluasi dan Kalibrasi
-        print("[EVALUASI] Menyiapkan Data Uji (April-Agustus)...")
-        df_test_raw = df['2020-04-01':] 
-        df_test_clean = process_input_data(df_test_raw)
-        
-        test_scaled = scaler.transform(df_test_clean)
-        X_test = prepare_lstm_sequence(test_scaled, TIME_STEPS)
-        
-        test_timestamps = df_test_clean.index[TIME_STEPS - 1:]
-        
-        print("[EVALUASI] Menghitung Risk Score Data Uji...")
-        test_pred = model.predict(X_test, verbose=0)
-        test_mae = np.mean(np.abs(test_pred - X_test), axis=1)
-        test_risk = np.mean(test_mae, axis=1)
-        
-        # DataFrame Evaluasi
-        eval_df = pd.DataFrame({'Risk_Score': test_risk}, index=test_timestamps)
-        eval_df = apply_failure_labels(eval_df)
-        
-        print("[EVALUASI] Mengoptimasi Threshold dengan F1-Score...")
-        precisions, recalls, thresholds = precision_recall_curve(eval_df['y_true_manual'], eval_df['Risk_Score'])
-        
-        # Cegah pembagian dengan nol
-        f1_scores = 2 * (precisions * recalls) / (precisions + recalls + 1e-6)
+        logger.info("[EVALUASI] Menyiapkan Data Uji (April-Agustus)...")
+        eval_started = time.perf_counter()
+        test_scaled, test_minutes = write_feature_memmap(
+            iter_feature_chunks(sensor_store.iter_range_chunks('2020-04-01')),
+            os.path.join(work_dir, "test_features.f32"), transform=scaler.transform
+        )
+        np.save(paths["eval_timestamps"], test_minutes[TIME_STEPS - 1:])
         
-        best_idx = np.argmax(f1_scores)
-        best_threshold = float(thresholds[best_idx])
+        logger.info("[EVALUASI] Menghitung Risk Score Data Uji...")
+        test_risk = compute_risk_scores(model, test_scaled, TIME_STEPS, out_path=paths["eval_scores"])
+        eval_seconds = time.perf_counter() - eval_started
         
-        # Hitung metrik akhir menggunakan threshold terbaik
-        eval_df['y_pred'] = (eval_df['Risk_Score'] >= best_threshold).astype(int)
+        test_labels = failure_labels(test_minutes[TIME_STEPS - 1:])
+        logger.info(f"   [LABELING] {len(FAILURE_PERIODS)} periode rusak: Ditandai {int(test_labels.sum())} baris data.")
         
-        final_acc = accuracy_score(eval_df['y_true_manual'], eval_df['y_pred'])
-        final_prec = precision_score(eval_df['y_true_manual'], eval_df['y_pred'], zero_division=0)
-        final_rec = recall_score(eval_df['y_true_manual'], eval_df['y_pred'], zero_division=0)
-        final_f1 = f1_scores[best_idx]
+        logger.info("[EVALUASI] Mengoptimasi Threshold dengan F1-Score...")
+        calibration = calibrate(test_risk, test_labels)
+        best_threshold = calibration["threshold_critical"]
+        final_acc = calibration["accuracy"]
+        final_prec = calibration["precision"]
+        final_rec = calibration["recall"]
+        final_f1 = calibration["f1_score"]
+
+        logger.info("[PREFILTER] Kalibrasi screening (batas fitur + PCA) sebelum LSTM...")
+        prefilter_stats = calibrate_prefilter(
+            model, train_scaled, test_scaled, test_risk, test_labels,
+            best_threshold, calibration["threshold_warning"], paths["prefilter"]
+        )
+        logger.info("[PREFILTER] Hasil kalibrasi", extra={"fields": {
+            "skip_fraction": round(prefilter_stats["skip_fraction"], 4),
+            "recall_loss": round(prefilter_stats["recall_loss"], 4),
+            "flip_rate": round(prefilter_stats["flip_rate"], 4),
+            "throughput_gain": round(prefilter_stats["throughput_gain"], 2)
+        }})
         
         # Simpan
         config_data = {
             'threshold_critical': best_threshold,
-            'threshold_warning': best_threshold * 0.7, # Warning diset di 70% dari Critical
+            'threshold_warning': calibration["threshold_warning"], # Warning diset di 70% dari Critical
             'features': FEATURE_COLS,
             'time_steps': TIME_STEPS
         }
-        joblib.dump(config_data, CONFIG_PATH)
+        joblib.dump(config_data, paths["config"])
         
         # Log Metrics ke MLflow
         mlflow.log_metrics({
             "threshold_critical": best_threshold,
-            "threshold_warning": best_threshold * 0.7,
+            "threshold_warning": calibration["threshold_warning"],
             "eval_accuracy": final_acc,
             "eval_precision": final_prec,
             "eval_recall": final_rec,
-            "eval_f1_score": final_f1
+            "eval_f1_score": final_f1,
+            # Biaya resource pipeline (memori dibatasi oleh ukuran chunk, bukan rentang tanggal)
+            "fit_seconds": fit_seconds,
+            "eval_seconds": eval_seconds,
+            "wall_seconds": time.perf_counter() - started,
+            "peak_rss_mb": peak_rss_mb()
+        })
+        
+        mlflow.log_metrics({
+            f"prefilter_{key}": value for key, value in prefilter_stats.items() if np.isfinite(value)
         })
         
-        mlflow.log_artifact(CONFIG_PATH) 
-        mlflow.log_artifact(SCALER_PATH) 
+        mlflow.log_artifact(paths["config"]) 
+        mlflow.log_artifact(paths["scaler"]) 
+        mlflow.log_artifact(paths["prefilter"])
+
+        if variants:
+            logger.info(f"[VARIAN] Evaluasi {', '.join(variants)} vs float32 pada data uji...")
+            variant_report = evaluate_variants(
+                paths, variants, test_scaled, test_risk, test_labels, best_threshold, calibration["threshold_warning"]
+            )
+            for variant, result in variant_report["variants"].items():
+                numeric = {key: value for key, value in result.items() if isinstance(value, (int, float))}
+                mlflow.log_metrics({f"variant_{variant}_{key}": value for key, value in numeric.items()})
+                logger.info(f"[VARIAN] {variant}", extra={"fields": {
+                    key: round(numeric[key], 4) for key in ("f1_score", "f1_delta", "severity_agreement", "size_ratio",
+                                                           "latency_us_per_window", "speedup")
+                }})
+            mlflow.log_artifact(paths["variants"])
+
+        # Pointer CURRENT diganti paling akhir, setelah semua artefak lengkap di disk
+        publish_version(version_dir)
+        mlflow.log_param("model_version", version_dir.name)
         
-        print(f"\n[HASIL FINAL MLOPS]")
-        print(f"   - Threshold Critical : {best_threshold:.6f}")
-        print(f"   - Accuracy           : {final_acc:.4f}")
-        print(f"   - Precision          : {final_prec:.4f}")
-        print(f"   - Recall             : {final_rec:.4f}")
-        print(f"   - F1-Score           : {final_f1:.4f}")
-        print("[TRAINING] Selesai! Threshold dan Metrics telah dicatat di MLflow.")
+        logger.info("[HASIL FINAL MLOPS]", extra={"fields": {
+            "threshold_critical": round(best_threshold, 6),
+            "accuracy": round(final_acc, 4),
+            "precision": round(final_prec, 4),
+            "recall": round(final_rec, 4),
+            "f1_score": round(final_f1, 4),
+            "wall_seconds": round(time.perf_counter() - started, 1),
+            "peak_rss_mb": round(peak_rss_mb())
+        }})
+        logger.info(f"[TRAINING] Selesai! Versi {version_dir.name} aktif. Threshold dan Metrics telah dicatat di MLflow.")
         
-        return True
\ No newline at end of file
+        return True
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Training LSTM autoencoder MetroPT-3.")
+    parser.add_argument("--export-only", action="store_true",
+                        help="Hanya ekspor artefak inference (NumPy/TFLite/ONNX) dari model versi aktif.")
+    parser.add_argument("--epochs", type=int, default=15)
+    parser.add_argument("--variants", nargs="*", default=EXPORT_VARIANTS, choices=MODEL_VARIANTS[1:],
+                        help="Varian TFLite tambahan yang diekspor dan dibandingkan di MLflow (default: EXPORT_VARIANTS).")
+    args = parser.parse_args()
+
+    if args.export_only:
+        print(export_only(args.variants))
+    else:
+        run_training(epochs=args.epochs, variants=args.variants)
@@ -0,0 +1,190 @@
+import threading
+
+import numpy as np
+
+from src.utils.config import FEATURE_COLS, DRIFT_BINS, DRIFT_MIN_OBSERVATIONS, DRIFT_CHUNK_SIZE, DRIFT_FLUSH_ROWS
+
+# Drift dihitung di ruang fitur yang sudah di-scale: data training Feb-Mar berada di [0, 1],
+# sehingga cukup DRIFT_BINS bin tetap di [0, 1] + satu bin underflow (< 0) dan overflow (> 1).
+
+# Batas PSI yang umum dipakai: < 0.1 stabil, 0.1-0.25 bergeser, > 0.25 drift signifikan
+PSI_WARNING = 0.1
+PSI_CRITICAL = 0.25
+# Toleransi nilai maksimum training yang setelah scaling sedikit di atas 1.0 (float32)
+UPPER_TOLERANCE = 1e-6
+
+def bin_index(X, bins=DRIFT_BINS):
+    """Indeks bin (0 = underflow, 1..bins, bins + 1 = overflow) untuk array berbentuk (..., F)."""
+    X = np.asarray(X, dtype=np.float64)
+    idx = np.floor(X * bins)
+    idx = np.where((X >= 1) & (X <= 1 + UPPER_TOLERANCE), bins - 1, idx)
+    return np.clip(idx, -1, bins).astype(np.intp) + 1
+
+class DriftProfile:
+    """Sketch per fitur dengan memori konstan: histogram bin tetap + momen (Welford)."""
+
+    def __init__(self, n_features=len(FEATURE_COLS), bins=DRIFT_BINS):
+        self.bins = bins
+        self.counts = np.zeros((n_features, bins + 2), dtype=np.int64)
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self._rows = np.arange(n_features)
+
+    def update(self, row):
+        """Satu baris fitur (F,)."""
+        row = np.asarray(row, dtype=np.float64)
+        self.counts[self._rows, bin_index(row, self.bins)] += 1
+
+        self.n += 1
+        delta = row - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (row - self.mean)
+
+    def update_batch(self, X):
+        """Banyak baris (N, F) sekaligus: profil referensi dan flush buffer DriftMonitor."""
+        X = np.asarray(X, dtype=np.float64)
+        if len(X) == 0:
+            return
+        n_features, width = self.counts.shape
+        flat = (bin_index(X, self.bins) + self._rows * width).ravel()
+        self.counts += np.bincount(flat, minlength=n_features * width).reshape(n_features, width)
+
+        # Gabungkan momen batch dengan momen berjalan (Chan et al.)
+        n_batch = len(X)
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.n + n_batch
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n_batch / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.n * n_batch / total
+        self.n = total
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / max(self.n - 1, 1))
+
+    def save(self, path):
+        np.savez(path, counts=self.counts, n=self.n, mean=self.mean, m2=self.m2, bins=self.bins)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        profile = cls(data["counts"].shape[0], int(data["bins"]))
+        profile.counts = data["counts"]
+        profile.n = int(data["n"])
+        profile.mean = data["mean"]
+        profile.m2 = data["m2"]
+        return profile
+
+def build_reference_profile(scaled_data, chunk_size=DRIFT_CHUNK_SIZE):
+    """Profil referensi dari data training yang sudah di-scale (bisa memmap, dibaca per chunk)."""
+    profile = DriftProfile(np.shape(scaled_data)[1])
+    for i in range(0, len(scaled_data), chunk_size):
+        profile.update_batch(scaled_data[i : i + chunk_size])
+    return profile
+
+def compare_profiles(current, reference, eps=1e-4):
+    """PSI, KS (atas histogram) dan pergeseran mean (dalam satuan std referensi) per fitur."""
+    p = current.counts / max(current.n, 1)
+    q = reference.counts / max(reference.n, 1)
+
+    p_smooth, q_smooth = np.maximum(p, eps), np.maximum(q, eps)
+    psi = np.sum((p_smooth - q_smooth) * np.log(p_smooth / q_smooth), axis=1)
+    ks = np.max(np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)), axis=1)
+    mean_shift = (current.mean - reference.mean) / np.maximum(reference.std, 1e-9)
+    out_of_range = p[:, 0] + p[:, -1]
+    return psi, ks, mean_shift, out_of_range
+
+def drift_status(psi):
+    if psi >= PSI_CRITICAL:
+        return "drift"
+    if psi >= PSI_WARNING:
+        return "shift"
+    return "stable"
+
+class DriftMonitor:
+    """
+    Profil data live sejak start (atau reset) dibandingkan dengan profil referensi versi model aktif.
+    Ganti versi model = scaler berbeda, jadi profil live di-reset saat versi berubah.
+
+    Jalur per request hanya menyalin baris ke buffer; histogram/momen diperbarui per
+    DRIFT_FLUSH_ROWS baris sekaligus (update_batch) atau saat report diminta.
+    """
+
+    def __init__(self, flush_rows=DRIFT_FLUSH_ROWS):
+        self._lock = threading.Lock()
+        self.version = None
+        self.reference = None
+        self.profile = DriftProfile()
+        self._pending = np.empty((flush_rows, len(FEATURE_COLS)))
+        self._n_pending = 0
+
+    def _reset(self, version, reference):
+        self.version = version
+        self.reference = reference
+        self.profile = DriftProfile()
+        self._n_pending = 0
+
+    def _flush(self):
+        if self._n_pending:
+            self.profile.update_batch(self._pending[: self._n_pending])
+            self._n_pending = 0
+
+    def update(self, row, bundle):
+        """row: baris fitur terbaru (F,) yang sudah di-scale dengan scaler milik bundle."""
+        with self._lock:
+            if bundle.version != self.version:
+                self._reset(bundle.version, bundle.drift_reference)
+            self._pending[self._n_pending] = row
+            self._n_pending += 1
+            if self._n_pending == len(self._pending):
+                self._flush()
+
+    def reset(self):
+        with self._lock:
+            self.profile = DriftProfile()
+            self._n_pending = 0
+
+    def report(self):
+        with self._lock:
+            self._flush()
+            profile, reference, version = self.profile, self.reference, self.version
+            # Salin agar perhitungan skor tidak menahan lock jalur /predict
+            snapshot = DriftProfile(profile.counts.shape[0], profile.bins)
+            snapshot.counts, snapshot.n = profile.counts.copy(), profile.n
+            snapshot.mean, snapshot.m2 = profile.mean.copy(), profile.m2.copy()
+
+        result = {
+            "version": version,
+            "observations": snapshot.n,
+            "reference_observations": reference.n if reference is not None else None
+        }
+        if snapshot.n < DRIFT_MIN_OBSERVATIONS:
+            return {**result, "status": "insufficient_data", "features": {}}
+        if reference is None:
+            return {**result, "status": "no_reference", "features": {}}
+
+        psi, ks, mean_shift, out_of_range = compare_profiles(snapshot, reference)
+        features = {
+            name: {
+                "psi": round(float(psi[i]), 4),
+                "ks": round(float(ks[i]), 4),
+                "mean_shift_std": round(float(mean_shift[i]), 3),
+                "out_of_range": round(float(out_of_range[i]), 4),
+                "status": drift_status(psi[i])
+            }
+            for i, name in enumerate(FEATURE_COLS)
+        }
+        worst = int(np.argmax(psi))
+        return {
+            **result,
+            "status": drift_status(psi[worst]),
+            "max_psi": round(float(psi[worst]), 4),
+            "max_psi_feature": FEATURE_COLS[worst],
+            "features": features
+        }
+
+# Inisialisasi Singleton
+drift_monitor = DriftMonitor()
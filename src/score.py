@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.utils.config import (
+    RAW_CSV_PATH, DATA_CACHE_DIR, TIME_STEPS, INFERENCE_BACKEND,
+    SCORE_OUTPUT_DIR, SCORE_BATCH_SIZE, SCORE_PART_WINDOWS, SCORE_LOOKBACK_MINUTES
+)
+from src.data.store import SensorStore, sensor_store, write_feature_memmap, open_feature_memmap, range_bound, MINUTE_NS
+from src.models.registry import resolve_artifacts
+from src.data.preprocessing import iter_feature_chunks, iter_lstm_batches, count_windows
+from src.utils.diagnosis import classify_severity
+from src.utils.logger import get_logger
+
+logger = get_logger("score")
+
+# Bulk scoring offline (backfill): rentang tanggal CSV/Parquet -> risk score + severity per menit.
+#   1. Fitur per menit dihitung sekali per chunk (engine NumPy) lalu di-scale ke file memmap float32
+#   2. Window dibagi per part (SCORE_PART_WINDOWS window) dan di-scoring paralel di proses worker (spawn)
+#   3. Part selesai -> file part ditulis atomik + manifest diperbarui (checkpoint; job yang terputus dilanjutkan)
+# Window yang melintasi batas part tidak butuh overlap khusus: semua worker membaca memmap fitur yang sama.
+
+MANIFEST_NAME = "_manifest.json"
+WORK_DIR_NAME = "_work"
+FORMATS = {"parquet": ".parquet", "csv": ".csv"}
+
+_worker = {}
+
+def open_source(path=None):
+    """SensorStore untuk CSV/Parquet sumber. Sumber selain dataset default mendapat direktori cache sendiri."""
+    if path is None or os.path.abspath(path) == os.path.abspath(RAW_CSV_PATH):
+        return sensor_store
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return SensorStore(path, DATA_CACHE_DIR / "sources" / f"{Path(path).stem}-{digest}")
+
+def build_features(store, start, end, scaler, features_path, minutes_path):
+    """
+    Fitur ter-scale (memmap float32) + menit tiap baris, dibaca mulai SCORE_LOOKBACK_MINUTES sebelum start.
+    Mengembalikan (jumlah baris fitur, indeks window pertama yang berakhir >= start).
+    """
+    start_ns = range_bound(start, "start")
+    read_from = None if start_ns is None else pd.Timestamp(start_ns - SCORE_LOOKBACK_MINUTES * MINUTE_NS)
+    features, minutes = write_feature_memmap(
+        iter_feature_chunks(store.iter_range_chunks(read_from, end)), features_path, transform=scaler.transform
+    )
+    np.save(minutes_path, minutes)
+    first_window = 0 if start_ns is None else int(np.searchsorted(minutes[TIME_STEPS - 1:], start_ns))
+    return len(features), first_window
+
+def write_part(frame, path):
+    """Tulis ke file sementara lalu os.replace: part yang ada di disk selalu lengkap."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    if path.suffix == ".parquet":
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        frame.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+def _init_worker(backend_name, version):
+    from src.inference import ModelBundle
+
+    _worker["bundle"] = ModelBundle(backend_name, version)
+
+def score_part(task):
+    """Risk score + severity untuk window [w0, w1) -> satu file part. Dijalankan di worker."""
+    bundle = _worker["bundle"]
+    features = open_feature_memmap(task["features_path"])
+    minutes = np.load(task["minutes_path"], mmap_mode="r")
+    w0, w1 = task["windows"]
+
+    risk = np.empty(w1 - w0, dtype=np.float32)
+    position = 0
+    for X_batch in iter_lstm_batches(features, TIME_STEPS, task["batch_size"], start=w0, end=w1):
+        reconstruction = bundle.backend.predict(X_batch)
+        risk[position : position + len(X_batch)] = np.mean(np.abs(reconstruction - X_batch), axis=(1, 2))
+        position += len(X_batch)
+
+    frame = pd.DataFrame({
+        # Menit bar terakhir tiap window (sama dengan timestamps /predict/timeline)
+        "timestamp": np.array(minutes[w0 + TIME_STEPS - 1 : w1 + TIME_STEPS - 1]).view("datetime64[ns]"),
+        "risk_score": risk,
+        "severity_level": classify_severity(risk, bundle.thresh_critical, bundle.thresh_warning).astype(np.int8)
+    })
+    write_part(frame, Path(task["path"]))
+    return task["part"], len(frame)
+
+def _limit_worker_threads(workers):
+    """Thread BLAS/TensorFlow per worker = core / workers agar total thread tidak melebihi jumlah core."""
+    threads = str(max(1, (os.cpu_count() or 1) // workers))
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS"):
+        os.environ.setdefault(var, threads)
+    os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+
+def _load_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _save_manifest(manifest, path):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _clear_output(out_dir):
+    """Hapus hasil job sebelumnya (part, manifest, file kerja) tanpa menyentuh file lain di direktori."""
+    for path in out_dir.glob("part-*"):
+        path.unlink()
+    shutil.rmtree(out_dir / WORK_DIR_NAME, ignore_errors=True)
+    (out_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+def run_scoring(out_dir, start=None, end=None, source=None, workers=None, batch_size=SCORE_BATCH_SIZE,
+                part_windows=SCORE_PART_WINDOWS, output_format="parquet", backend=INFERENCE_BACKEND, fresh=False):
+    """
+    Scoring semua menit dalam [start, end] ke out_dir/part-*.parquet (atau .csv).
+    Memanggil ulang dengan argumen yang sama melanjutkan part yang belum selesai.
+    """
+    if output_format not in FORMATS:
+        raise ValueError(f"Format '{output_format}' tidak dikenal. Pilihan: {', '.join(FORMATS)}")
+    if output_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("Output Parquet butuh pyarrow (pip install pyarrow), atau pakai --format csv.")
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    out_dir = Path(out_dir)
+    work_dir = out_dir / WORK_DIR_NAME
+    manifest_path = out_dir / MANIFEST_NAME
+    features_path, minutes_path = work_dir / "features.f32", work_dir / "minutes.npy"
+
+    store = open_source(source).ensure()
+    with open(store.meta_path) as f:
+        source_meta = json.load(f)
+
+    # Versi aktif; worker memuat versi yang sama walau CURRENT berganti di tengah job.
+    # Koordinator hanya butuh scaler (tanpa model/TensorFlow), model dimuat di worker.
+    resolved_version, paths = resolve_artifacts()
+    scaler = joblib.load(paths["scaler"])
+    version = None if resolved_version == "legacy" else resolved_version
+    key = {
+        "source": source_meta["source"], "start": start, "end": end, "version": resolved_version,
+        "time_steps": TIME_STEPS, "part_windows": part_windows, "format": output_format
+    }
+
+    if fresh:
+        _clear_output(out_dir)
+    manifest = _load_manifest(manifest_path)
+    if manifest is not None and manifest["key"] != key:
+        raise ValueError(f"{manifest_path} milik job lain ({manifest['key']}). Pakai --fresh untuk mulai ulang.")
+
+    def prepare_features():
+        logger.info(f"[SCORE] Menghitung fitur {start or 'awal'} s/d {end or 'akhir'} ...")
+        work_dir.mkdir(parents=True, exist_ok=True)
+        return build_features(store, start, end, scaler, features_path, minutes_path)
+
+    if manifest is None:
+        n_rows, first_window = prepare_features()
+        manifest = {
+            "key": key, "feature_rows": n_rows, "first_window": first_window,
+            "windows": count_windows(n_rows, TIME_STEPS) - first_window, "parts": {}, "completed": False
+        }
+        _save_manifest(manifest, manifest_path)
+
+    first, total = manifest["first_window"], manifest["first_window"] + manifest["windows"]
+    suffix = FORMATS[output_format]
+    tasks = [
+        {
+            "part": part, "windows": (w0, min(w0 + part_windows, total)),
+            "path": str(out_dir / f"part-{part:05d}{suffix}"), "features_path": str(features_path),
+            "minutes_path": str(minutes_path), "batch_size": batch_size
+        }
+        for part, w0 in enumerate(range(first, total, part_windows))
+    ]
+    pending = [task for task in tasks if str(task["part"]) not in manifest["parts"] or not os.path.exists(task["path"])]
+    if len(pending) < len(tasks):
+        logger.info(f"[SCORE] Melanjutkan job: {len(tasks) - len(pending)}/{len(tasks)} part sudah selesai.")
+    # File fitur dihapus saat job selesai; dihitung ulang (deterministik) jika masih ada part yang kurang
+    if pending and not (features_path.exists() and minutes_path.exists()):
+        prepare_features()
+
+    scored = 0
+    scoring_started = time.perf_counter()
+
+    def complete(part, rows):
+        nonlocal scored
+        scored += rows
+        manifest["parts"][str(part)] = rows
+        _save_manifest(manifest, manifest_path)
+        elapsed = time.perf_counter() - scoring_started
+        logger.info(f"[SCORE] Part {part} selesai ({len(manifest['parts'])}/{len(tasks)})", extra={"fields": {
+            "windows": rows, "windows_per_second": round(scored / elapsed, 1)
+        }})
+
+    if workers <= 1 or len(pending) <= 1:
+        _init_worker(backend, version)
+        for task in pending:
+            complete(*score_part(task))
+    else:
+        _limit_worker_threads(workers)
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)), mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker, initargs=(backend, version)
+        ) as pool:
+            for future in as_completed([pool.submit(score_part, task) for task in pending]):
+                complete(*future.result())
+
+    manifest["completed"] = True
+    _save_manifest(manifest, manifest_path)
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+    seconds = time.perf_counter() - started
+    summary = {
+        "out_dir": str(out_dir), "version": resolved_version, "windows": manifest["windows"], "parts": len(tasks),
+        "scored_now": scored, "workers": workers, "seconds": round(seconds, 2),
+        "windows_per_second": round(scored / max(time.perf_counter() - scoring_started, 1e-9), 1)
+    }
+    logger.info("[SCORE] Selesai", extra={"fields": summary})
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk scoring offline risk score per menit (backfill) ke Parquet/CSV.")
+    parser.add_argument("--start", help="Awal rentang, mis. 2020-04-01 (default: awal data).")
+    parser.add_argument("--end", help="Akhir rentang (inklusif), mis. 2020-08-31 (default: akhir data).")
+    parser.add_argument("--source", default=RAW_CSV_PATH, help="CSV atau Parquet mentah (default: dataset MetroPT-3).")
+    parser.add_argument("--out", help="Direktori output (default: SCORE_OUTPUT_DIR/<start>_<end>).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Jumlah proses scoring.")
+    parser.add_argument("--batch-size", type=int, default=SCORE_BATCH_SIZE, help="Window per pemanggilan model.")
+    parser.add_argument("--part-windows", type=int, default=SCORE_PART_WINDOWS, help="Window per file part/checkpoint.")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--backend", default=INFERENCE_BACKEND, help="keras, tflite, onnx atau numpy.")
+    parser.add_argument("--fresh", action="store_true", help="Abaikan checkpoint dan mulai ulang.")
+    args = parser.parse_args()
+
+    out_dir = args.out or SCORE_OUTPUT_DIR / f"{args.start or 'awal'}_{args.end or 'akhir'}"
+    print(json.dumps(run_scoring(
+        out_dir, args.start, args.end, args.source, args.workers, args.batch_size,
+        args.part_windows, args.format, args.backend, args.fresh
+    ), indent=2))
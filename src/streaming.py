@@ -0,0 +1,198 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from src.utils.config import RAW_SENSOR_COLS, FEATURE_COLS, TIME_STEPS, SESSION_TTL_SECONDS, SESSION_MAX_UNITS
+from src.data.preprocessing import IDX_TP2, IDX_TP3, IDX_OIL, IDX_MOTOR, ROLL_WINDOW
+
+class SensorSession:
+    """
+    State streaming satu kompresor: bar 1 menit yang sedang terbuka dan ring buffer
+    TIME_STEPS bar terakhir beserta fitur turunannya (setara process_input_data).
+    """
+
+    def __init__(self, unit_id):
+        self.unit_id = unit_id
+        self.lock = threading.Lock()
+
+        # Ring buffer fitur per menit, head = posisi tulis berikutnya
+        self.window = np.zeros((TIME_STEPS, len(FEATURE_COLS)))
+        self.window_minutes = np.zeros(TIME_STEPS, dtype='datetime64[m]')
+        self.head = 0
+        self.filled = 0
+
+        # Bar yang masih terbuka (menit berjalan)
+        self.open_minute = None
+        # Jumlah dan banyaknya nilai non-NaN per kolom (NaN diabaikan per kolom, seperti /predict)
+        self.open_sum = np.zeros(len(RAW_SENSOR_COLS))
+        self.open_count = np.zeros(len(RAW_SENSOR_COLS), dtype=np.int64)
+
+        self.prev_bar = None
+        self.tp3_history = deque(maxlen=ROLL_WINDOW)
+
+        self.bars_closed = 0
+        self.last_scored_bar = 0
+        self.dropped_readings = 0
+        self.last_result = None
+        self.last_seen = time.monotonic()
+
+    def push(self, timestamps, values):
+        """Tambah pembacaan baru. timestamps: datetime64 (n,), values: (n, RAW_SENSOR_COLS)."""
+        self.last_seen = time.monotonic()
+        minutes = np.asarray(timestamps).astype('datetime64[m]')
+        values = np.asarray(values, dtype=float)
+        if len(minutes) == 0:
+            return 0
+
+        order = np.argsort(minutes, kind='stable')
+        minutes, values = minutes[order], values[order]
+
+        # Data terlambat (menit yang sudah ditutup) tidak bisa dimasukkan lagi
+        if self.open_minute is not None:
+            late = minutes < self.open_minute
+            if late.any():
+                self.dropped_readings += int(late.sum())
+                minutes, values = minutes[~late], values[~late]
+                if len(minutes) == 0:
+                    return 0
+
+        closed_before = self.bars_closed
+        group_minutes, starts = np.unique(minutes, return_index=True)
+        present = ~np.isnan(values)
+        group_sums = np.add.reduceat(np.where(present, values, 0.0), starts, axis=0)
+        group_counts = np.add.reduceat(present, starts, axis=0)
+
+        for minute, group_sum, group_count in zip(group_minutes, group_sums, group_counts):
+            if self.open_minute is not None and minute > self.open_minute:
+                self._close_bar()
+            if self.open_minute is None or minute > self.open_minute:
+                self.open_minute = minute
+                self.open_sum = np.zeros(len(RAW_SENSOR_COLS))
+                self.open_count = np.zeros(len(RAW_SENSOR_COLS), dtype=np.int64)
+            self.open_sum += group_sum
+            self.open_count += group_count
+
+        return self.bars_closed - closed_before
+
+    def _close_bar(self):
+        if (self.open_count == 0).any():
+            # Sama seperti _bucket_means / resample().mean().dropna(): rata-rata per kolom mengabaikan NaN,
+            # bar dibuang hanya jika ada kolom tanpa nilai sama sekali di menit itu
+            return
+        bar = self.open_sum / self.open_count
+
+        tp2_grad = bar[IDX_TP2] - self.prev_bar[IDX_TP2] if self.prev_bar is not None else 0.0
+        oil_grad = bar[IDX_OIL] - self.prev_bar[IDX_OIL] if self.prev_bar is not None else 0.0
+        efficiency = bar[IDX_TP3] / (bar[IDX_MOTOR] + 0.1)
+
+        self.tp3_history.append(bar[IDX_TP3])
+        roll_std = np.std(self.tp3_history, ddof=1) if len(self.tp3_history) == ROLL_WINDOW else 0.0
+
+        self.window[self.head] = np.concatenate([bar, [tp2_grad, oil_grad, efficiency, roll_std]])
+        self.window_minutes[self.head] = self.open_minute
+        self.head = (self.head + 1) % TIME_STEPS
+        self.filled = min(self.filled + 1, TIME_STEPS)
+
+        self.prev_bar = bar
+        self.bars_closed += 1
+
+    def ordered_window(self):
+        """Isi ring buffer berurutan dari bar terlama ke terbaru."""
+        if self.filled < TIME_STEPS:
+            return self.window[:self.filled], self.window_minutes[:self.filled]
+        return np.roll(self.window, -self.head, axis=0), np.roll(self.window_minutes, -self.head)
+
+    def update(self, timestamps, values, detector, on_scored=None):
+        """
+        Push pembacaan lalu scoring ulang hanya jika window sudah bergeser.
+        on_scored(unit_id, menit_terakhir, report, mae, bundle) dipanggil setiap kali window di-scoring.
+        """
+        with self.lock:
+            new_bars = self.push(timestamps, values)
+            scored = False
+
+            if self.filled == TIME_STEPS and self.bars_closed > self.last_scored_bar:
+                window, minutes = self.ordered_window()
+                self.last_result, mae, bundle = detector.score_window(window)
+                self.last_scored_bar = self.bars_closed
+                scored = True
+                if on_scored is not None:
+                    on_scored(self.unit_id, minutes[-1], self.last_result, mae, bundle)
+
+            return {
+                "unit_id": self.unit_id,
+                "new_bars": new_bars,
+                "window_fill": self.filled,
+                "scored": scored,
+                "result": self.last_result
+            }
+
+    def describe(self, include_window=True):
+        """State buffer untuk debugging."""
+        with self.lock:
+            state = {
+                "unit_id": self.unit_id,
+                "window_fill": self.filled,
+                "bars_closed": self.bars_closed,
+                "last_scored_bar": self.last_scored_bar,
+                "dropped_readings": self.dropped_readings,
+                "idle_seconds": round(time.monotonic() - self.last_seen, 3),
+                "open_minute": str(self.open_minute) if self.open_minute is not None else None,
+                "open_count": self.open_count.tolist(),
+                "last_result": self.last_result
+            }
+            if include_window:
+                window, minutes = self.ordered_window()
+                state["window"] = [
+                    {"minute": str(minute), **dict(zip(FEATURE_COLS, row.tolist()))}
+                    for minute, row in zip(minutes, window)
+                ]
+            return state
+
+class SessionStore:
+    """Kumpulan session per unit dengan eviksi TTL (idle) dan LRU (jumlah maksimum)."""
+
+    def __init__(self, max_sessions=SESSION_MAX_UNITS, ttl_seconds=SESSION_TTL_SECONDS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, unit_id, create=True):
+        with self._lock:
+            self._evict_expired()
+            session = self._sessions.get(unit_id)
+
+            if session is None and create:
+                session = SensorSession(unit_id)
+                self._sessions[unit_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+
+            if session is not None:
+                self._sessions.move_to_end(unit_id)
+            return session
+
+    def remove(self, unit_id):
+        with self._lock:
+            return self._sessions.pop(unit_id, None) is not None
+
+    def _evict_expired(self):
+        now = time.monotonic()
+        # OrderedDict terurut dari yang paling lama tidak diakses
+        while self._sessions:
+            unit_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen < self.ttl_seconds:
+                break
+            self._sessions.popitem(last=False)
+
+    def summary(self):
+        with self._lock:
+            self._evict_expired()
+            sessions = list(self._sessions.values())
+        return [session.describe(include_window=False) for session in sessions]
+
+# Inisialisasi Singleton
+sessions = SessionStore()
@@ -0,0 +1,185 @@
+import math
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.utils.config import (
+    TREND_HALF_LIFE_MINUTES, TREND_MIN_POINTS, TREND_DEGRADATION_SLOPE, TREND_MAX_UNITS
+)
+from src.data.history import to_epoch_ms, MINUTE_MS
+
+# Tren degradasi dan RUL (waktu sampai CRITICAL) per unit dari deret risk score.
+# Regresi linear berbobot eksponensial atas waktu nyata: bobot skor berumur a menit = 0.5 ** (a / half_life).
+# State hanya 6 jumlahan (S0, Sx, Sy, Sxx, Sxy, Syy) dengan titik nol sumbu x di skor terbaru,
+# sehingga update O(1) per skor dan angka tetap kecil walau deret berjalan berbulan-bulan.
+
+class TrendState:
+    __slots__ = ("half_life", "t_last", "last_score", "n", "s0", "sx", "sy", "sxx", "sxy", "syy", "version")
+
+    def __init__(self, half_life_minutes=TREND_HALF_LIFE_MINUTES, version=None):
+        self.half_life = half_life_minutes
+        self.version = version
+        self.t_last = None
+        self.last_score = None
+        self.n = 0
+        self.s0 = self.sx = self.sy = self.sxx = self.sxy = self.syy = 0.0
+
+    def update(self, t_ms, score):
+        """Tambah satu skor (epoch ms). Skor terlambat masuk di x negatif dengan bobot sesuai umurnya."""
+        if self.t_last is None:
+            self.t_last = t_ms
+        dt = (t_ms - self.t_last) / MINUTE_MS
+        rate = math.log(2) / self.half_life
+
+        if dt > 0:
+            # Geser titik nol ke skor baru (x_lama - dt) lalu luruhkan semua bobot lama
+            decay = math.exp(-rate * dt)
+            s0, sx, sy = self.s0, self.sx, self.sy
+            self.sxx = decay * (self.sxx - 2 * dt * sx + dt * dt * s0)
+            self.sxy = decay * (self.sxy - dt * sy)
+            self.sx = decay * (sx - dt * s0)
+            self.s0 = decay * s0
+            self.sy = decay * sy
+            self.syy = decay * self.syy
+            self.t_last = t_ms
+        if dt >= 0:
+            x, weight = 0.0, 1.0
+            self.last_score = score
+        else:
+            x, weight = dt, math.exp(rate * dt)
+
+        self.n += 1
+        self.s0 += weight
+        self.sx += weight * x
+        self.sy += weight * score
+        self.sxx += weight * x * x
+        self.sxy += weight * x * score
+        self.syy += weight * score * score
+
+    def fit(self):
+        """(level tren saat skor terakhir, slope per menit, r2). Slope 0 jika semua skor di menit yang sama."""
+        if self.s0 <= 0:
+            return None, 0.0, 0.0
+        spread = self.s0 * self.sxx - self.sx * self.sx
+        if spread <= 1e-12 * max(self.s0 * self.sxx, 1e-300):
+            return self.sy / self.s0, 0.0, 0.0
+
+        covariance = self.s0 * self.sxy - self.sx * self.sy
+        slope = covariance / spread
+        level = (self.sy - slope * self.sx) / self.s0
+        variance = self.s0 * self.syy - self.sy * self.sy
+        r2 = covariance * covariance / (spread * variance) if variance > 0 else 0.0
+        return level, slope, min(r2, 1.0)
+
+    def assess(self, thresh_critical, thresh_warning, min_points=TREND_MIN_POINTS,
+               degradation_slope=TREND_DEGRADATION_SLOPE):
+        """Status + estimasi menit sampai CRITICAL (ekstrapolasi garis tren dari level saat ini)."""
+        level, slope, r2 = self.fit()
+        latest = self.last_score
+        if latest >= thresh_critical:
+            status = "critical"
+        elif latest >= thresh_warning:
+            status = "warning"
+        elif slope > degradation_slope:
+            status = "degrading"
+        else:
+            status = "stable"
+
+        # Zona WARNING: tren naik sekecil apa pun dihitung; zona aman: hanya di atas degradation_slope
+        minutes = None
+        if status in ("warning", "degrading") and slope > 0 and self.n >= min_points:
+            minutes = max(0.0, (thresh_critical - level) / slope)
+        if status == "critical":
+            minutes = 0.0
+
+        as_of = pd.Timestamp(self.t_last, unit="ms")
+        return {
+            "as_of": as_of.isoformat(),
+            "risk_score": latest,
+            "trend_level": level,
+            "slope_per_minute": slope,
+            "r2": r2,
+            "points": self.n,
+            "effective_points": self.s0,
+            "half_life_minutes": self.half_life,
+            "status": status,
+            "minutes_to_critical": minutes,
+            "critical_eta": (as_of + pd.Timedelta(minutes=minutes)).isoformat() if minutes is not None else None,
+            "threshold_critical": thresh_critical,
+            "threshold_warning": thresh_warning,
+            "version": self.version
+        }
+
+def trend_from_series(timestamps, risk_scores, half_life_minutes=TREND_HALF_LIFE_MINUTES, version=None):
+    """
+    TrendState dari deret lengkap sekaligus (mis. /predict/timeline atau riwayat tersimpan).
+    Jumlahan dihitung langsung dengan NumPy; hasilnya sama dengan update() satu per satu.
+    """
+    state = TrendState(half_life_minutes, version)
+    t_ms = pd.DatetimeIndex(timestamps).as_unit("ms").asi8
+    scores = np.asarray(risk_scores, dtype=float)
+    if not len(scores):
+        return state
+
+    # Skor terakhir = kemunculan terakhir dari timestamp terbesar (seperti urutan update)
+    last = len(t_ms) - 1 - int(np.argmax(t_ms[::-1]))
+    state.t_last, state.last_score, state.n = int(t_ms[last]), float(scores[last]), len(scores)
+    x = (t_ms - state.t_last) / MINUTE_MS
+    weights = np.exp(math.log(2) / half_life_minutes * x)
+    wx, wy = weights * x, weights * scores
+    state.s0, state.sx, state.sy = float(weights.sum()), float(wx.sum()), float(wy.sum())
+    state.sxx, state.sxy, state.syy = float(wx @ x), float(wx @ scores), float(wy @ scores)
+    return state
+
+class TrendTracker:
+    """TrendState per unit, diperbarui setiap kali window di-scoring (LRU, maks max_units unit)."""
+
+    def __init__(self, half_life_minutes=TREND_HALF_LIFE_MINUTES, max_units=TREND_MAX_UNITS):
+        self.half_life = half_life_minutes
+        self.max_units = max_units
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, unit_id, timestamp, risk_score, version=None):
+        t_ms = to_epoch_ms(timestamp)
+        with self._lock:
+            state = self._states.get(unit_id)
+            # Skala risk score bisa berbeda antar versi model: tren dimulai ulang saat versi berganti
+            if state is None or state.version != version:
+                state = self._states[unit_id] = TrendState(self.half_life, version)
+                while len(self._states) > self.max_units:
+                    self._states.popitem(last=False)
+            self._states.move_to_end(unit_id)
+            state.update(t_ms, float(risk_score))
+
+    def seed(self, unit_id, timestamps, risk_scores, version=None):
+        """Isi tren unit dari riwayat (mis. setelah restart), hanya jika unit belum dilacak."""
+        if not len(risk_scores):
+            return False
+        state = trend_from_series(timestamps, risk_scores, self.half_life, version)
+        with self._lock:
+            if unit_id in self._states:
+                return False
+            self._states[unit_id] = state
+            while len(self._states) > self.max_units:
+                self._states.popitem(last=False)
+        return True
+
+    def report(self, unit_id, thresh_critical, thresh_warning):
+        with self._lock:
+            state = self._states.get(unit_id)
+            if state is None:
+                return None
+            return {"unit_id": unit_id, **state.assess(thresh_critical, thresh_warning)}
+
+    def units(self, thresh_critical, thresh_warning):
+        """Semua unit, yang paling cepat mencapai CRITICAL lebih dulu."""
+        with self._lock:
+            reports = [{"unit_id": unit_id, **state.assess(thresh_critical, thresh_warning)}
+                       for unit_id, state in self._states.items()]
+        return sorted(reports, key=lambda r: (r["minutes_to_critical"] is None, r["minutes_to_critical"] or 0.0))
+
+# Inisialisasi Singleton
+trend_tracker = TrendTracker()
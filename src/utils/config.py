@@ -6,8 +6,10 @@ UTILS_DIR = CURRENT_FILE.parent
 SRC_DIR = UTILS_DIR.parent          
 ROOT_DIR = SRC_DIR.parent           
 
-MODELS_DIR = SRC_DIR / "models_store"
+MODELS_DIR = Path(os.getenv("MODELS_DIR", SRC_DIR / "models_store"))
 DATA_RAW_DIR = ROOT_DIR / "data" / "raw"
+# Cache kolumnar dari CSV mentah (lihat src/data/store.py)
+DATA_CACHE_DIR = Path(os.getenv("DATA_CACHE_DIR", ROOT_DIR / "data" / "cache"))
 
 # Gunakan .as_posix() karena /a pada naming projek saya
 MODEL_PATH = (MODELS_DIR / "metropt_lstm_model.h5").as_posix()
@@ -15,8 +17,94 @@ SCALER_PATH = (MODELS_DIR / "metropt_scaler.pkl").as_posix()
 CONFIG_PATH = (MODELS_DIR / "metropt_config.pkl").as_posix()
 MLFLOW_DB_PATH = (MODELS_DIR / "mlflow.db").as_posix() 
 
+# Artefak inference ringan hasil ekspor (lihat src/models/backends.py)
+TFLITE_MODEL_PATH = (MODELS_DIR / "metropt_lstm_model.tflite").as_posix()
+ONNX_MODEL_PATH = (MODELS_DIR / "metropt_lstm_model.onnx").as_posix()
+NUMPY_WEIGHTS_PATH = (MODELS_DIR / "metropt_lstm_weights.npz").as_posix()
+
+# Artefak berversi: models_store/versions/<versi>/ + pointer CURRENT (lihat src/models/registry.py)
+VERSIONS_DIR = MODELS_DIR / "versions"
+CURRENT_POINTER_PATH = MODELS_DIR / "CURRENT"
+
 # Path ke dataset CSV
-RAW_CSV_PATH = (DATA_RAW_DIR / "MetroPT3(AirCompressor).csv").as_posix()
+RAW_CSV_PATH = os.getenv("RAW_CSV_PATH", (DATA_RAW_DIR / "MetroPT3(AirCompressor).csv").as_posix())
+
+# Jumlah baris CSV per chunk saat membangun cache
+INGEST_CHUNK_ROWS = 200_000
+
+# Kalibrasi threshold (src/models/calibration.py): jumlah bin mode histogram, ukuran chunk baca score
+CALIBRATION_HIST_BINS = 4096
+CALIBRATION_CHUNK_SIZE = 1_000_000
+
+# Drift monitor (src/monitoring/drift.py): bin histogram per fitur di ruang ter-scale [0, 1]
+DRIFT_BINS = 20
+DRIFT_MIN_OBSERVATIONS = 30
+DRIFT_CHUNK_SIZE = 100_000
+# Baris /predict yang ditampung sebelum histogram diperbarui sekaligus
+DRIFT_FLUSH_ROWS = 256
+
+# Logging & instrumentasi (src/utils/logger.py)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # json atau text
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Profiling per request lewat header X-Profile: 1 (hanya jika diaktifkan)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "/tmp/metropt-profiles"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+
+# Riwayat skor per unit (src/data/history.py): SQLite WAL, ditulis per batch oleh thread background
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "1") == "1"
+HISTORY_DB_PATH = Path(os.getenv("HISTORY_DB_PATH", ROOT_DIR / "data" / "history" / "history.db"))
+HISTORY_FLUSH_ROWS = 500
+HISTORY_FLUSH_SECONDS = 1.0
+HISTORY_QUEUE_SIZE = 100_000
+HISTORY_DEFAULT_UNIT = "default"
+HISTORY_TOP_K = 3
+# Batas jumlah titik per query /history (resolusi dipilih otomatis agar tidak terlampaui)
+HISTORY_MAX_POINTS = 5_000
+
+# Tren degradasi / RUL per unit (src/trend.py): regresi linear berbobot eksponensial atas waktu nyata
+TREND_HALF_LIFE_MINUTES = float(os.getenv("TREND_HALF_LIFE_MINUTES", "60"))
+# Minimal jumlah skor sebelum estimasi menit sampai CRITICAL diberikan
+TREND_MIN_POINTS = 10
+# Kenaikan risk score per menit yang dianggap tren degradasi (di zona aman)
+TREND_DEGRADATION_SLOPE = 0.001
+TREND_MAX_UNITS = 10_000
+
+# Prefilter sebelum LSTM (src/models/prefilter.py): window yang jelas normal langsung AMAN tanpa forward pass
+PREFILTER_ENABLED = os.getenv("PREFILTER_ENABLED", "0") == "1"
+PREFILTER_COMPONENTS = 4
+# Batas per fitur = kuantil data training (ruang ter-scale) +- margin
+PREFILTER_BOUND_QUANTILE = 0.001
+PREFILTER_BOUND_MARGIN = 0.02
+# Kalibrasi: recall CRITICAL pada FAILURE_PERIODS yang boleh hilang, dan porsi window lolos yang menurut LSTM >= WARNING
+PREFILTER_MAX_RECALL_LOSS = 0.005
+PREFILTER_MAX_FLIP_RATE = 0.01
+
+# Alerting per unit (src/alerting.py): hysteresis atas risk score, event hanya saat status berubah
+ALERT_ENABLED = os.getenv("ALERT_ENABLED", "1") == "1"
+# Naik ke WARNING/CRITICAL jika minimal N dari M window terakhir berada di level itu
+ALERT_RAISE_N = int(os.getenv("ALERT_RAISE_N", "3"))
+ALERT_RAISE_M = int(os.getenv("ALERT_RAISE_M", "5"))
+# Turun hanya setelah sekian window berturut-turut di bawah threshold level aktif x ALERT_CLEAR_RATIO
+ALERT_CLEAR_WINDOWS = int(os.getenv("ALERT_CLEAR_WINDOWS", "5"))
+ALERT_CLEAR_RATIO = float(os.getenv("ALERT_CLEAR_RATIO", "0.9"))
+# Jeda minimal (waktu window) setelah perubahan status sebelum turun atau naik lagi ke WARNING;
+# naik ke CRITICAL tidak pernah ditahan
+ALERT_COOLDOWN_MINUTES = float(os.getenv("ALERT_COOLDOWN_MINUTES", "10"))
+ALERT_QUEUE_SIZE = 100_000
+ALERT_MAX_UNITS = 10_000
+# Event terakhir yang disimpan untuk GET /alerts/events dan resume SSE (Last-Event-ID)
+ALERT_EVENT_BUFFER = 1_000
+# Antrian per subscriber SSE/WebSocket; subscriber yang lambat kehilangan event terlama
+ALERT_SUBSCRIBER_QUEUE = 1_000
+# Komentar keep-alive SSE agar proxy tidak menutup koneksi yang sepi
+ALERT_SSE_KEEPALIVE_SECONDS = 15.0
+# Webhook: event dikirim per batch (POST JSON list), kosong = nonaktif
+ALERT_WEBHOOK_URL = os.getenv("ALERT_WEBHOOK_URL", "")
+ALERT_WEBHOOK_TIMEOUT_SECONDS = 5.0
+ALERT_WEBHOOK_BATCH = 100
+ALERT_WEBHOOK_RETRIES = 3
 
 # Konfigurasi kolom
 FEATURE_COLS = [
@@ -30,4 +118,60 @@ RAW_SENSOR_COLS = [
     'Oil_temperature', 'Motor_current'
 ]
 
-TIME_STEPS = 30
\ No newline at end of file
+TIME_STEPS = 30
+
+# Jumlah window per pemanggilan model.predict saat scoring timeline
+TIMELINE_BATCH_SIZE = 256
+
+# Session streaming per unit kompresor
+SESSION_TTL_SECONDS = 15 * 60
+SESSION_MAX_UNITS = 1000
+
+# Micro-batching request /predict (window dari request bersamaan digabung jadi satu forward pass)
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "64"))
+BATCH_MAX_WAIT_MS = float(os.getenv("BATCH_MAX_WAIT_MS", "2"))
+
+# /predict/fleet: jumlah window per pemanggilan model (semua unit di-stack lalu dipecah per ukuran ini)
+FLEET_BATCH_SIZE = int(os.getenv("FLEET_BATCH_SIZE", "1024"))
+# Batas jumlah unit per request /predict/fleet
+FLEET_MAX_UNITS = int(os.getenv("FLEET_MAX_UNITS", "5000"))
+
+# Cache rekonstruksi per window ter-scale (kunci: hash window + versi model), dibatasi total byte
+WINDOW_CACHE_ENABLED = os.getenv("WINDOW_CACHE_ENABLED", "1") == "1"
+WINDOW_CACHE_MAX_BYTES = int(float(os.getenv("WINDOW_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+# Bulk scoring offline (src/score.py): window per pemanggilan model, window per file part (= satu checkpoint)
+SCORE_OUTPUT_DIR = Path(os.getenv("SCORE_OUTPUT_DIR", ROOT_DIR / "data" / "scores"))
+SCORE_BATCH_SIZE = int(os.getenv("SCORE_BATCH_SIZE", "1024"))
+SCORE_PART_WINDOWS = 14 * 24 * 60
+# Data sebelum --start yang ikut dibaca agar window menit-menit pertama tetap penuh
+SCORE_LOOKBACK_MINUTES = 24 * 60
+
+# Backend inference: keras, tflite, onnx, numpy
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras")
+# TFLite LSTM hanya bisa diekspor dengan ukuran batch tetap
+TFLITE_BATCH_SIZE = 8
+# NumpyBackend: bobot di-memory-map dari file bersama (satu salinan di RAM untuk semua worker serving)
+NUMPY_WEIGHTS_MMAP = os.getenv("NUMPY_WEIGHTS_MMAP", "1") == "1"
+
+# Varian presisi model TFLite: float32 (hasil training), float16 (bobot half precision),
+# int8 (kuantisasi dynamic-range: bobot int8, aktivasi float)
+MODEL_VARIANTS = ("float32", "float16", "int8")
+# Varian tambahan yang diekspor + dievaluasi saat training (dipisah koma, kosong = tidak ada)
+EXPORT_VARIANTS = [v for v in os.getenv("EXPORT_VARIANTS", "").split(",") if v]
+# Varian yang dilayani detector; selain float32 butuh INFERENCE_BACKEND=tflite
+MODEL_VARIANT = os.getenv("MODEL_VARIANT", "float32")
+# Window sampel untuk mengukur latency per window tiap varian
+VARIANT_LATENCY_WINDOWS = 1024
+
+# Serving multi-proses (python -m api.serve): jumlah worker uvicorn, 0 = jumlah core
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", "1"))
+
+# Interval cek pointer CURRENT untuk hot-swap model (detik)
+ARTIFACT_POLL_SECONDS = float(os.getenv("ARTIFACT_POLL_SECONDS", "5"))
+# Prioritas proses training agar tidak mengganggu latency inference
+TRAINING_NICE = 10
+# Lock file agar hanya satu training berjalan walau API dilayani beberapa worker
+TRAINING_LOCK_PATH = MODELS_DIR / "training.lock"
@@ -1,5 +1,6 @@
+from functools import lru_cache
+
 import numpy as np
-import pandas as pd
 
 # Knowledge Base Diagnosa
 DIAGNOSIS_MAP = {
@@ -30,57 +31,116 @@ DIAGNOSIS_MAP = {
     }
 }
 
+DIRECTIONS = np.array(["TINGGI", "RENDAH", "NORMAL"])
+STATUS_LABELS = np.array(["🟢 AMAN (NORMAL)", "🟡 WARNING (PERINGATAN)", "🔴 BAHAYA (CRITICAL)"])
+DEFAULT_EXPLANATION = "Anomali pola sensor."
+NORMAL_TEXT = "Sistem Beroperasi Normal."
+
 def analyze_direction(actual, predicted, threshold=0.05):
     diff = actual - predicted
     if diff > threshold: return "TINGGI"
     elif diff < -threshold: return "RENDAH"
     else: return "NORMAL"
 
-def generate_report(input_seq, reconstruction, feature_names, threshold_critical, threshold_warning):
+def direction_codes(diff, threshold=0.05):
+    """Versi array dari analyze_direction: indeks ke DIRECTIONS."""
+    return np.select([diff > threshold, diff < -threshold], [0, 1], default=2)
+
+@lru_cache(maxsize=8)
+def explanation_table(feature_names):
+    """Tabel (F, 3) penjelasan DIAGNOSIS_MAP per fitur dan arah, untuk lookup berbasis indeks."""
+    return np.array([
+        [DIAGNOSIS_MAP.get(name, {}).get(direction, DEFAULT_EXPLANATION) for direction in DIRECTIONS]
+        for name in feature_names
+    ], dtype=object)
+
+def classify_severity(risk_scores, threshold_critical, threshold_warning):
+    """Severity per risk score: 2 = Critical, 1 = Warning, 0 = Aman."""
+    risk_scores = np.asarray(risk_scores)
+    return np.select(
+        [risk_scores > threshold_critical, risk_scores > threshold_warning], [2, 1], default=0
+    )
+
+def generate_report_batch(input_seq, reconstruction, feature_names, threshold_critical, threshold_warning,
+                          top_k=3, as_columns=False):
+    """
+    Diagnosa untuk batch window (N, T, F) sekaligus, hanya dengan operasi NumPy.
+    as_columns=True mengembalikan dict berisi array per kolom, selain itu list dict per window.
+    """
+    input_seq = np.asarray(input_seq)
+    reconstruction = np.asarray(reconstruction)
+    feature_names = tuple(feature_names)
+
     # 1. Hitung Error
-    mae_per_feature = np.mean(np.abs(reconstruction - input_seq), axis=1)[0]
-    risk_score = np.mean(mae_per_feature)
-    
+    mae_per_feature = np.mean(np.abs(reconstruction - input_seq), axis=1)
+    risk_scores = np.mean(mae_per_feature, axis=1)
+
     # 2. Tentukan Status
-    if risk_score > threshold_critical:
-        status = "🔴 BAHAYA (CRITICAL)"
-        severity = 2
-    elif risk_score > threshold_warning:
-        status = "🟡 WARNING (PERINGATAN)"
-        severity = 1
-    else:
-        status = "🟢 AMAN (NORMAL)"
-        severity = 0
-
-    # 3. Analisis Penyebab (Hanya jika Warning/Bahaya)
-    analysis = []
-    top_features = []
-    
-    if severity > 0:
-        avg_actual = np.mean(input_seq, axis=1)[0]
-        avg_pred = np.mean(reconstruction, axis=1)[0]
-        
-        # Urutkan error terbesar
-        contribution = pd.DataFrame({'Feature': feature_names, 'Error': mae_per_feature})
-        contribution = contribution.sort_values(by='Error', ascending=False)
-        
-        # Ambil Top 2
-        top_1 = contribution.iloc[0]['Feature']
-        idx_1 = feature_names.index(top_1)
-        
-        direction = analyze_direction(avg_actual[idx_1], avg_pred[idx_1])
-        explanation = DIAGNOSIS_MAP.get(top_1, {}).get(direction, "Anomali pola sensor.")
-        
-        analysis.append(f"Penyebab Utama: {top_1} ({direction})")
-        analysis.append(f"Analisis: {explanation}")
-        
-        # Simpan detail untuk JSON response
-        top_features = contribution.head(3).to_dict(orient='records')
+    severity = classify_severity(risk_scores, threshold_critical, threshold_warning)
 
+    # 3. Kontributor terbesar: argpartition lalu urutkan k teratas saja
+    k = min(top_k, mae_per_feature.shape[1])
+    top_idx = np.argpartition(-mae_per_feature, k - 1, axis=1)[:, :k]
+    top_err = np.take_along_axis(mae_per_feature, top_idx, axis=1)
+    order = np.argsort(-top_err, axis=1, kind='stable')
+    top_idx = np.take_along_axis(top_idx, order, axis=1)
+    top_err = np.take_along_axis(top_err, order, axis=1)
+
+    # 4. Arah penyimpangan fitur utama (aktual vs rekonstruksi)
+    rows = np.arange(len(input_seq))
+    main_idx = top_idx[:, 0]
+    main_diff = np.mean(input_seq[rows, :, main_idx] - reconstruction[rows, :, main_idx], axis=1)
+    direction = direction_codes(main_diff)
+    explanation = explanation_table(feature_names)[main_idx, direction]
+
+    names = np.array(feature_names, dtype=object)
+    if as_columns:
+        return {
+            "status": STATUS_LABELS[severity],
+            "risk_score": risk_scores,
+            "severity_level": severity,
+            "mae_per_feature": mae_per_feature,
+            "top_features": names[top_idx],
+            "top_errors": top_err,
+            "direction": DIRECTIONS[direction],
+            "explanation": explanation
+        }
+
+    reports = []
+    for i in range(len(input_seq)):
+        if severity[i] > 0:
+            main_feature = names[main_idx[i]]
+            analysis_text = f"Penyebab Utama: {main_feature} ({DIRECTIONS[direction[i]]})\nAnalisis: {explanation[i]}"
+            top_features = [
+                {"Feature": names[j], "Error": float(err)} for j, err in zip(top_idx[i], top_err[i])
+            ]
+        else:
+            analysis_text = NORMAL_TEXT
+            top_features = []
+
+        reports.append({
+            "status": str(STATUS_LABELS[severity[i]]),
+            "risk_score": float(risk_scores[i]),
+            "severity_level": int(severity[i]),
+            "analysis_text": analysis_text,
+            "top_contributing_features": top_features
+        })
+    return reports
+
+def screened_report(risk_score):
+    """Laporan AMAN untuk window yang lolos prefilter (tanpa rekonstruksi LSTM, risk score hasil estimasi)."""
     return {
-        "status": status,
+        "status": str(STATUS_LABELS[0]),
         "risk_score": float(risk_score),
-        "severity_level": severity,
-        "analysis_text": "\n".join(analysis) if analysis else "Sistem Beroperasi Normal.",
-        "top_contributing_features": top_features
-    }
\ No newline at end of file
+        "severity_level": 0,
+        "analysis_text": NORMAL_TEXT,
+        "top_contributing_features": [],
+        "screened": True
+    }
+
+def generate_report(input_seq, reconstruction, feature_names, threshold_critical, threshold_warning):
+    """Laporan satu window (indeks pertama batch); pembungkus generate_report_batch."""
+    return generate_report_batch(
+        np.asarray(input_seq)[:1], np.asarray(reconstruction)[:1], feature_names,
+        threshold_critical, threshold_warning
+    )[0]
@@ -0,0 +1,152 @@
+import bisect
+import contextvars
+import cProfile
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from src.utils.config import LOG_LEVEL, LOG_FORMAT, METRICS_ENABLED
+
+# Logging terstruktur (JSON per baris), histogram latency gaya Prometheus dan timer per tahap.
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def _configure_root():
+    root = logging.getLogger("metropt")
+    if root.handlers:
+        return root
+    handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    root.propagate = False
+    return root
+
+def get_logger(name):
+    """Logger di bawah namespace 'metropt'. Field tambahan: logger.info(msg, extra={"fields": {...}})."""
+    _configure_root()
+    return logging.getLogger(f"metropt.{name}")
+
+# Histogram gaya Prometheus
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+class Histogram:
+    """Histogram berlabel dengan bucket tetap (format exposition Prometheus, tanpa dependensi)."""
+
+    def __init__(self, name, description, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: ([*counts], total, n) for key, (counts, total, n) in self._series.items()}
+        for label_values, (counts, total, n) in sorted(series.items()):
+            labels = list(zip(self.label_names, label_values))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{{{_format_labels(labels + [('le', le)])}}} {cumulative}")
+            lines.append(f"{self.name}_sum{{{_format_labels(labels)}}} {total}")
+            lines.append(f"{self.name}_count{{{_format_labels(labels)}}} {n}")
+        return "\n".join(lines)
+
+STAGE_SECONDS = Histogram("metropt_stage_seconds", "Durasi tiap tahap inference.", ["stage"])
+REQUEST_SECONDS = Histogram("metropt_request_seconds", "Durasi request HTTP.", ["method", "path", "status"])
+METRICS = [REQUEST_SECONDS, STAGE_SECONDS]
+
+def render_metrics(extra_lines=()):
+    return "\n".join([metric.render() for metric in METRICS] + list(extra_lines)) + "\n"
+
+# Trace per request: durasi tiap tahap + profiler opsional (contextvar ikut ke run_in_threadpool)
+
+_trace = contextvars.ContextVar("metropt_trace", default=None)
+
+def start_trace(profile=False):
+    trace = {"start": time.perf_counter(), "stages": [], "profiler": cProfile.Profile() if profile else None}
+    return trace, _trace.set(trace)
+
+def end_trace(token):
+    _trace.reset(token)
+
+def current_trace():
+    return _trace.get()
+
+def record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace["stages"].append((name, seconds))
+
+def mark_since_request_start(name):
+    """Catat waktu dari awal request sampai titik ini (mis. parse body + validasi pydantic)."""
+    trace = _trace.get()
+    if trace is not None and METRICS_ENABLED:
+        record_stage(name, time.perf_counter() - trace["start"])
+
+class _TimedStage:
+    """Context manager ringan (tanpa generator @contextmanager) untuk jalur per request."""
+    __slots__ = ("name", "start", "profiler")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        trace = _trace.get()
+        self.profiler = trace["profiler"] if trace is not None else None
+        if self.profiler is not None:
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler is not None:
+            self.profiler.disable()
+        record_stage(self.name, elapsed)
+        return False
+
+_NOOP = nullcontext()
+
+def stage(name):
+    """Timer satu tahap: `with stage("scaler_transform"): ...`. Tanpa biaya berarti saat METRICS_ENABLED=0."""
+    if not METRICS_ENABLED and _trace.get() is None:
+        return _NOOP
+    return _TimedStage(name)
@@ -0,0 +1,30 @@
+import resource
+
+def peak_rss_mb():
+    """Peak RSS proses saat ini dalam MB."""
+    # ru_maxrss ikut terbawa dari parent setelah fork+exec, VmHWM tidak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def process_memory_mb(pid="self"):
+    """
+    RSS, PSS (halaman bersama dibagi rata antar proses) dan USS (privat) satu proses dalam MB, dari
+    /proc/<pid>/smaps_rollup (Linux). PSS/USS menunjukkan biaya memori sebenarnya per worker serving.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+    }
@@ -2,28 +2,26 @@ import requests
 import pandas as pd
 import json
 
+from src.data.store import sensor_store
+
 # Setting manual skenario
 SKENARIO = 'aman' 
 
 print(f"Loading dataset untuk skenario: [{SKENARIO.upper()}]...")
 
-# Load data
-df = pd.read_csv("data/raw/MetroPT3(AirCompressor).csv")
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-df.set_index('timestamp', inplace=True)
-
 # Potong Data Sesuai Skenario Historis
 if SKENARIO == 'aman':
     # Ambil 45 menit data di bulan Februari
-    sample_data = df['2020-02-05 10:00:00':'2020-02-05 10:45:00'].copy()
+    sample_data = sensor_store.load_range('2020-02-05 10:00:00', '2020-02-05 10:45:00')
 elif SKENARIO == 'rusak':
     # Ambil 45 menit data tepat di tengah-tengah jadwal kerusakan "Air Leak"
-    sample_data = df['2020-04-18 12:00:00':'2020-04-18 12:45:00'].copy()
+    sample_data = sensor_store.load_range('2020-04-18 12:00:00', '2020-04-18 12:45:00')
 else:
     print("Skenario tidak dikenal, mengambil data default...")
-    sample_data = df.head(2500).copy()
+    sample_data = sensor_store.load_range().head(2500)
 
-sample_data = sample_data.reset_index()
+# Cache disimpan float32; json butuh float Python
+sample_data = sample_data.astype(float).reset_index()
 
 # Format ke JSON
 payload = []